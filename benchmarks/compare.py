@@ -0,0 +1,135 @@
+# benchmarks/compare.py
+
+"""
+Compares two benchmark result files written by run_benchmarks.py.
+
+Prints the time and peak memory of every benchmark in both files with the relative change,
+and exits with status 1 if any benchmark got slower or used more memory than the threshold
+allows, so it can gate a CI job:
+
+    python benchmarks/compare.py base.json head.json --threshold 0.1
+
+Timings are only comparable between runs with the same parameters on the same machine; a
+warning is printed when the parameters differ.
+"""
+
+import argparse
+import json
+import sys
+
+from run_benchmarks import RESULTS_FORMAT_VERSION
+
+
+def load_results(path):
+    """
+    Reads a results file.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        dict: The results.
+
+    Raises:
+        ValueError: If the file was written in another format version.
+    """
+    with open(path, encoding='utf-8') as file:
+        results = json.load(file)
+    if results.get('format_version') != RESULTS_FORMAT_VERSION:
+        raise ValueError(f"{path} has format version {results.get('format_version')}, "
+                         f"expected {RESULTS_FORMAT_VERSION}.")
+    return results
+
+
+def compare(base, head, threshold=0.1, min_seconds=1e-3):
+    """
+    Compares the benchmarks of two results.
+
+    Args:
+        base (dict): The baseline results.
+        head (dict): The results to check against the baseline.
+        threshold (float, optional): The relative increase in time or memory that counts as
+            a regression. Defaults to 0.1.
+        min_seconds (float, optional): Timings below this many seconds in both results are
+            too noisy to count as regressions. Defaults to 1e-3.
+
+    Returns:
+        list: One (name, metric, base value, head value, relative change, regressed) tuple per
+            metric present in both results. The change is None when a value is missing.
+    """
+    base_results = {result['name']: result for result in base['results']}
+    rows = []
+    for result in head['results']:
+        baseline = base_results.get(result['name'])
+        if baseline is None:
+            continue
+        for metric in ('seconds', 'peak_memory_bytes'):
+            base_value, head_value = baseline.get(metric), result.get(metric)
+            if base_value is None and head_value is None:
+                continue
+            change = None
+            if base_value and head_value is not None:
+                change = head_value / base_value - 1
+            regressed = (change is not None and change > threshold) or (base_value is not None and head_value is None)
+            if metric == 'seconds' and max(base_value or 0, head_value or 0) < min_seconds:
+                regressed = False
+            rows.append((result['name'], metric, base_value, head_value, change, regressed))
+    return rows
+
+
+def _format(metric, value):
+    """
+    Formats a metric value for display.
+
+    Args:
+        metric (str): 'seconds' or 'peak_memory_bytes'.
+        value (float): The value, or None.
+
+    Returns:
+        str: The formatted value.
+    """
+    if value is None:
+        return '-'
+    if metric == 'seconds':
+        return f'{value * 1e3:.3f} ms'
+    return f'{value / 2 ** 20:.1f} MiB'
+
+
+def main(argv=None):
+    """
+    Compares two results files from the command line.
+
+    Args:
+        argv (list, optional): The command-line arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        int: 1 if any benchmark regressed, 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(description='Compare two LabMateAI benchmark result files.')
+    parser.add_argument('base', help='Baseline results.')
+    parser.add_argument('head', help='Results to check against the baseline.')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Relative increase that counts as a regression. Defaults to 0.1.')
+    parser.add_argument('--min-seconds', type=float, default=1e-3,
+                        help='Timings below this in both files are not flagged. Defaults to 0.001.')
+    args = parser.parse_args(argv)
+
+    base, head = load_results(args.base), load_results(args.head)
+    if base['parameters'] != head['parameters']:
+        print(f"Warning: parameters differ: {base['parameters']} vs {head['parameters']}", file=sys.stderr)
+
+    rows = compare(base, head, args.threshold, args.min_seconds)
+    print(f"{'benchmark':<32} {'metric':<18} {'base':>14} {'head':>14} {'change':>9}")
+    for name, metric, base_value, head_value, change, regressed in rows:
+        change_text = '-' if change is None else f'{change:+.1%}'
+        print(f"{name:<32} {metric:<18} {_format(metric, base_value):>14} {_format(metric, head_value):>14} "
+              f"{change_text:>9}{'  REGRESSION' if regressed else ''}")
+
+    regressions = sum(row[-1] for row in rows)
+    if regressions:
+        print(f"\n{regressions} regression(s) above {args.threshold:.0%}.")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
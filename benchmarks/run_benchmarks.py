@@ -0,0 +1,309 @@
+# benchmarks/run_benchmarks.py
+
+"""
+Benchmarks of the LabMateAI recommenders on synthetic data.
+
+Times the cold import of the CLI and the build, single-query and batch-query paths of the
+graph, the tool tree, the search index and the content-based, collaborative and hybrid
+recommenders, and measures the peak memory allocated by each build and batch query. Results
+are written as JSON, so runs on two commits can be compared with compare.py.
+
+Usage:
+    python benchmarks/run_benchmarks.py --scale small --output base.json
+    python benchmarks/run_benchmarks.py --tools 5000 --users 50000 --interactions 500000
+
+A benchmark that runs out of memory is recorded with its error, and the benchmarks that
+depend on its result are skipped.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from importlib import metadata
+
+import numpy as np
+
+# Benchmark the working tree rather than an installed release
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import generate_interactions, generate_tools, tools_dataframe  # noqa: E402
+
+from labmateai.graph import Graph  # noqa: E402
+from labmateai.recommenders.collaborative_recommender import CollaborativeRecommender  # noqa: E402
+from labmateai.recommenders.content_based_recommender import (  # noqa: E402
+    ContentBasedRecommender, build_sparse_user_item_matrix)
+from labmateai.recommenders.hybrid_recommender import HybridRecommender  # noqa: E402
+from labmateai.search import ToolSearchIndex, search_tools  # noqa: E402
+from labmateai.tree import ToolTree  # noqa: E402
+
+# Version of the results layout, checked by compare.py
+RESULTS_FORMAT_VERSION = 1
+
+# Preset data sizes. The content-based recommender holds a dense tools x tools similarity
+# matrix, so it needs about 8 * tools ** 2 bytes and does not fit in memory at 'large'.
+SCALES = {
+    'small': {'tools': 1_000, 'users': 10_000, 'interactions': 100_000},
+    'medium': {'tools': 10_000, 'users': 100_000, 'interactions': 1_000_000},
+    'large': {'tools': 100_000, 'users': 1_000_000, 'interactions': 10_000_000},
+}
+
+PACKAGES = ['numpy', 'scipy', 'scikit-learn', 'pandas', 'networkx']
+
+
+class Benchmarks:
+    """
+    Runs benchmarks and collects their results.
+    """
+
+    def __init__(self, repeat=3, measure_memory=True):
+        """
+        Initializes the collection.
+
+        Args:
+            repeat (int, optional): The number of timed runs of each benchmark. Defaults to 3.
+            measure_memory (bool, optional): Whether to measure peak memory in an extra,
+                untimed run. Defaults to True.
+        """
+        self.repeat = repeat
+        self.measure_memory = measure_memory
+        self.results = []
+
+    def run(self, name, function, calls=1, repeat=None, memory=True):
+        """
+        Times a benchmark and records its result.
+
+        Args:
+            name (str): The benchmark name, as 'component.path'.
+            function (Callable): Runs the benchmark once.
+            calls (int, optional): The number of queries one run of function makes. Times are
+                reported per query. Defaults to 1.
+            repeat (int, optional): The number of timed runs. Defaults to the collection's repeat.
+            memory (bool, optional): Whether to measure the benchmark's peak memory. Defaults to True.
+
+        Returns:
+            The return value of the last run of function, or None if it ran out of memory.
+        """
+        result = {'name': name, 'calls': calls}
+        times = []
+        try:
+            for _ in range(repeat or self.repeat):
+                start = time.perf_counter()
+                value = function()
+                times.append((time.perf_counter() - start) / calls)
+            if memory and self.measure_memory:
+                # tracemalloc slows allocation down, so memory is measured apart from the timings
+                tracemalloc.start()
+                try:
+                    function()
+                    result['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+        except MemoryError as e:
+            result['error'] = f'{type(e).__name__}: {e}'
+            self.results.append(result)
+            logging.warning("%s ran out of memory.", name)
+            return None
+
+        result.update(seconds=min(times), median_seconds=statistics.median(times), runs=len(times))
+        self.results.append(result)
+        logging.info("%-32s %12.6f s%s", name, result['seconds'],
+                     f"  {result['peak_memory_bytes'] / 2 ** 20:10.1f} MiB" if 'peak_memory_bytes' in result else '')
+        return value
+
+    def skip(self, name, reason):
+        """
+        Records a benchmark that could not run.
+
+        Args:
+            name (str): The benchmark name.
+            reason (str): Why it was skipped.
+        """
+        self.results.append({'name': name, 'skipped': reason})
+
+
+def run_all(num_tools, num_users, num_interactions, seed=0, queries=100, repeat=3, measure_memory=True):
+    """
+    Generates synthetic data and runs every benchmark on it.
+
+    Args:
+        num_tools (int): The number of tools.
+        num_users (int): The number of users.
+        num_interactions (int): The number of interactions.
+        seed (int, optional): The random seed of the data and the queries. Defaults to 0.
+        queries (int, optional): The number of queries of the query benchmarks. Defaults to 100.
+        repeat (int, optional): The number of timed runs of each benchmark. Defaults to 3.
+        measure_memory (bool, optional): Whether to measure peak memory. Defaults to True.
+
+    Returns:
+        Benchmarks: The collected results.
+    """
+    benchmarks = Benchmarks(repeat=repeat, measure_memory=measure_memory)
+    rng = np.random.default_rng(seed)
+
+    benchmarks.run('cli.import', _import_cli, memory=False)
+
+    start = time.perf_counter()
+    tools = generate_tools(num_tools, seed)
+    user_ids, tool_ids, ratings = generate_interactions(num_users, num_tools, num_interactions, seed)
+    logging.info("Generated %d tools and %d interactions in %.1f s.",
+                 num_tools, num_interactions, time.perf_counter() - start)
+
+    tool_names = [tools[i].name for i in rng.choice(num_tools, size=queries)]
+    search_queries = [' '.join(tools[i].features[:2]) for i in rng.choice(num_tools, size=queries)]
+
+    # Builds that every recommender relies on
+    benchmarks.run('graph.build', lambda: Graph(tools))
+    benchmarks.run('tree.build', lambda: _build_tree(tools))
+
+    content = benchmarks.run('content.build', lambda: ContentBasedRecommender(tools), repeat=1)
+    if content is None:
+        for name in ['content.recommend', 'content.recommend_batch', 'search.build', 'search.query']:
+            benchmarks.skip(name, 'content.build failed')
+    else:
+        benchmarks.run('content.recommend', lambda: [content.recommend(tool_name=name) for name in tool_names],
+                       calls=queries, memory=False)
+        benchmarks.run('content.recommend_batch', lambda: content.recommend_batch(tool_names=tool_names))
+
+        index = benchmarks.run('search.build', lambda: ToolSearchIndex.from_tree(content.tree))
+        benchmarks.run('search.query', lambda: [search_tools(index, content.tree, query) for query in search_queries],
+                       calls=queries, memory=False)
+
+    matrix = benchmarks.run('ratings.build_matrix', lambda: build_sparse_user_item_matrix(
+        user_ids, tool_ids, ratings, return_counts=True))
+    collaborative = None
+    if matrix is None:
+        benchmarks.skip('collaborative.build', 'ratings.build_matrix failed')
+    else:
+        user_item_matrix, matrix_user_ids, matrix_tool_ids, rating_counts = matrix
+        users = matrix_user_ids[rng.choice(len(matrix_user_ids), size=queries)].tolist()
+        tools_df = tools_dataframe(tools)
+        collaborative = benchmarks.run('collaborative.build', lambda: CollaborativeRecommender(
+            user_item_matrix=user_item_matrix, tools_df=tools_df, n_neighbors=5, user_ids=matrix_user_ids,
+            tool_ids=matrix_tool_ids, rating_counts=rating_counts), repeat=1)
+
+    if collaborative is None:
+        for name in ['collaborative.recommend', 'collaborative.recommend_batch']:
+            benchmarks.skip(name, 'collaborative.build failed')
+    else:
+        benchmarks.run('collaborative.recommend', lambda: [
+            collaborative.recommend(user_id=user_id) for user_id in users], calls=queries, memory=False)
+        benchmarks.run('collaborative.recommend_batch', lambda: collaborative.recommend_batch(user_ids=users))
+
+    if content is None or collaborative is None:
+        for name in ['hybrid.build', 'hybrid.recommend', 'hybrid.recommend_batch']:
+            benchmarks.skip(name, 'content.build or collaborative.build failed')
+    else:
+        hybrid = benchmarks.run('hybrid.build', lambda: HybridRecommender(content, collaborative))
+        benchmarks.run('hybrid.recommend', lambda: [
+            hybrid.recommend(user_id=user_id, tool_name=name) for user_id, name in zip(users, tool_names)
+        ], calls=queries, memory=False)
+        benchmarks.run('hybrid.recommend_batch', lambda: hybrid.recommend_batch(user_ids=users, tool_names=tool_names))
+
+    return benchmarks
+
+
+def describe_environment():
+    """
+    Describes the commit and environment the benchmarks run in.
+
+    Returns:
+        dict: The commit, Python version, platform and package versions.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    packages = {}
+    for package in PACKAGES:
+        try:
+            packages[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            packages[package] = None
+
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'packages': packages
+    }
+
+
+def _import_cli():
+    """
+    Imports the CLI of the working tree in a fresh interpreter, as a user's first command does.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, '-c', 'import labmateai.cli'], check=True, cwd=root)
+
+
+def _build_tree(tools):
+    """
+    Builds a tool tree.
+
+    Args:
+        tools (list): The Tool objects.
+
+    Returns:
+        ToolTree: The tree.
+    """
+    tree = ToolTree()
+    tree.build_tree(tools)
+    return tree
+
+
+def main(argv=None):
+    """
+    Runs the benchmarks from the command line and writes their results as JSON.
+
+    Args:
+        argv (list, optional): The command-line arguments. Defaults to sys.argv[1:].
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the LabMateAI recommenders on synthetic data.')
+    parser.add_argument('--scale', choices=SCALES, default='small',
+                        help='Preset data size. --tools, --users and --interactions override it.')
+    parser.add_argument('--tools', type=int, help='Number of tools.')
+    parser.add_argument('--users', type=int, help='Number of users.')
+    parser.add_argument('--interactions', type=int, help='Number of interactions.')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed of the data and queries.')
+    parser.add_argument('--queries', type=int, default=100, help='Number of queries per query benchmark.')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of timed runs per benchmark.')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the peak memory measurements.')
+    parser.add_argument('--output', default='benchmark_results.json', help='Path of the JSON results.')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parameters = dict(SCALES[args.scale], scale=args.scale, seed=args.seed, queries=args.queries, repeat=args.repeat)
+    for key in ('tools', 'users', 'interactions'):
+        if getattr(args, key) is not None:
+            parameters[key] = getattr(args, key)
+            parameters['scale'] = 'custom'
+
+    benchmarks = run_all(parameters['tools'], parameters['users'], parameters['interactions'], seed=args.seed,
+                         queries=args.queries, repeat=args.repeat, measure_memory=not args.no_memory)
+
+    results = {
+        'format_version': RESULTS_FORMAT_VERSION,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': describe_environment(),
+        'parameters': parameters,
+        'results': benchmarks.results
+    }
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2)
+    logging.info("Wrote %d results to %s.", len(benchmarks.results), args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+# benchmarks/synthetic.py
+
+"""
+Synthetic data for the LabMateAI benchmarks.
+
+Generates seeded tool catalogs and interaction logs that look like the production data:
+tools spread over categories with features, languages and platforms drawn from small
+vocabularies, and interactions whose users and tools both follow power laws, so a few
+tools and users account for most of the ratings. The same seed always gives the same data.
+
+Functions:
+    generate_tools: Generate a catalog of tools.
+    generate_interactions: Generate a power-law interaction log over a catalog.
+    tools_dataframe: Convert tools into the tools_df the collaborative recommender expects.
+"""
+
+import numpy as np
+import pandas as pd
+
+from labmateai.tool import Tool
+
+CATEGORIES = [
+    'Genomics', 'Proteomics', 'Transcriptomics', 'Metabolomics', 'Imaging', 'Statistics',
+    'Machine Learning', 'Chemistry', 'Microscopy', 'Sequencing', 'Visualization', 'Workflow'
+]
+LANGUAGES = ['Python', 'R', 'C++', 'Java', 'Julia', 'MATLAB']
+PLATFORMS = ['Linux', 'Windows', 'macOS', 'Web', 'Cross-platform']
+COSTS = ['Free', 'Free', 'Free', 'Paid', 'Subscription']
+NUM_FEATURES = 400
+
+
+def generate_tools(num_tools, seed=0):
+    """
+    Generates a catalog of tools with unique names and IDs 1..num_tools.
+
+    Each tool gets 2 to 6 features. Features are drawn with a power law, so common features
+    link many tools and rare ones few, as in a real catalog.
+
+    Args:
+        num_tools (int): The number of tools.
+        seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+        list: The Tool objects.
+    """
+    rng = np.random.default_rng(seed)
+    feature_weights = _power_law_weights(NUM_FEATURES, 1.1)
+    categories = rng.integers(len(CATEGORIES), size=num_tools)
+    languages = rng.integers(len(LANGUAGES), size=num_tools)
+    platforms = rng.integers(len(PLATFORMS), size=num_tools)
+    costs = rng.integers(len(COSTS), size=num_tools)
+    feature_counts = rng.integers(2, 7, size=num_tools)
+
+    tools = []
+    for i in range(num_tools):
+        features = rng.choice(NUM_FEATURES, size=feature_counts[i], replace=False, p=feature_weights)
+        category = CATEGORIES[categories[i]]
+        tools.append(Tool(
+            tool_id=i + 1,
+            name=f'Tool{i + 1}',
+            category=category,
+            features=tuple(f'feature{feature}' for feature in features),
+            cost=COSTS[costs[i]],
+            description=f'{category} tool {i + 1} for ' + ' and '.join(f'task{feature}' for feature in features[:2]),
+            url=f'https://tool{i + 1}.example.com/',
+            language=LANGUAGES[languages[i]],
+            platform=PLATFORMS[platforms[i]]
+        ))
+    return tools
+
+
+def generate_interactions(num_users, num_tools, num_interactions, seed=0, exponent=1.0):
+    """
+    Generates an interaction log with power-law user activity and tool popularity.
+
+    User IDs are 1..num_users and tool IDs 1..num_tools, matching generate_tools. Ratings are
+    integers from 1 to 5, and about one interaction in ten has no rating.
+
+    Args:
+        num_users (int): The number of users.
+        num_tools (int): The number of tools.
+        num_interactions (int): The number of interactions.
+        seed (int, optional): The random seed. Defaults to 0.
+        exponent (float, optional): The power-law exponent of user activity and tool popularity.
+            Larger values concentrate interactions on fewer users and tools. Defaults to 1.0.
+
+    Returns:
+        tuple: The user_ids, tool_ids and ratings arrays. Missing ratings are NaN.
+    """
+    rng = np.random.default_rng(seed + 1)
+    # Shuffle the ranks, so the most active users and popular tools are not the lowest IDs
+    user_ids = rng.permutation(num_users)[
+        rng.choice(num_users, size=num_interactions, p=_power_law_weights(num_users, exponent))] + 1
+    tool_ids = rng.permutation(num_tools)[
+        rng.choice(num_tools, size=num_interactions, p=_power_law_weights(num_tools, exponent))] + 1
+    ratings = rng.integers(1, 6, size=num_interactions).astype(np.float64)
+    ratings[rng.random(num_interactions) < 0.1] = np.nan
+    return user_ids.astype(np.int64), tool_ids.astype(np.int64), ratings
+
+
+def tools_dataframe(tools):
+    """
+    Converts tools into the tools_df the collaborative recommender expects.
+
+    Args:
+        tools (list): The Tool objects.
+
+    Returns:
+        pd.DataFrame: One row per tool, with a column per Tool field.
+    """
+    return pd.DataFrame([tool.__dict__ for tool in tools])
+
+
+def _power_law_weights(size, exponent):
+    """
+    Returns the probabilities of ranks 1..size under a power law.
+
+    Args:
+        size (int): The number of ranks.
+        exponent (float): The power-law exponent.
+
+    Returns:
+        np.ndarray: Probabilities proportional to rank ** -exponent.
+    """
+    weights = np.arange(1, size + 1, dtype=np.float64) ** -exponent
+    return weights / weights.sum()
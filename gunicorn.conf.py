@@ -0,0 +1,58 @@
+# gunicorn.conf.py
+
+"""
+Gunicorn configuration for the LabMateAI recommendation service.
+
+The application is loaded in the master process before workers are forked, so the fitted
+recommenders are built once and their memory is shared copy-on-write by every worker.
+Set LABMATEAI_SNAPSHOT_DIR to serve the model from a read-only snapshot mapping instead, whose
+arrays stay shared however many workers are added.
+Setting LABMATEAI_REFRESH_INTERVAL as well refreshes the model through that snapshot.
+With LABMATEAI_METRICS enabled, set LABMATEAI_METRICS_DIR so /metrics reports every worker
+rather than only the one serving the scrape.
+"""
+
+import gc
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', '1'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+
+# Build the model once in the master; workers inherit it on fork
+preload_app = True
+
+
+def on_starting(server):
+    """
+    Empties the shared metrics directory, so /metrics does not include the workers of a
+    previous run.
+    """
+    directory = os.getenv('LABMATEAI_METRICS_DIR')
+    if directory:
+        from labmateai import metrics
+
+        metrics.clear_directory(directory)
+
+
+def when_ready(server):
+    """
+    Moves the preloaded model out of the garbage collector's generations before workers fork,
+    so collections in the workers do not write to, and thereby copy, its shared pages.
+    """
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """
+    Starts the model holder's rebuild thread in each worker, since threads do not survive the
+    fork. Only workers refresh, so the master's copy of the model stays untouched, and of the
+    workers only the one holding the snapshot's rebuild lock reads the database; the others
+    attach to the snapshot it saves.
+    """
+    from labmateai.wsgi import holder
+
+    if holder.refresh_interval is not None:
+        holder.start()
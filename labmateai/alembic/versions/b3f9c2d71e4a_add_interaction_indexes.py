@@ -0,0 +1,37 @@
+"""Add interaction indexes for the recommender's queries
+
+Revision ID: b3f9c2d71e4a
+Revises: 697518134a33
+Create Date: 2026-10-17 10:12:44.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f9c2d71e4a'
+down_revision: Union[str, None] = '697518134a33'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_interactions_user_id_tool_id', 'interactions', ['user_id', 'tool_id'])
+    op.create_index('ix_interactions_tool_id', 'interactions', ['tool_id'])
+    op.create_index('ix_interactions_timestamp', 'interactions', ['timestamp'])
+    # Partial index holding the columns of the rating query, so it is answered from the index alone
+    op.create_index(
+        'ix_interactions_rated', 'interactions', ['user_id', 'tool_id', 'rating'],
+        postgresql_where=sa.text('rating IS NOT NULL'),
+        sqlite_where=sa.text('rating IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_interactions_rated', table_name='interactions')
+    op.drop_index('ix_interactions_timestamp', table_name='interactions')
+    op.drop_index('ix_interactions_tool_id', table_name='interactions')
+    op.drop_index('ix_interactions_user_id_tool_id', table_name='interactions')
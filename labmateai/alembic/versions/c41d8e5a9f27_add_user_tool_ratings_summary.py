@@ -0,0 +1,129 @@
+"""Add the user_tool_ratings summary table
+
+Revision ID: c41d8e5a9f27
+Revises: b3f9c2d71e4a
+Create Date: 2026-10-17 11:03:26.842911
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d8e5a9f27'
+down_revision: Union[str, None] = 'b3f9c2d71e4a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Adds an inserted rating to its pair's row. Concurrent inserts for one pair serialize on the row.
+ADD_RATING = """
+    INSERT INTO user_tool_ratings (user_id, tool_id, rating_count, rating_sum, latest_rating, latest_interaction_id)
+    VALUES (NEW.user_id, NEW.tool_id, 1, NEW.rating, NEW.rating, NEW.interaction_id)
+    ON CONFLICT (user_id, tool_id) DO UPDATE SET
+        rating_count = user_tool_ratings.rating_count + 1,
+        rating_sum = user_tool_ratings.rating_sum + excluded.rating_sum,
+        latest_rating = CASE WHEN excluded.latest_interaction_id > user_tool_ratings.latest_interaction_id
+                             THEN excluded.latest_rating ELSE user_tool_ratings.latest_rating END,
+        latest_interaction_id = CASE WHEN excluded.latest_interaction_id > user_tool_ratings.latest_interaction_id
+                                     THEN excluded.latest_interaction_id ELSE user_tool_ratings.latest_interaction_id END;
+"""
+
+# Recomputes the row of the pair ({row}.user_id, {row}.tool_id) from its interactions,
+# removing it once no rating is left. Used for the rare updates and deletes.
+REFRESH_PAIR = """
+    DELETE FROM user_tool_ratings WHERE user_id = {row}.user_id AND tool_id = {row}.tool_id;
+    INSERT INTO user_tool_ratings (user_id, tool_id, rating_count, rating_sum, latest_rating, latest_interaction_id)
+    {aggregate} AND i.user_id = {row}.user_id AND i.tool_id = {row}.tool_id
+    GROUP BY i.user_id, i.tool_id;
+"""
+
+# Aggregates the rated interactions of every pair; callers may extend the WHERE clause
+AGGREGATE = """
+    SELECT i.user_id, i.tool_id, COUNT(*), SUM(i.rating),
+           (SELECT latest.rating FROM interactions latest
+            WHERE latest.user_id = i.user_id AND latest.tool_id = i.tool_id AND latest.rating IS NOT NULL
+            ORDER BY latest.interaction_id DESC LIMIT 1),
+           MAX(i.interaction_id)
+    FROM interactions i
+    WHERE i.rating IS NOT NULL"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_tool_ratings',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.user_id'), primary_key=True),
+        sa.Column('tool_id', sa.Integer(), sa.ForeignKey('tools.tool_id'), primary_key=True),
+        sa.Column('rating_count', sa.Integer(), nullable=False),
+        sa.Column('rating_sum', sa.Integer(), nullable=False),
+        sa.Column('latest_rating', sa.Integer(), nullable=False),
+        sa.Column('latest_interaction_id', sa.Integer(), nullable=False),
+    )
+
+    # Backfill from the existing interactions
+    op.execute(
+        "INSERT INTO user_tool_ratings (user_id, tool_id, rating_count, rating_sum, latest_rating, latest_interaction_id)"
+        f"{AGGREGATE}\n    GROUP BY i.user_id, i.tool_id"
+    )
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(f"""
+            CREATE FUNCTION user_tool_ratings_add() RETURNS trigger AS $$
+            BEGIN
+                {ADD_RATING}
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute(f"""
+            CREATE FUNCTION user_tool_ratings_refresh() RETURNS trigger AS $$
+            BEGIN
+                {REFRESH_PAIR.format(row='OLD', aggregate=AGGREGATE)}
+                IF TG_OP = 'UPDATE' THEN
+                    {REFRESH_PAIR.format(row='NEW', aggregate=AGGREGATE)}
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute("""
+            CREATE TRIGGER user_tool_ratings_insert AFTER INSERT ON interactions
+            FOR EACH ROW WHEN (NEW.rating IS NOT NULL) EXECUTE PROCEDURE user_tool_ratings_add()
+        """)
+        op.execute("""
+            CREATE TRIGGER user_tool_ratings_update AFTER UPDATE OF user_id, tool_id, rating ON interactions
+            FOR EACH ROW EXECUTE PROCEDURE user_tool_ratings_refresh()
+        """)
+        op.execute("""
+            CREATE TRIGGER user_tool_ratings_delete AFTER DELETE ON interactions
+            FOR EACH ROW WHEN (OLD.rating IS NOT NULL) EXECUTE PROCEDURE user_tool_ratings_refresh()
+        """)
+    else:
+        op.execute(f"""
+            CREATE TRIGGER user_tool_ratings_insert AFTER INSERT ON interactions
+            WHEN NEW.rating IS NOT NULL
+            BEGIN {ADD_RATING} END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER user_tool_ratings_update AFTER UPDATE OF user_id, tool_id, rating ON interactions
+            BEGIN
+                {REFRESH_PAIR.format(row='OLD', aggregate=AGGREGATE)}
+                {REFRESH_PAIR.format(row='NEW', aggregate=AGGREGATE)}
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER user_tool_ratings_delete AFTER DELETE ON interactions
+            WHEN OLD.rating IS NOT NULL
+            BEGIN {REFRESH_PAIR.format(row='OLD', aggregate=AGGREGATE)} END
+        """)
+
+
+def downgrade() -> None:
+    postgresql = op.get_bind().dialect.name == 'postgresql'
+    for trigger in ('user_tool_ratings_delete', 'user_tool_ratings_update', 'user_tool_ratings_insert'):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}" + (" ON interactions" if postgresql else ""))
+    if postgresql:
+        op.execute("DROP FUNCTION IF EXISTS user_tool_ratings_refresh()")
+        op.execute("DROP FUNCTION IF EXISTS user_tool_ratings_add()")
+    op.drop_table('user_tool_ratings')
@@ -0,0 +1,281 @@
+# labmateai/cache.py
+
+"""
+Cache Module for LabMateAI
+
+This module keeps an optional local columnar copy of the tools, users and interactions tables,
+so a process with a fresh cache reads typed columns from disk instead of hydrating one object
+per database row. It requires pyarrow, installed with the 'cache' extra; pyarrow is imported
+only when the cache is used.
+
+A cache directory holds:
+
+    manifest.json         format version, creation time and the data fingerprint
+    tools.parquet         the tools, with features pre-split into a list column
+    users.parquet         the users
+    interactions.arrow    user_id, tool_id, rating and timestamp as an uncompressed Arrow IPC file
+
+The interactions file is memory-mapped on read, and its numeric columns are handed to numpy
+without copying. A cache is fresh when its fingerprint matches the database's, as computed by
+snapshot.compute_fingerprint. The CLI and the data_loader functions read a fresh cache in
+LABMATEAI_CACHE_DIR instead of the database.
+
+Functions:
+    write_cache: Write the tables to a cache directory.
+    is_fresh: Check whether a cache directory matches a data fingerprint.
+    read_tools: Read the cached tools.
+    read_users: Read the cached users.
+    read_interaction_chunks: Read the cached interactions as columnar chunks.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .data_loader import InteractionChunk
+from .tool import Tool
+
+# Version of the on-disk layout; caches written with another version are not fresh
+CACHE_FORMAT_VERSION = 1
+
+MANIFEST_FILE = 'manifest.json'
+TOOLS_FILE = 'tools.parquet'
+USERS_FILE = 'users.parquet'
+INTERACTIONS_FILE = 'interactions.arrow'
+
+TOOL_COLUMNS = ['tool_id', 'name', 'category', 'features', 'cost', 'description', 'url', 'language', 'platform']
+USER_COLUMNS = ['user_id', 'user_name', 'email', 'department', 'role']
+
+
+def _import_pyarrow():
+    """
+    Imports pyarrow on first use of the cache.
+
+    Returns:
+        tuple: The pyarrow and pyarrow.parquet modules.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "The local cache requires pyarrow. Install it with: pip install 'labmateai[cache]'"
+        ) from e
+    return pyarrow, pyarrow.parquet
+
+
+def _schemas(pa):
+    """
+    Builds the Arrow schemas of the cached tables.
+
+    Args:
+        pa: The pyarrow module.
+
+    Returns:
+        tuple: The tools, users and interactions schemas.
+    """
+    tools = pa.schema([
+        ('tool_id', pa.int64()), ('name', pa.string()), ('category', pa.string()),
+        ('features', pa.list_(pa.string())), ('cost', pa.string()), ('description', pa.string()),
+        ('url', pa.string()), ('language', pa.string()), ('platform', pa.string())
+    ])
+    users = pa.schema([
+        ('user_id', pa.int64()), ('user_name', pa.string()), ('email', pa.string()),
+        ('department', pa.string()), ('role', pa.string())
+    ])
+    interactions = pa.schema([
+        ('user_id', pa.int64()), ('tool_id', pa.int64()),
+        ('rating', pa.float64()), ('timestamp', pa.timestamp('us'))
+    ])
+    return tools, users, interactions
+
+
+def write_cache(
+    directory: str,
+    fingerprint: Dict[str, Optional[int]],
+    tools: List[Tool],
+    users: List[Dict],
+    interaction_chunks: Iterable[InteractionChunk]
+) -> int:
+    """
+    Writes the tables to a cache directory, replacing any previous cache.
+
+    The manifest is removed first and written last, so an interrupted write leaves a cache
+    that is never fresh. Interaction chunks are written as they arrive, one record batch each.
+
+    Args:
+        directory (str): The cache directory. It is created if missing.
+        fingerprint (Dict[str, Optional[int]]): The data fingerprint of the tables.
+        tools (List[Tool]): The tools.
+        users (List[Dict]): The users, with the keys in USER_COLUMNS.
+        interaction_chunks (Iterable[InteractionChunk]): The interactions, for example from
+            data_loader.stream_interactions.
+
+    Returns:
+        int: The number of interactions written.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    pa, pq = _import_pyarrow()
+    tools_schema, users_schema, interactions_schema = _schemas(pa)
+
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    tools_table = pa.Table.from_pylist([
+        {column: list(tool.features) if column == 'features' else getattr(tool, column) for column in TOOL_COLUMNS}
+        for tool in tools
+    ], schema=tools_schema)
+    _replace(directory, TOOLS_FILE, lambda path: pq.write_table(tools_table, path))
+
+    users_table = pa.Table.from_pylist(
+        [{column: user[column] for column in USER_COLUMNS} for user in users], schema=users_schema)
+    _replace(directory, USERS_FILE, lambda path: pq.write_table(users_table, path))
+
+    interaction_count = 0
+
+    def write_interactions(path):
+        nonlocal interaction_count
+        with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, interactions_schema) as writer:
+            for chunk in interaction_chunks:
+                writer.write_batch(pa.record_batch([
+                    pa.array(chunk.user_id, type=pa.int64()),
+                    pa.array(chunk.tool_id, type=pa.int64()),
+                    pa.array(chunk.rating, type=pa.float64()),
+                    pa.array(chunk.timestamp, type=pa.timestamp('us'))
+                ], schema=interactions_schema))
+                interaction_count += len(chunk.user_id)
+
+    _replace(directory, INTERACTIONS_FILE, write_interactions)
+
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump({
+            'format_version': CACHE_FORMAT_VERSION,
+            'created_at': datetime.now().isoformat(),
+            'fingerprint': fingerprint
+        }, file)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+    logging.info("Wrote %d tools, %d users and %d interactions to the cache in %s.",
+                 len(tools), len(users), interaction_count, directory)
+    return interaction_count
+
+
+def is_fresh(directory: str, fingerprint: Dict[str, Optional[int]]) -> bool:
+    """
+    Checks whether a cache directory holds a complete cache matching a data fingerprint.
+
+    Args:
+        directory (str): The cache directory.
+        fingerprint (Dict[str, Optional[int]]): The current data fingerprint.
+
+    Returns:
+        bool: True if the cache can be read in place of the database, False otherwise.
+    """
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE), encoding='utf-8') as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return False
+    return manifest.get('format_version') == CACHE_FORMAT_VERSION and manifest.get('fingerprint') == fingerprint
+
+
+def read_tools(directory: str) -> List[Tool]:
+    """
+    Reads the cached tools.
+
+    Args:
+        directory (str): The cache directory.
+
+    Returns:
+        List[Tool]: The tools, with features as tuples.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    _, pq = _import_pyarrow()
+    table = pq.read_table(os.path.join(directory, TOOLS_FILE), memory_map=True)
+    return [Tool(**dict(record, features=tuple(record['features']))) for record in table.to_pylist()]
+
+
+def read_users(directory: str) -> List[Dict]:
+    """
+    Reads the cached users.
+
+    Args:
+        directory (str): The cache directory.
+
+    Returns:
+        List[Dict]: The users, as data_loader.load_users_from_db returns them.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    _, pq = _import_pyarrow()
+    return pq.read_table(os.path.join(directory, USERS_FILE), memory_map=True).to_pylist()
+
+
+def read_interaction_chunks(directory: str) -> Iterator[InteractionChunk]:
+    """
+    Reads the cached interactions, one chunk per record batch written.
+
+    The file is memory-mapped; user_id, tool_id and rating arrays are views of the mapping.
+    It is opened before the first chunk is requested, so a missing or unreadable file raises
+    here rather than partway through the iteration.
+
+    Args:
+        directory (str): The cache directory.
+
+    Returns:
+        Iterator[InteractionChunk]: The batches of interactions.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+        OSError: If the interactions file cannot be read.
+    """
+    pa, _ = _import_pyarrow()
+    # The mapping stays open for as long as any yielded array still refers to it
+    reader = pa.ipc.open_file(pa.memory_map(os.path.join(directory, INTERACTIONS_FILE), 'r'))
+    return _interaction_chunks(reader)
+
+
+def _interaction_chunks(reader) -> Iterator[InteractionChunk]:
+    """
+    Converts the record batches of an open interactions file into chunks.
+
+    Args:
+        reader (pyarrow.ipc.RecordBatchFileReader): The open interactions file.
+
+    Yields:
+        InteractionChunk: The next batch of interactions.
+    """
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i)
+        yield InteractionChunk(
+            user_id=batch.column(0).to_numpy(),
+            tool_id=batch.column(1).to_numpy(),
+            rating=batch.column(2).to_numpy(zero_copy_only=False),
+            timestamp=batch.column(3).to_numpy(zero_copy_only=False).astype('datetime64[us]')
+        )
+
+
+def _replace(directory: str, name: str, write) -> None:
+    """
+    Writes a file through a temporary path, then moves it into place.
+
+    Args:
+        directory (str): The cache directory.
+        name (str): The file name.
+        write (Callable[[str], None]): Writes the file to the path it is given.
+    """
+    path = os.path.join(directory, name)
+    write(path + '.tmp')
+    os.replace(path + '.tmp', path)
@@ -5,20 +5,20 @@ CLI module for LabMateAI.
 
 This module provides the CLI class, which handles user interactions
 and provides tool recommendations based on user input.
+
+Heavy dependencies (pandas, scikit-learn, networkx, alembic) are imported where they are
+first used, so importing this module and showing the login prompt stay fast.
 """
 
+import atexit
+import copy
 import os
 import sys
 import logging
 from datetime import datetime
 from dotenv import load_dotenv
 from importlib import resources
-from alembic import command
-from alembic.config import Config
-import pandas as pd
-
-# Set up logging
-logging.basicConfig(level=logging.DEBUG)
+from . import metrics
 
 # Load environment variables
 load_dotenv()
@@ -49,6 +49,18 @@ class CLI:
         self.cf_recommender = None
         self.hybrid_recommender = None
         self.data_loaded = False
+        # Tool tree indexing self.tools for keyword search, built on first search
+        self._search_tree = None
+        self._search_tree_tools = None
+        self._search_index = None
+        # Write-behind interaction sink, created on the first interaction if enabled
+        self._interaction_sink = None
+        # Holder rebuilding the recommenders in the background, if LABMATEAI_REFRESH_INTERVAL is set
+        self._model_holder = None
+
+        # Initialize the database engine and session
+        self.engine = self._get_engine()
+        self.Session = self._get_session_maker()
 
         # Initialize the database migrations
         if not self.testing:
@@ -56,10 +68,6 @@ class CLI:
         else:
             logging.info("Skipping migrations during testing.")
 
-        # Initialize the database engine and session
-        self.engine = self._get_engine()
-        self.Session = self._get_session_maker()
-
     def _get_engine(self):
         """
         Lazily imports and returns the SQLAlchemy engine.
@@ -79,12 +87,18 @@ class CLI:
     def _run_migrations(self):
         """
         Runs Alembic migrations to ensure the database schema is up-to-date.
+
+        The upgrade is skipped when the database is already at the head revision, so a
+        launch against a current schema does not load the migration environment.
         """
         if self.testing:
             # Skip migrations during testing
             logging.info("Skipping migrations during testing.")
             return
 
+        from alembic import command
+        from alembic.config import Config
+
         try:
             # Locate alembic.ini within the labmateai package
             with resources.path('labmateai', 'alembic.ini') as alembic_ini_path:
@@ -96,6 +110,10 @@ class CLI:
                 # Set the sqlalchemy.url in Alembic configuration to the DATABASE_URL
                 alembic_cfg.set_main_option('sqlalchemy.url', self._construct_database_url())
 
+                if self._schema_is_current(alembic_cfg):
+                    logging.info("Database schema is up to date. Skipping Alembic migrations.")
+                    return
+
                 # Run migrations
                 logging.info("Running Alembic migrations...")
                 command.upgrade(alembic_cfg, "head")
@@ -105,6 +123,24 @@ class CLI:
             print("Migration failed. Please check the logs for more details.")
             sys.exit(1)
 
+    def _schema_is_current(self, alembic_cfg):
+        """
+        Checks whether the database is at the head revision of the migration scripts.
+
+        Args:
+            alembic_cfg (alembic.config.Config): The Alembic configuration.
+
+        Returns:
+            bool: True if the stored revisions equal the script heads, False otherwise.
+        """
+        from alembic.runtime.migration import MigrationContext
+        from alembic.script import ScriptDirectory
+
+        heads = set(ScriptDirectory.from_config(alembic_cfg).get_heads())
+        with self.engine.connect() as connection:
+            current = set(MigrationContext.configure(connection).get_current_heads())
+        return current == heads
+
     def _construct_database_url(self):
         """
         Constructs the DATABASE_URL from individual components.
@@ -164,7 +200,12 @@ class CLI:
 
     def _log_interaction(self, user_id, tool_id, rating=None, usage_frequency=None):
         """
-        Logs an interaction into the interactions table.
+        Logs an interaction into the interactions table and, if it carries a rating,
+        applies it to the collaborative recommender in place.
+
+        If the LABMATEAI_WRITE_BEHIND environment variable is set, the interaction is queued
+        on a write-behind sink that writes interactions in batches, instead of being committed
+        on its own.
 
         Args:
             user_id (int): The ID of the user.
@@ -175,23 +216,54 @@ class CLI:
         # Import models here to avoid module-level imports
         from .models import Interaction
 
-        session = self.Session()
-        try:
-            interaction = Interaction(
-                user_id=user_id,
-                tool_id=tool_id,
-                rating=rating,
-                usage_frequency=usage_frequency,
-                timestamp=datetime.now()
-            )
-            session.add(interaction)
-            session.commit()
-            print("Thank you for your interaction!")
-        except Exception as e:
-            logging.error("Failed to log interaction: %s", e)
-            print("An error occurred while logging your interaction. Please try again.")
-        finally:
-            session.close()
+        sink = self._get_interaction_sink()
+        if sink is not None:
+            try:
+                sink.submit(user_id, tool_id, rating=rating, usage_frequency=usage_frequency)
+                print("Thank you for your interaction!")
+            except RuntimeError as e:
+                logging.error("Failed to log interaction: %s", e)
+                print("An error occurred while logging your interaction. Please try again.")
+                return
+        else:
+            session = self.Session()
+            try:
+                interaction = Interaction(
+                    user_id=user_id,
+                    tool_id=tool_id,
+                    rating=rating,
+                    usage_frequency=usage_frequency,
+                    timestamp=datetime.now()
+                )
+                session.add(interaction)
+                session.commit()
+                print("Thank you for your interaction!")
+            except Exception as e:
+                logging.error("Failed to log interaction: %s", e)
+                print("An error occurred while logging your interaction. Please try again.")
+                return
+            finally:
+                session.close()
+
+        # Make the rating visible to the next collaborative recommendation without a rebuild
+        if rating is not None and self.cf_recommender is not None:
+            try:
+                self.cf_recommender.update_interactions([user_id], [tool_id], [rating])
+            except ValueError as e:
+                logging.warning("Failed to apply interaction to the recommender: %s", e)
+
+    def _get_interaction_sink(self):
+        """
+        Returns the write-behind interaction sink, creating it on first use.
+
+        Returns:
+            InteractionSink: The sink, or None if LABMATEAI_WRITE_BEHIND is not set.
+        """
+        write_behind = os.getenv('LABMATEAI_WRITE_BEHIND', '').lower() in ('1', 'true', 'yes')
+        if self._interaction_sink is None and write_behind:
+            from .interaction_sink import InteractionSink
+            self._interaction_sink = InteractionSink(self.engine)
+        return self._interaction_sink
 
     def _get_number_of_recommendations(self):
         """
@@ -213,120 +285,15 @@ class CLI:
     def _load_data_and_initialize_recommenders(self):
         """
         Loads data and initializes the recommenders.
+
+        If the LABMATEAI_SNAPSHOT_DIR environment variable is set, the recommenders are restored
+        from the snapshot in that directory when it matches the current data, and a new snapshot
+        is saved there after a rebuild.
         """
         if not self.data_loaded:
             try:
-                # Import models and recommender classes here
-                from .models import Tool as ToolModel, Interaction
-                from .recommenders.content_based_recommender import ContentBasedRecommender, build_user_item_matrix
-                from .recommenders.collaborative_recommender import CollaborativeRecommender
-                from .recommenders.hybrid_recommender import HybridRecommender
-                from .tool import Tool as CustomTool
-
                 session = self.Session()
-
-                # Load tools from the tools table
-                tools_data = session.query(ToolModel).all()
-                if not tools_data:
-                    raise RuntimeError("No tools found in the database.")
-
-                self.tools = []
-                for tool in tools_data:
-                    # Debugging: Check the type and content of tool.features
-                    logging.debug(
-                        f"Tool ID: {tool.tool_id}, Features: {tool.features}, Type: {type(tool.features)}")
-
-                    if isinstance(tool.features, list):
-                        # features is already a list
-                        features_processed = [feature.strip().lower()
-                                              for feature in tool.features if feature.strip()]
-                    elif isinstance(tool.features, str):
-                        # Assuming features are stored as "{feature1, feature2, feature3}"
-                        # Remove curly braces and split by comma
-                        features_cleaned = tool.features.strip('{}')
-                        features_split = [
-                            feature.strip() for feature in features_cleaned.split(',') if feature.strip()]
-                        features_processed = [feature.lower()
-                                              for feature in features_split]
-                    else:
-                        logging.warning(
-                            f"Unexpected type for features in tool ID {tool.tool_id}. Skipping this tool.")
-                        continue  # Skip this tool if features are not in expected format
-
-                    custom_tool = CustomTool(
-                        tool_id=tool.tool_id,
-                        name=tool.name,
-                        category=tool.category,
-                        features=tuple(features_processed),
-                        cost=tool.cost,
-                        description=tool.description,
-                        url=tool.url,
-                        language=tool.language,
-                        platform=tool.platform
-                    )
-                    self.tools.append(custom_tool)
-
-                # Initialize the Recommender for content-based recommendations
-                self.recommender = ContentBasedRecommender(tools=self.tools)
-
-                # Load user-item interactions from the database
-                interactions_data = session.query(Interaction).filter(
-                    Interaction.rating.isnot(None)).all()
-
-                if interactions_data:
-                    interactions = pd.DataFrame([{
-                        'user_id': interaction.user_id,
-                        'tool_id': interaction.tool_id,
-                        'rating': interaction.rating
-                    } for interaction in interactions_data])
-
-                    logging.debug("Interactions DataFrame: \n%s", interactions)
-
-                    # Build user-item matrix
-                    if not interactions.empty:
-                        user_item_matrix = build_user_item_matrix(interactions)
-                        logging.debug("User-item matrix: \n%s", user_item_matrix)
-
-                        # Initialize Collaborative Filtering Recommender
-                        if not user_item_matrix.empty:
-                            tools_df = pd.DataFrame([{
-                                'tool_id': tool.tool_id,
-                                'name': tool.name,
-                                'category': tool.category,
-                                'features': tool.features,
-                                'cost': tool.cost,
-                                'description': tool.description,
-                                'url': tool.url,
-                                'language': tool.language,
-                                'platform': tool.platform
-                            } for tool in tools_data])
-
-                            self.cf_recommender = CollaborativeRecommender(
-                                user_item_matrix=user_item_matrix,
-                                tools_df=tools_df,
-                                n_neighbors=5
-                            )
-
-                            # Initialize Hybrid Recommender
-                            self.hybrid_recommender = HybridRecommender(
-                                content_recommender=self.recommender,
-                                collaborative_recommender=self.cf_recommender,
-                                alpha=0.5
-                            )
-                        else:
-                            logging.warning(
-                                "User-item matrix is empty. Collaborative filtering will not be available.")
-                            self.cf_recommender = None
-                            self.hybrid_recommender = None
-                    else:
-                        logging.warning(
-                            "Interactions DataFrame is empty. Collaborative filtering will not be available.")
-                        self.cf_recommender = None
-                        self.hybrid_recommender = None
-                else:
-                    logging.warning("No interactions found in the database.")
-                    self.cf_recommender = None
-                    self.hybrid_recommender = None
+                self._load_recommenders(session)
 
                 # Mark data as loaded
                 self.data_loaded = True
@@ -343,6 +310,410 @@ class CLI:
                     "Failed to initialize the application. Please ensure the database is set up correctly.")
                 sys.exit(1)
 
+    def _load_recommenders(self, session):
+        """
+        Loads the recommenders, from the snapshot in LABMATEAI_SNAPSHOT_DIR if it is set.
+
+        Args:
+            session (Session): The database session.
+        """
+        snapshot_dir = os.getenv('LABMATEAI_SNAPSHOT_DIR')
+        if snapshot_dir:
+            self._initialize_from_snapshot(session, snapshot_dir)
+        else:
+            self._build_recommenders(session)
+
+    def _build_model(self):
+        """
+        Loads a new set of recommenders without replacing the ones this CLI serves.
+
+        The recommenders are loaded into a shallow copy of the CLI, which shares its engine and
+        session factory, so this can run on the model holder's thread while the menu is in use.
+
+        Returns:
+            RecommenderModel: The new recommenders.
+        """
+        from .model_holder import RecommenderModel
+
+        builder = copy.copy(self)
+        session = self.Session()
+        try:
+            builder._load_recommenders(session)
+        finally:
+            session.close()
+        return RecommenderModel.build(builder.recommender, builder.cf_recommender, builder.hybrid_recommender)
+
+    def _start_model_refresh(self):
+        """
+        Starts rebuilding the recommenders in the background if LABMATEAI_REFRESH_INTERVAL is set.
+        """
+        from .model_holder import ModelHolder, RecommenderModel, get_refresh_interval
+
+        refresh_interval = get_refresh_interval()
+        if refresh_interval is None or self._model_holder is not None:
+            return
+        model = RecommenderModel.build(self.recommender, self.cf_recommender, self.hybrid_recommender)
+        self._model_holder = ModelHolder(self._build_model, refresh_interval=refresh_interval, model=model)
+        self._model_holder.start()
+        logging.info("Rebuilding the recommenders every %s seconds.", refresh_interval)
+
+    def _swap_model(self):
+        """
+        Installs the model holder's current recommenders if a rebuild has replaced them.
+        """
+        if self._model_holder is None:
+            return
+        model = self._model_holder.get()
+        if model.content is self.recommender:
+            return
+        self.recommender = model.content
+        self.cf_recommender = model.collaborative
+        self.hybrid_recommender = model.hybrid
+        self.tools = model.content.tools
+        # Reuse the search tree and index built with the model
+        self._search_tree, self._search_tree_tools = model.tree, self.tools
+        self._search_index = (model.tree, model.search_index)
+        logging.info("Switched to rebuilt recommenders.")
+
+    def _initialize_from_snapshot(self, session, snapshot_dir):
+        """
+        Restores the recommenders from a snapshot, rebuilding and saving one if it is missing or stale.
+
+        A snapshot of the current tools that only lacks the newest interactions is brought up to date
+        by merging the interactions above its high-water mark, then saved again with the new mark.
+
+        Args:
+            session (Session): The database session.
+            snapshot_dir (str): The snapshot directory.
+        """
+        from .snapshot import load_snapshot_for_sync, save_snapshot
+
+        fingerprint = self._data_fingerprint(session)
+        snapshot = load_snapshot_for_sync(snapshot_dir, fingerprint)
+        if snapshot is None:
+            self._build_recommenders(session)
+        else:
+            content_recommender, collaborative_recommender, high_water_mark = snapshot
+            if high_water_mark == fingerprint['max_interaction_id']:
+                self._use_recommenders(content_recommender, collaborative_recommender)
+                return
+            if self._merge_new_interactions(session, collaborative_recommender, high_water_mark):
+                self._use_recommenders(content_recommender, collaborative_recommender)
+            else:
+                self._build_recommenders(session)
+
+        try:
+            save_snapshot(snapshot_dir, fingerprint, self.recommender, self.cf_recommender)
+        except (OSError, ValueError) as e:
+            logging.warning("Failed to save recommender snapshot: %s", e)
+
+    def _use_recommenders(self, content_recommender, collaborative_recommender):
+        """
+        Installs restored recommenders, combining them into a hybrid recommender when there is
+        a collaborative one.
+
+        Args:
+            content_recommender (ContentBasedRecommender): The content-based recommender.
+            collaborative_recommender (CollaborativeRecommender): The collaborative recommender, or None.
+        """
+        from .recommenders.hybrid_recommender import HybridRecommender
+
+        self.recommender, self.cf_recommender = content_recommender, collaborative_recommender
+        self.tools = self.recommender.tools
+        self.hybrid_recommender = HybridRecommender(
+            content_recommender=self.recommender,
+            collaborative_recommender=self.cf_recommender,
+            alpha=0.5
+        ) if self.cf_recommender is not None else None
+
+    def _merge_new_interactions(self, session, collaborative_recommender, high_water_mark):
+        """
+        Applies the interactions above a snapshot's high-water mark to its collaborative recommender.
+
+        Args:
+            session (Session): The database session.
+            collaborative_recommender (CollaborativeRecommender): The snapshot's collaborative
+                recommender, or None if the snapshot has none.
+            high_water_mark (int): The highest interaction_id already in the snapshot.
+
+        Returns:
+            bool: True if the interactions were merged, False if the recommenders must be rebuilt.
+        """
+        from .models import Interaction
+
+        if collaborative_recommender is None or high_water_mark is None:
+            return False
+
+        new_interactions = session.query(
+            Interaction.user_id, Interaction.tool_id, Interaction.rating
+        ).filter(Interaction.interaction_id > high_water_mark).all()
+        if new_interactions:
+            user_ids, tool_ids, ratings = zip(*new_interactions)
+            try:
+                collaborative_recommender.update_interactions(user_ids, tool_ids, ratings)
+            except ValueError as e:
+                logging.warning("Failed to merge new interactions into the snapshot: %s", e)
+                return False
+        logging.info("Merged %d new interactions into the recommender snapshot.", len(new_interactions))
+        return True
+
+    def _data_fingerprint(self, session):
+        """
+        Computes the snapshot fingerprint of the tools and interactions in the database.
+
+        Args:
+            session (Session): The database session.
+
+        Returns:
+            dict: The data fingerprint.
+        """
+        from sqlalchemy import func
+        from .models import Tool as ToolModel, Interaction
+        from .snapshot import compute_fingerprint
+
+        max_interaction_id = session.query(func.max(Interaction.interaction_id)).scalar()
+        tool_count = session.query(func.count(ToolModel.tool_id)).scalar()
+        return compute_fingerprint(max_interaction_id, tool_count)
+
+    def _build_recommenders(self, session):
+        """
+        Loads tools and interactions and builds the recommenders.
+
+        If the LABMATEAI_CACHE_DIR environment variable names a local cache that matches the
+        current data, tools and interactions are read from the cache instead of the database.
+
+        Args:
+            session (Session): The database session.
+
+        Raises:
+            RuntimeError: If there are no tools in the database.
+        """
+        # Import pandas and recommender classes here
+        import pandas as pd
+        from .recommenders.collaborative_recommender import CollaborativeRecommender
+        from .recommenders.content_based_recommender import ContentBasedRecommender
+        from .recommenders.hybrid_recommender import HybridRecommender
+
+        cache_dir = os.getenv('LABMATEAI_CACHE_DIR')
+        loaded = self._load_from_cache(session, cache_dir) if cache_dir else None
+        if loaded is None:
+            loaded = self._load_from_database(session)
+        tool_records, ratings = loaded
+
+        # Initialize the Recommender for content-based recommendations
+        self.recommender = ContentBasedRecommender(tools=self.tools)
+
+        if ratings is not None:
+            user_item_matrix, user_ids, tool_ids, rating_counts = ratings
+            logging.debug("User-item matrix: %d users x %d tools, %d ratings",
+                          user_item_matrix.shape[0], user_item_matrix.shape[1], user_item_matrix.nnz)
+
+            # Initialize Collaborative Filtering Recommender
+            if user_item_matrix.nnz:
+                with metrics.timer('cli_tools_dataframe_seconds'):
+                    tools_df = pd.DataFrame([{
+                        'tool_id': tool.tool_id,
+                        'name': tool.name,
+                        'category': tool.category,
+                        'features': tool.features,
+                        'cost': tool.cost,
+                        'description': tool.description,
+                        'url': tool.url,
+                        'language': tool.language,
+                        'platform': tool.platform
+                    } for tool in tool_records])
+
+                self.cf_recommender = CollaborativeRecommender(
+                    user_item_matrix=user_item_matrix,
+                    tools_df=tools_df,
+                    n_neighbors=5,
+                    user_ids=user_ids,
+                    tool_ids=tool_ids,
+                    rating_counts=rating_counts
+                )
+
+                # Initialize Hybrid Recommender
+                self.hybrid_recommender = HybridRecommender(
+                    content_recommender=self.recommender,
+                    collaborative_recommender=self.cf_recommender,
+                    alpha=0.5
+                )
+            else:
+                logging.warning(
+                    "User-item matrix is empty. Collaborative filtering will not be available.")
+                self.cf_recommender = None
+                self.hybrid_recommender = None
+        else:
+            logging.warning("No interactions found in the database.")
+            self.cf_recommender = None
+            self.hybrid_recommender = None
+
+    @metrics.timed('cli_database_load_seconds')
+    def _load_from_database(self, session):
+        """
+        Loads the tools into self.tools and builds the user-item matrix from the database.
+
+        Args:
+            session (Session): The database session.
+
+        Ratings are read from the user_tool_ratings summary table, one row per rated
+        (user, tool) pair, rather than from every interaction.
+
+        Returns:
+            tuple: The tool rows and the rating tuple returned by build_sparse_user_item_matrix
+                with return_counts=True, or None if no interaction carries a rating.
+
+        Raises:
+            RuntimeError: If there are no tools in the database.
+        """
+        import numpy as np
+        from .models import Tool as ToolModel, UserToolRating
+        from .recommenders.content_based_recommender import build_sparse_user_item_matrix
+
+        # Load tools from the tools table
+        tools_data = session.query(ToolModel).all()
+        if not tools_data:
+            raise RuntimeError("No tools found in the database.")
+        self.tools = self._tools_from_models(tools_data)
+
+        # Load the rating aggregate of every rated user-item pair
+        ratings_data = session.query(
+            UserToolRating.user_id, UserToolRating.tool_id,
+            UserToolRating.rating_sum, UserToolRating.rating_count
+        ).all()
+        if not ratings_data:
+            return tools_data, None
+
+        # Build a sparse user-item matrix from the per-pair means, weighted by their counts
+        user_ids, tool_ids, rating_sums, rating_counts = (np.array(column) for column in zip(*ratings_data))
+        return tools_data, build_sparse_user_item_matrix(
+            user_ids, tool_ids, rating_sums / rating_counts,
+            return_counts=True, counts=rating_counts
+        )
+
+    @metrics.timed('cli_cache_load_seconds')
+    def _load_from_cache(self, session, cache_dir):
+        """
+        Loads the tools into self.tools and builds the user-item matrix from the local cache.
+
+        Args:
+            session (Session): The database session, used to check that the cache is fresh.
+            cache_dir (str): The cache directory.
+
+        Returns:
+            tuple: The tools and the rating tuple, as returned by _load_from_database, or None
+                if the cache is stale, unreadable or pyarrow is not installed.
+
+        Raises:
+            RuntimeError: If there are no tools in the cache.
+        """
+        from . import cache
+        from .recommenders.content_based_recommender import build_sparse_user_item_matrix_from_chunks
+
+        try:
+            if not cache.is_fresh(cache_dir, self._data_fingerprint(session)):
+                logging.info("Local cache in %s is missing or stale. Loading from the database.", cache_dir)
+                return None
+            tools = cache.read_tools(cache_dir)
+            ratings = build_sparse_user_item_matrix_from_chunks(
+                cache.read_interaction_chunks(cache_dir), return_counts=True)
+        except (ImportError, OSError, ValueError) as e:
+            logging.warning("Failed to read the local cache: %s", e)
+            return None
+
+        if not tools:
+            raise RuntimeError("No tools found in the database.")
+        self.tools = tools
+        logging.info("Loaded %d tools and %d ratings from the local cache in %s.",
+                     len(tools), ratings[0].nnz, cache_dir)
+        return tools, ratings if ratings[0].shape[0] else None
+
+    def _tools_from_models(self, tools_data):
+        """
+        Converts tool rows into Tool objects with lowercase feature tuples.
+
+        Tools whose features are neither a list nor a '{feature1, feature2}' string are skipped.
+
+        Args:
+            tools_data (list): The rows of the tools table.
+
+        Returns:
+            list: The Tool objects.
+        """
+        from .tool import Tool as CustomTool
+
+        tools = []
+        for tool in tools_data:
+            # Debugging: Check the type and content of tool.features
+            logging.debug(
+                f"Tool ID: {tool.tool_id}, Features: {tool.features}, Type: {type(tool.features)}")
+
+            if isinstance(tool.features, list):
+                # features is already a list
+                features_processed = [feature.strip().lower()
+                                      for feature in tool.features if feature.strip()]
+            elif isinstance(tool.features, str):
+                # Assuming features are stored as "{feature1, feature2, feature3}"
+                # Remove curly braces and split by comma
+                features_cleaned = tool.features.strip('{}')
+                features_split = [
+                    feature.strip() for feature in features_cleaned.split(',') if feature.strip()]
+                features_processed = [feature.lower()
+                                      for feature in features_split]
+            else:
+                logging.warning(
+                    f"Unexpected type for features in tool ID {tool.tool_id}. Skipping this tool.")
+                continue  # Skip this tool if features are not in expected format
+
+            tools.append(CustomTool(
+                tool_id=tool.tool_id,
+                name=tool.name,
+                category=tool.category,
+                features=tuple(features_processed),
+                cost=tool.cost,
+                description=tool.description,
+                url=tool.url,
+                language=tool.language,
+                platform=tool.platform
+            ))
+        return tools
+
+    def refresh_cache(self, cache_dir):
+        """
+        Rebuilds the local cache of the tools, users and interactions tables.
+
+        The fingerprint is taken before the tables are read, so interactions added meanwhile
+        leave the new cache stale rather than wrongly fresh.
+
+        Args:
+            cache_dir (str): The cache directory.
+
+        Returns:
+            int: The number of interactions written to the cache.
+
+        Raises:
+            ImportError: If pyarrow is not installed.
+        """
+        from . import cache
+        from .data_loader import stream_interactions
+        from .models import Tool as ToolModel, User
+
+        session = self.Session()
+        try:
+            fingerprint = self._data_fingerprint(session)
+            tools = self._tools_from_models(session.query(ToolModel).all())
+            users = [{column: getattr(user, column) for column in cache.USER_COLUMNS}
+                     for user in session.query(User).all()]
+        finally:
+            session.close()
+
+        raw_connection = self.engine.raw_connection()
+        try:
+            return cache.write_cache(cache_dir, fingerprint, tools, users,
+                                     stream_interactions(raw_connection.dbapi_connection, use_cache=False))
+        finally:
+            raw_connection.close()
+
     def _prompt_rating(self, recommendations, user_id):
         """
         Prompts the user to rate any of the recommended tools.
@@ -438,20 +809,60 @@ class CLI:
             logging.error("Error during recommending category tools: %s", e)
             print("An error occurred while fetching recommendations. Please try again.")
 
+    def _get_search_tree(self):
+        """
+        Returns a tool tree whose keyword index covers self.tools.
+
+        The content-based recommender's tree is reused when it was built from self.tools;
+        otherwise a tree is built once and kept until self.tools is replaced.
+
+        Returns:
+            ToolTree: The tool tree to search.
+        """
+        from .tree import ToolTree
+
+        recommender_tree = getattr(self.recommender, 'tree', None)
+        if (isinstance(recommender_tree, ToolTree) and self.recommender.tools is self.tools
+                and len(recommender_tree.tools) == len(self.tools)):
+            return recommender_tree
+
+        if self._search_tree is None or self._search_tree_tools is not self.tools:
+            tree = ToolTree()
+            tree.build_tree(self.tools)
+            self._search_tree, self._search_tree_tools = tree, self.tools
+        return self._search_tree
+
+    def _get_search_index(self, tree):
+        """
+        Returns the BM25 search index over a tool tree, rebuilding it when the tree changes.
+
+        Args:
+            tree (ToolTree): The tool tree to index.
+
+        Returns:
+            ToolSearchIndex: The search index.
+        """
+        from .search import ToolSearchIndex
+
+        if self._search_index is None or self._search_index[0] is not tree:
+            self._search_index = (tree, ToolSearchIndex.from_tree(tree))
+        return self._search_index[1]
+
     def handle_search_tools(self, user_id):
         """
         Handles searching for tools based on a keyword.
+
+        Tools are ranked by BM25 over their names, categories, features and descriptions.
+        Remaining slots are filled with partial matches from the tool tree's keyword index.
         """
+        from .search import search_tools
+
         try:
             keyword = input(
                 "Enter a keyword to search for tools: ").strip().lower()
             num_recommendations = self._get_number_of_recommendations()
-            recommendations = [
-                tool for tool in self.tools if keyword in tool.name.lower() or keyword in tool.description.lower()
-            ]
-
-            # Limit the number of recommendations
-            recommendations = recommendations[:num_recommendations]
+            tree = self._get_search_tree()
+            recommendations = search_tools(self._get_search_index(tree), tree, keyword, num_recommendations)
 
             if recommendations:
                 print("\nSearch Results:")
@@ -472,8 +883,11 @@ class CLI:
         """
         user_id = self._get_or_create_user()
         self._load_data_and_initialize_recommenders()
+        self._start_model_refresh()
 
         while True:
+            # Swap in rebuilt recommenders between menu actions, never during one
+            self._swap_model()
             print("\n--- LabMateAI Tool Recommender ---")
             print("Please select an option:")
             print("1. Recommend similar tools")
@@ -490,6 +904,14 @@ class CLI:
             elif choice == '3':
                 self.handle_search_tools(user_id)
             elif choice == '4':
+                if self._interaction_sink is not None:
+                    try:
+                        self._interaction_sink.close()
+                    except RuntimeError as e:
+                        logging.error("%s", e)
+                        print("Some of your interactions could not be saved. Please check the logs for details.")
+                if self._model_holder is not None:
+                    self._model_holder.close()
                 print("Exiting LabMateAI. Goodbye!")
                 sys.exit(0)
             else:
@@ -497,6 +919,43 @@ class CLI:
 
 
 def main():
+    """
+    Runs the interactive CLI, or a maintenance command given on the command line.
+
+    Set LABMATEAI_METRICS_FILE to write the session's metrics to that file on exit.
+
+    Commands:
+        labmateai cache refresh [--dir DIR]: Rebuild the local cache, by default in LABMATEAI_CACHE_DIR.
+    """
+    # Set up logging
+    logging.basicConfig(level=logging.DEBUG)
+
+    args = sys.argv[1:]
+    if args[:1] == ['cache']:
+        import argparse
+
+        parser = argparse.ArgumentParser(prog='labmateai')
+        subparsers = parser.add_subparsers(dest='command', required=True)
+        cache_parser = subparsers.add_parser('cache', help='Manage the local columnar cache.')
+        cache_subparsers = cache_parser.add_subparsers(dest='action', required=True)
+        refresh_parser = cache_subparsers.add_parser('refresh', help='Rebuild the cache from the database.')
+        refresh_parser.add_argument('--dir', default=os.getenv('LABMATEAI_CACHE_DIR'),
+                                    help='Cache directory. Defaults to LABMATEAI_CACHE_DIR.')
+        options = parser.parse_args(args)
+        if not options.dir:
+            parser.error("No cache directory given. Use --dir or set LABMATEAI_CACHE_DIR.")
+
+        interaction_count = CLI().refresh_cache(options.dir)
+        print(f"Cached {interaction_count} interactions in {options.dir}.")
+        return
+
+    # LABMATEAI_METRICS may come from the .env file, which is loaded after the metrics module
+    metrics.enable_from_environment()
+    metrics_file = os.getenv('LABMATEAI_METRICS_FILE')
+    if metrics_file:
+        metrics.enable()
+        atexit.register(metrics.write, metrics_file)
+
     cli = CLI()
     cli.start()
 
@@ -3,12 +3,30 @@
 """
 This module contains functions for loading tool, user, and interaction data from the PostgreSQL database.
 It ensures that each Tool instance includes a unique tool_id and handles data validation.
+
+load_all reads all three tables through one pooled connection in a single read-only snapshot,
+so the tools, users and interactions it returns are consistent with each other.
+
+stream_interactions reads the interactions through a server-side cursor and yields them as
+columnar numpy chunks, so large tables are never held as one Python object per row.
+
+If the LABMATEAI_CACHE_DIR environment variable names a local cache (see the cache module) that
+matches the database, the tools, the users and the full interaction stream are read from the
+cache instead. The cache holds no interaction IDs or usage frequencies, so
+load_interactions_from_db, the interactions of load_all and streams above a high-water mark
+always come from the database.
 """
 
+import dataclasses
+import logging
 import os
+import sqlite3
+from typing import NamedTuple
+import numpy as np
 import psycopg2
 from psycopg2 import sql
 from dotenv import load_dotenv
+from . import metrics
 from .tool import Tool
 
 # Load environment variables from .env file in development
@@ -17,10 +35,194 @@ load_dotenv()
 # Database connection string (Pulled from environment variables)
 DATABASE_URL = os.getenv('DATABASE_URL')
 
+TOOLS_QUERY = """
+    SELECT tool_id, name, category, features, cost, description, url, language, platform
+    FROM tools;
+"""
+
+USERS_QUERY = """
+    SELECT user_id, user_name, email, department, role
+    FROM users;
+"""
+
+INTERACTIONS_QUERY = """
+    SELECT interaction_id, user_id, tool_id, rating, usage_frequency, timestamp
+    FROM interactions;
+"""
+
+INTERACTION_COLUMNS_QUERY = """
+    SELECT user_id, tool_id, rating, timestamp
+    FROM interactions;
+"""
+
+# The data fingerprint a local cache is checked against, as snapshot.compute_fingerprint takes it
+FINGERPRINT_QUERY = """
+    SELECT (SELECT MAX(interaction_id) FROM interactions), (SELECT COUNT(*) FROM tools);
+"""
+
+# Interactions above a high-water mark; {placeholder} is the driver's parameter marker
+INTERACTION_COLUMNS_AFTER_QUERY = """
+    SELECT user_id, tool_id, rating, timestamp
+    FROM interactions
+    WHERE interaction_id > {placeholder};
+"""
+
+# Default number of rows fetched per round trip, and per chunk, when streaming interactions
+DEFAULT_ITERSIZE = 100000
+
+# Name of the server-side cursor used to stream interactions from PostgreSQL
+STREAM_CURSOR_NAME = 'labmateai_interactions_stream'
+
+
+class InteractionChunk(NamedTuple):
+    """
+    A batch of interactions held column by column.
+
+    Attributes:
+        user_id (np.ndarray): int64 user IDs.
+        tool_id (np.ndarray): int64 tool IDs.
+        rating (np.ndarray): float64 ratings, NaN where an interaction has no rating.
+        timestamp (np.ndarray): datetime64[us] timestamps, NaT where missing.
+    """
+    user_id: np.ndarray
+    tool_id: np.ndarray
+    rating: np.ndarray
+    timestamp: np.ndarray
+
+
+def _tool_from_row(row):
+    """
+    Creates a Tool instance from a row of TOOLS_QUERY.
+
+    Args:
+        row (tuple): The tool record.
+
+    Returns:
+        Tool: The tool, with its semicolon-separated features split into a lowercase list.
+    """
+    tool_id, name, category, features, cost, description, url, language, platform = row
+
+    # Convert features string to list
+    features_list = [feature.strip().lower(
+    ) for feature in features.split(';') if feature.strip()]
+
+    return Tool(
+        tool_id=tool_id,
+        name=name,
+        category=category,
+        features=features_list,
+        cost=cost,
+        description=description,
+        url=url,
+        language=language,
+        platform=platform
+    )
+
+
+def _user_from_row(row):
+    """
+    Creates a user dictionary from a row of USERS_QUERY.
+
+    Args:
+        row (tuple): The user record.
+
+    Returns:
+        dict: The user.
+    """
+    user_id, user_name, email, department, role = row
+    return {
+        'user_id': user_id,
+        'user_name': user_name,
+        'email': email,
+        'department': department,
+        'role': role
+    }
+
+
+def _interaction_from_row(row):
+    """
+    Creates an interaction dictionary from a row of INTERACTIONS_QUERY.
+
+    Args:
+        row (tuple): The interaction record.
+
+    Returns:
+        dict: The interaction.
+    """
+    interaction_id, user_id, tool_id, rating, usage_frequency, timestamp = row
+    return {
+        'interaction_id': interaction_id,
+        'user_id': user_id,
+        'tool_id': tool_id,
+        'rating': rating,
+        'usage_frequency': usage_frequency,
+        'timestamp': timestamp
+    }
+
+
+def _read_cache(cursor, read):
+    """
+    Reads from the local cache in LABMATEAI_CACHE_DIR if it matches the database.
+
+    Args:
+        cursor: A cursor of the connection being loaded from, used to read the data fingerprint.
+        read (Callable[[str], object]): Reads the cache directory it is given.
+
+    Returns:
+        The result of read, or None if no cache is configured, the cache is stale, or it could
+            not be read, for example without pyarrow. The caller then loads from the database.
+    """
+    cache_dir = os.getenv('LABMATEAI_CACHE_DIR')
+    if not cache_dir:
+        return None
+
+    from . import cache
+    from .snapshot import compute_fingerprint
+
+    cursor.execute(FINGERPRINT_QUERY)
+    if not cache.is_fresh(cache_dir, compute_fingerprint(*cursor.fetchone())):
+        logging.info("Local cache in %s is missing or stale. Loading from the database.", cache_dir)
+        return None
+    try:
+        return read(cache_dir)
+    except (ImportError, OSError, ValueError) as e:
+        logging.warning("Failed to read the local cache: %s", e)
+        return None
+
+
+def _read_cached_tools(cache_dir):
+    """
+    Reads the cached tools, with features as lists like _tool_from_row gives them.
+
+    Args:
+        cache_dir (str): The cache directory.
+
+    Returns:
+        list: The Tool instances.
+    """
+    from . import cache
+
+    return [dataclasses.replace(tool, features=list(tool.features)) for tool in cache.read_tools(cache_dir)]
+
+
+def _read_cached_users(cache_dir):
+    """
+    Reads the cached users.
+
+    Args:
+        cache_dir (str): The cache directory.
+
+    Returns:
+        list: The user dictionaries.
+    """
+    from . import cache
+
+    return cache.read_users(cache_dir)
+
 
 def load_tools_from_db():
     """
-    Loads tools from the PostgreSQL database.
+    Loads tools from the PostgreSQL database, or from the local cache if it is fresh.
 
     Returns:
         list: A list of Tool instances.
@@ -34,37 +236,13 @@ def load_tools_from_db():
         # Establish a connection to the PostgreSQL database using a context manager
         with psycopg2.connect(DATABASE_URL) as conn:
             with conn.cursor() as cursor:
-                # Execute SQL query to get tool data
-                query = sql.SQL("""
-                    SELECT tool_id, name, category, features, cost, description, url, language, platform
-                    FROM tools;
-                """)
-                cursor.execute(query)
-
-                # Fetch all tool records
-                rows = cursor.fetchall()
-
-                # Iterate over each record and create Tool instances
-                for row in rows:
-                    tool_id, name, category, features, cost, description, url, language, platform = row
-
-                    # Convert features string to list
-                    features_list = [feature.strip().lower(
-                    ) for feature in features.split(';') if feature.strip()]
-
-                    # Create Tool instance
-                    tool = Tool(
-                        tool_id=tool_id,
-                        name=name,
-                        category=category,
-                        features=features_list,
-                        cost=cost,
-                        description=description,
-                        url=url,
-                        language=language,
-                        platform=platform
-                    )
-                    tools.append(tool)
+                tools = _read_cache(cursor, _read_cached_tools)
+                if tools is None:
+                    # Execute SQL query to get tool data
+                    cursor.execute(sql.SQL(TOOLS_QUERY))
+
+                    # Create a Tool instance from each record
+                    tools = [_tool_from_row(row) for row in cursor.fetchall()]
 
     except (Exception, psycopg2.DatabaseError) as e:
         raise RuntimeError(f"Error loading tools from the database:{e}") from e
@@ -74,7 +252,7 @@ def load_tools_from_db():
 
 def load_users_from_db():
     """
-    Loads user data from the PostgreSQL database.
+    Loads user data from the PostgreSQL database, or from the local cache if it is fresh.
 
     Returns:
         list: A list of dictionaries representing users.
@@ -88,27 +266,13 @@ def load_users_from_db():
         # Establish a connection to the PostgreSQL database using a context manager
         with psycopg2.connect(DATABASE_URL) as conn:
             with conn.cursor() as cursor:
-                # Execute SQL query to get user data
-                query = sql.SQL("""
-                    SELECT user_id, user_name, email, department, role
-                    FROM users;
-                """)
-                cursor.execute(query)
-
-                # Fetch all user records
-                rows = cursor.fetchall()
-
-                # Iterate over each record to create user dictionaries
-                for row in rows:
-                    user_id, user_name, email, department, role = row
-                    user = {
-                        'user_id': user_id,
-                        'user_name': user_name,
-                        'email': email,
-                        'department': department,
-                        'role': role
-                    }
-                    users.append(user)
+                users = _read_cache(cursor, _read_cached_users)
+                if users is None:
+                    # Execute SQL query to get user data
+                    cursor.execute(sql.SQL(USERS_QUERY))
+
+                    # Create a user dictionary from each record
+                    users = [_user_from_row(row) for row in cursor.fetchall()]
 
     except (Exception, psycopg2.DatabaseError) as e:
         raise RuntimeError(f"Error loading users from the database: {e}") from e
@@ -133,29 +297,209 @@ def load_interactions_from_db():
         with psycopg2.connect(DATABASE_URL) as conn:
             with conn.cursor() as cursor:
                 # Execute SQL query to get interaction data
-                query = sql.SQL("""
-                    SELECT interaction_id, user_id, tool_id, rating, usage_frequency, timestamp
-                    FROM interactions;
-                """)
-                cursor.execute(query)
-
-                # Fetch all interaction records
-                rows = cursor.fetchall()
-
-                # Iterate over each record to create interaction dictionaries
-                for row in rows:
-                    interaction_id, user_id, tool_id, rating, usage_frequency, timestamp = row
-                    interaction = {
-                        'interaction_id': interaction_id,
-                        'user_id': user_id,
-                        'tool_id': tool_id,
-                        'rating': rating,
-                        'usage_frequency': usage_frequency,
-                        'timestamp': timestamp
-                    }
-                    interactions.append(interaction)
+                cursor.execute(sql.SQL(INTERACTIONS_QUERY))
+
+                # Create an interaction dictionary from each record
+                interactions = [_interaction_from_row(row) for row in cursor.fetchall()]
 
     except (Exception, psycopg2.DatabaseError) as e:
         raise RuntimeError(f"Error loading interactions from the database: {e}") from e
 
     return interactions
+
+
+@metrics.timed('data_loader_load_all_seconds')
+def load_all(conn=None):
+    """
+    Loads tools, users and interactions in one read-only snapshot transaction.
+
+    All three queries run on a single connection inside one transaction, REPEATABLE READ on
+    PostgreSQL, so rows committed by other sessions during the load are not seen by the later
+    queries. The transaction is rolled back afterwards, as nothing is written. The tools and
+    users are read from the local cache instead if it matches the data in that snapshot.
+
+    Args:
+        conn (optional): An open psycopg2 or sqlite3 connection. Any transaction open on it is
+            rolled back first. If None, a connection is borrowed from the pool in labmateai_db
+            and returned to it afterwards. Defaults to None.
+
+    Returns:
+        tuple: (tools, users, interactions), as returned by load_tools_from_db,
+            load_users_from_db and load_interactions_from_db.
+
+    Raises:
+        RuntimeError: If there's an error connecting to the database or querying data.
+    """
+    pooled = conn is None
+    try:
+        if pooled:
+            from .labmateai_db import get_db_connection
+            conn = get_db_connection()
+
+        cursor = conn.cursor()
+        try:
+            _begin_read_only_snapshot(conn, cursor)
+
+            cached = _read_cache(cursor, lambda cache_dir: (
+                _read_cached_tools(cache_dir), _read_cached_users(cache_dir)))
+            if cached is None:
+                cursor.execute(TOOLS_QUERY)
+                tools = [_tool_from_row(row) for row in cursor.fetchall()]
+                cursor.execute(USERS_QUERY)
+                users = [_user_from_row(row) for row in cursor.fetchall()]
+            else:
+                tools, users = cached
+            cursor.execute(INTERACTIONS_QUERY)
+            interactions = [_interaction_from_row(row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+            conn.rollback()
+
+    except (Exception, psycopg2.DatabaseError) as e:
+        raise RuntimeError(f"Error loading data from the database: {e}") from e
+    finally:
+        if pooled and conn is not None:
+            from .labmateai_db import release_db_connection
+            release_db_connection(conn)
+
+    return tools, users, interactions
+
+
+def _begin_read_only_snapshot(conn, cursor):
+    """
+    Starts a read-only transaction whose reads all see the same snapshot.
+
+    Args:
+        conn: An open psycopg2 or sqlite3 connection.
+        cursor: A cursor of conn.
+    """
+    conn.rollback()
+    if isinstance(conn, sqlite3.Connection):
+        # SQLite transactions are serializable; the snapshot is taken at the first read
+        cursor.execute("BEGIN")
+    elif conn.autocommit:
+        cursor.execute("BEGIN ISOLATION LEVEL REPEATABLE READ READ ONLY")
+    else:
+        # psycopg2 opens the transaction implicitly; this must be its first statement
+        cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+
+
+def stream_interactions(conn=None, itersize=DEFAULT_ITERSIZE, after_interaction_id=None, use_cache=True):
+    """
+    Streams the interactions table as columnar chunks.
+
+    On PostgreSQL the rows are read through a named server-side cursor, so the server keeps the
+    result set and each round trip fetches itersize rows. Each batch is turned into numpy arrays
+    before the next is fetched, so memory is bounded by one batch of row tuples.
+
+    A stream of every interaction is read from the local cache instead if it matches the
+    database; its chunks are then the record batches the cache was written with.
+
+    Args:
+        conn (optional): An open psycopg2 or sqlite3 connection. Any transaction open on it is
+            rolled back first. If None, a connection is borrowed from the pool in labmateai_db
+            and returned to it once the stream is exhausted or closed. Defaults to None.
+        itersize (int, optional): Number of rows per fetch and per chunk. Defaults to DEFAULT_ITERSIZE.
+        after_interaction_id (int, optional): A high-water mark, such as the max_interaction_id of a
+            snapshot. Only interactions with a higher interaction_id are streamed. Defaults to None,
+            which streams every interaction.
+        use_cache (bool, optional): Whether a fresh local cache may be read instead of the
+            database. Defaults to True.
+
+    Yields:
+        InteractionChunk: The next batch of at most itersize interactions.
+
+    Raises:
+        ValueError: If itersize is less than 1.
+        RuntimeError: If there's an error connecting to the database or querying data.
+    """
+    if itersize < 1:
+        raise ValueError("itersize must be at least 1.")
+
+    pooled = conn is None
+    try:
+        if pooled:
+            from .labmateai_db import get_db_connection
+            conn = get_db_connection()
+
+        conn.rollback()
+        if use_cache and after_interaction_id is None and os.getenv('LABMATEAI_CACHE_DIR'):
+            fingerprint_cursor = conn.cursor()
+            try:
+                chunks = _read_cache(fingerprint_cursor, _read_cached_interaction_chunks)
+            finally:
+                fingerprint_cursor.close()
+                conn.rollback()
+            if chunks is not None:
+                for chunk in chunks:
+                    metrics.increment('data_loader_chunks_total')
+                    metrics.increment('data_loader_interactions_total', len(chunk.user_id))
+                    yield chunk
+                return
+
+        if isinstance(conn, sqlite3.Connection):
+            # SQLite cursors step through the result set lazily already
+            cursor = conn.cursor()
+            placeholder = '?'
+        else:
+            cursor = conn.cursor(name=STREAM_CURSOR_NAME)
+            cursor.itersize = itersize
+            placeholder = '%s'
+        try:
+            if after_interaction_id is None:
+                cursor.execute(INTERACTION_COLUMNS_QUERY)
+            else:
+                cursor.execute(INTERACTION_COLUMNS_AFTER_QUERY.format(placeholder=placeholder),
+                               (int(after_interaction_id),))
+            while True:
+                with metrics.timer('data_loader_fetch_seconds'):
+                    rows = cursor.fetchmany(itersize)
+                if not rows:
+                    break
+                metrics.increment('data_loader_chunks_total')
+                metrics.increment('data_loader_interactions_total', len(rows))
+                yield _chunk_from_rows(rows)
+        finally:
+            cursor.close()
+            conn.rollback()
+
+    except (Exception, psycopg2.DatabaseError) as e:
+        raise RuntimeError(f"Error streaming interactions from the database: {e}") from e
+    finally:
+        if pooled and conn is not None:
+            from .labmateai_db import release_db_connection
+            release_db_connection(conn)
+
+
+def _read_cached_interaction_chunks(cache_dir):
+    """
+    Opens the cached interactions.
+
+    Args:
+        cache_dir (str): The cache directory.
+
+    Returns:
+        Iterator[InteractionChunk]: The cached chunks.
+    """
+    from . import cache
+
+    return cache.read_interaction_chunks(cache_dir)
+
+
+def _chunk_from_rows(rows):
+    """
+    Converts rows of INTERACTION_COLUMNS_QUERY into an InteractionChunk.
+
+    Args:
+        rows (list): The (user_id, tool_id, rating, timestamp) records.
+
+    Returns:
+        InteractionChunk: The records as columns.
+    """
+    user_ids, tool_ids, ratings, timestamps = zip(*rows)
+    return InteractionChunk(
+        user_id=np.array(user_ids, dtype=np.int64),
+        tool_id=np.array(tool_ids, dtype=np.int64),
+        rating=np.array(ratings, dtype=np.float64),
+        timestamp=np.array(timestamps, dtype='datetime64[us]')
+    )
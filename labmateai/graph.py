@@ -10,11 +10,29 @@ Classes:
     Graph: A class representing a graph of tools, supporting various graph operations.
 """
 
+import math
 import networkx as nx
-from sklearn.feature_extraction.text import TfidfVectorizer
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from . import metrics
+from .ranking import top_k_columns
 from .tool import Tool
 
+# Minimum rounded similarity score required to connect two tools
+SIMILARITY_THRESHOLD = 0.2
+
+# Default number of neighbors kept per tool in the top-k neighbor index
+DEFAULT_TOP_K = 50
+
+# Upper bound on the number of cells in one dense similarity block (rows x tools)
+BLOCK_CELLS = 2 ** 22
+
+# IDF weight of a term that appears in only one of two documents when a smoothed
+# TF-IDF model is fitted on that pair alone: ln((1 + 2) / (1 + 1)) + 1
+_UNSHARED_TERM_IDF = math.log(1.5) + 1.0
+
 
 class Graph:
     """
@@ -22,15 +40,44 @@ class Graph:
     Supports directed and undirected graphs.
     """
 
-    def __init__(self, tools):
+    def __init__(self, tools, top_k=DEFAULT_TOP_K):
         """
         Initialize the graph.
+
+        Args:
+            tools (list): A list of Tool instances to build the graph from.
+            top_k (Optional[int]): Maximum number of neighbors kept per tool.
+                None keeps every neighbor above the similarity threshold.
+
+        Raises:
+            ValueError: If top_k is less than 1.
         """
+        if top_k is not None and top_k < 1:
+            raise ValueError("top_k must be at least 1.")
+
+        self.top_k = top_k
+        self.clear()
         self.tools = tools
-        self.graph = nx.Graph()
+
         if tools:  # Only build the graph if tools are provided
             self.build_graph(tools)
 
+    def clear(self):
+        """
+        Remove every node, edge and indexed neighbor, so the graph can be built again
+        from a different list of tools.
+        """
+        self.tools = []
+        self.graph = nx.Graph()
+        self.built = False
+
+        # Top-k neighbor index in CSR layout: the neighbors of tool i are
+        # neighbor_indices[neighbor_indptr[i]:neighbor_indptr[i + 1]], best first.
+        self.tool_positions = {}
+        self.neighbor_indptr = np.zeros(1, dtype=np.int64)
+        self.neighbor_indices = np.zeros(0, dtype=np.int32)
+        self.neighbor_weights = np.zeros(0, dtype=np.float64)
+
     def add_node(self, tool):
         """
         Add a tool (node) to the graph.
@@ -54,30 +101,270 @@ class Graph:
         if not self.graph.has_edge(tool1, tool2):
             self.graph.add_edge(tool1, tool2, weight=similarity)
 
-    def build_graph(self, tools):
+    @metrics.timed('graph_build_seconds')
+    def build_graph(self, tools, method='bulk'):
         """
         Build the graph from a list of tools using TF-IDF and cosine similarity.
 
+        Each tool keeps at most top_k neighbors above the similarity threshold in the
+        neighbor index, and the graph only holds edges to those neighbors.
+
         Args:
             tools (list): A list of Tool instances to be added to the graph.
+            method (str): 'bulk' scores every pair in vectorized blocks (default);
+                'pairwise' calls calculate_similarity for each pair of tools.
+
+        Raises:
+            ValueError: If method is not 'bulk' or 'pairwise'.
         """
+        if method not in ('bulk', 'pairwise'):
+            raise ValueError(f"Unknown build method '{method}'. Use 'bulk' or 'pairwise'.")
+
         # Add all tools as nodes
         for tool in tools:
             self.add_node(tool)
 
-        # Add edges based on similarity threshold
-        SIMILARITY_THRESHOLD = 0.2  # Adjust as needed
+        if method == 'pairwise':
+            blocks = self._pairwise_similarity_blocks(tools)
+        else:
+            blocks = self.similarity_blocks(tools)
+        self._build_neighbor_index(tools, blocks)
+        self._connect_indexed_neighbors(tools)
+        self.built = True
+
+    def load_neighbor_index(self, tools, neighbor_indptr, neighbor_indices, neighbor_weights):
+        """
+        Build the graph from a previously computed top-k neighbor index instead of
+        scoring the tools again.
+
+        Args:
+            tools (list): The Tool instances the index was built from, in the same order.
+            neighbor_indptr (np.ndarray): The neighbor_indptr array of the index.
+            neighbor_indices (np.ndarray): The neighbor_indices array of the index.
+            neighbor_weights (np.ndarray): The neighbor_weights array of the index.
 
+        Raises:
+            ValueError: If the index does not match the number of tools.
+        """
+        if len(neighbor_indptr) != len(tools) + 1 or len(neighbor_indices) != len(neighbor_weights):
+            raise ValueError("Neighbor index does not match the number of tools.")
+
+        for tool in tools:
+            self.add_node(tool)
+        self._set_neighbor_index(tools, neighbor_indptr, neighbor_indices, neighbor_weights)
+        self._connect_indexed_neighbors(tools)
+        self.built = True
+
+    def _connect_indexed_neighbors(self, tools):
+        """
+        Connect each tool to the neighbors kept in the index, in (i, j) order.
+
+        Args:
+            tools (list): The Tool instances the index was built from.
+        """
+        n = len(tools)
+        rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(self.neighbor_indptr))
+        cols = self.neighbor_indices.astype(np.int64)
+        lower, upper = np.minimum(rows, cols), np.maximum(rows, cols)
+        # Prefer the weight stored in the row of the lower index, as the pairwise build does
+        preference = np.argsort(rows != lower, kind='stable')
+        _, first = np.unique((lower * n + upper)[preference], return_index=True)
+        selected = preference[first]
+        for i, j, similarity in zip(lower[selected].tolist(), upper[selected].tolist(),
+                                    self.neighbor_weights[selected].tolist()):
+            self.add_edge(tools[i], tools[j], similarity)
+
+    def _pairwise_similarity_blocks(self, tools):
+        """
+        Score each pair of tools with calculate_similarity.
+
+        Args:
+            tools (list): A list of Tool instances.
+
+        Yields:
+            tuple: (0, scores) where scores is the full symmetric score matrix.
+        """
+        n = len(tools)
+        scores = np.zeros((n, n), dtype=np.float64)
         for i, tool1 in enumerate(tools):
-            for j, tool2 in enumerate(tools):
-                if i >= j:
-                    continue  # Avoid duplicate edges and self-loops
-                similarity = self.calculate_similarity(
-                    tool1, tool2)
-                if round(similarity, 2) >= SIMILARITY_THRESHOLD:
-                    self.add_edge(tool1, tool2, similarity)
-                # Debugging: Uncomment to print similarity values
-                # print(f"Similarity between {tool1.name} and {tool2.name}: {similarity:.2f}")
+            for j in range(i + 1, n):
+                scores[i, j] = scores[j, i] = self.calculate_similarity(tool1, tools[j])
+        yield 0, scores
+
+    def _build_neighbor_index(self, tools, blocks):
+        """
+        Keep the top-k neighbors above the similarity threshold for every tool.
+
+        Neighbors are ordered by descending similarity, ties by position in tools.
+
+        Args:
+            tools (list): A list of Tool instances.
+            blocks (iterable): (start, scores) row blocks of the similarity matrix.
+        """
+        n = len(tools)
+        k = n - 1 if self.top_k is None else min(self.top_k, n - 1)
+        counts = np.zeros(n, dtype=np.int64)
+        indices, weights = [], []
+
+        for start, block in blocks:
+            rows = np.arange(block.shape[0])
+            scores = np.where(np.round(block, 2) >= SIMILARITY_THRESHOLD, block, -np.inf)
+            scores[rows, rows + start] = -np.inf  # No self-loops
+            if k <= 0:
+                continue
+            candidates, candidate_scores = top_k_columns(scores, k)
+
+            valid = candidate_scores > -np.inf
+            counts[start:start + block.shape[0]] = valid.sum(axis=1)
+            indices.append(candidates[valid].astype(np.int32))
+            weights.append(candidate_scores[valid])
+
+        self._set_neighbor_index(
+            tools,
+            np.concatenate(([0], np.cumsum(counts))).astype(np.int64),
+            np.concatenate(indices) if indices else np.zeros(0, dtype=np.int32),
+            np.concatenate(weights) if weights else np.zeros(0, dtype=np.float64)
+        )
+
+    def _set_neighbor_index(self, tools, neighbor_indptr, neighbor_indices, neighbor_weights):
+        """
+        Install a top-k neighbor index for tools.
+
+        Args:
+            tools (list): The Tool instances the index was built from.
+            neighbor_indptr (np.ndarray): Offsets of each tool's neighbors.
+            neighbor_indices (np.ndarray): Neighbor positions, best first.
+            neighbor_weights (np.ndarray): Neighbor similarity scores.
+        """
+        self.tools = tools
+        self.tool_positions = {}
+        for position, tool in enumerate(tools):
+            self.tool_positions.setdefault(tool, position)
+        self.neighbor_indptr = neighbor_indptr
+        self.neighbor_indices = neighbor_indices
+        self.neighbor_weights = neighbor_weights
+
+    def similarity_blocks(self, tools):
+        """
+        Compute the calculate_similarity score of every pair of tools, one block of rows at a time.
+
+        A single CountVectorizer is fitted over all feature strings. Because
+        calculate_similarity fits TF-IDF on each pair alone, a term's IDF is 1 when
+        both tools share it and ln(1.5) + 1 otherwise; the per-pair norms are
+        derived from sparse products so the scores match the pairwise ones.
+
+        Args:
+            tools (list): A list of Tool instances.
+
+        Yields:
+            tuple: (start, block) where block is a float64 array of shape
+                (rows, len(tools)) holding the scores of tools[start:start + rows].
+        """
+        n = len(tools)
+        if n == 0:
+            return
+
+        counts = self._feature_counts(tools)
+        squared = counts.multiply(counts).tocsr()
+        present = counts.copy()
+        present.data[:] = 1.0
+        squared_norms = np.asarray(squared.sum(axis=1)).ravel()
+        counts_t = counts.T.tocsc()
+        squared_t = squared.T.tocsc()
+        present_t = present.T.tocsc()
+
+        categories = self._factorize([tool.category for tool in tools])
+        costs = self._factorize([tool.cost for tool in tools])
+        languages = self._factorize([tool.language for tool in tools])
+        platforms = self._platform_incidence(tools)
+        platforms_t = platforms.T.tocsc()
+
+        unshared = _UNSHARED_TERM_IDF ** 2
+        block_rows = max(1, BLOCK_CELLS // n)
+        for start in range(0, n, block_rows):
+            stop = min(start + block_rows, n)
+
+            # Feature similarity (mirrors the per-pair TF-IDF fit)
+            dot = (counts[start:stop] @ counts_t).toarray()
+            shared_left = (squared[start:stop] @ present_t).toarray()
+            shared_right = (present[start:stop] @ squared_t).toarray()
+            left_norm = unshared * squared_norms[start:stop, None] - (unshared - 1.0) * shared_left
+            right_norm = unshared * squared_norms[None, :] - (unshared - 1.0) * shared_right
+            denominator = np.sqrt(left_norm * right_norm)
+            feature_similarity = np.divide(
+                dot, denominator, out=np.zeros_like(dot), where=denominator > 0)
+
+            # Attribute similarities (mirror calculate_similarity)
+            category_similarity = np.where(categories[start:stop, None] == categories[None, :], 1.5, 0.0)
+            cost_similarity = np.where(costs[start:stop, None] == costs[None, :], 0.5, 0.0)
+            language_similarity = np.where(languages[start:stop, None] == languages[None, :], 0.3, 0.0)
+            platform_overlap = (platforms[start:stop] @ platforms_t).toarray() > 0
+            platform_similarity = np.where(platform_overlap, 0.2, 0.0)
+
+            total_similarity = (
+                2.0 * feature_similarity +
+                1.5 * category_similarity +
+                0.5 * cost_similarity +
+                0.3 * language_similarity +
+                0.2 * platform_similarity
+            )
+            max_similarity = 2.0 + 1.5 + 0.5 + 0.3 + 0.2
+            yield start, total_similarity / max_similarity
+
+    @staticmethod
+    def _feature_counts(tools):
+        """
+        Fit one term-count model over the feature strings of all tools.
+
+        Args:
+            tools (list): A list of Tool instances.
+
+        Returns:
+            scipy.sparse.csr_matrix: Term counts with one row per tool.
+        """
+        feature_strings = [" ".join(tool.features) for tool in tools]
+        try:
+            counts = CountVectorizer(stop_words='english').fit_transform(feature_strings)
+        except ValueError:
+            # No tool has a usable feature term
+            counts = sparse.csr_matrix((len(tools), 1))
+        return counts.astype(np.float64).tocsr()
+
+    @staticmethod
+    def _factorize(values):
+        """
+        Encode values as integer codes so that equal values share a code.
+
+        Args:
+            values (list): The values to encode.
+
+        Returns:
+            np.ndarray: One integer code per value.
+        """
+        codes = {}
+        return np.fromiter(
+            (codes.setdefault(value, len(codes)) for value in values),
+            dtype=np.int64, count=len(values))
+
+    @staticmethod
+    def _platform_incidence(tools):
+        """
+        Build a tool x platform incidence matrix from the comma-separated platforms.
+
+        Args:
+            tools (list): A list of Tool instances.
+
+        Returns:
+            scipy.sparse.csr_matrix: 1.0 where a tool lists a platform.
+        """
+        codes = {}
+        rows, cols = [], []
+        for row, tool in enumerate(tools):
+            for platform in set(tool.platform.split(", ")):
+                rows.append(row)
+                cols.append(codes.setdefault(platform, len(codes)))
+        data = np.ones(len(rows), dtype=np.float64)
+        return sparse.csr_matrix((data, (rows, cols)), shape=(len(tools), max(len(codes), 1)))
 
     def calculate_similarity(self, tool1, tool2):
         """
@@ -126,6 +413,7 @@ class Graph:
 
         return normalized_similarity
 
+    @metrics.timed('graph_query_seconds')
     def find_most_relevant_tools(self, start_tool, num_recommendations=5):
         """
         Find the most relevant tools based on similarity scores.
@@ -137,17 +425,56 @@ class Graph:
         Returns:
             list: A list of the most relevant Tool objects.
         """
+        position = self.tool_positions.get(start_tool)
+        if position is not None:
+            # O(k) slice of the precomputed neighbor list, already sorted
+            begin = self.neighbor_indptr[position]
+            end = min(self.neighbor_indptr[position + 1], begin + num_recommendations)
+            return [self.tools[j] for j in self.neighbor_indices[begin:end].tolist()]
+
         if start_tool not in self.graph:
             raise ValueError(
                 f"Start tool '{start_tool.name}' not found in the graph.")
 
-        # Get neighbors sorted by similarity (descending order)
+        # Tools added with add_node are not indexed; sort their neighbors instead
         neighbors = sorted(self.graph[start_tool].items(
         ), key=lambda x: x[1]['weight'], reverse=True)
         recommended_tools = [neighbor for neighbor,
                              attrs in neighbors[:num_recommendations]]
         return recommended_tools
 
+    @metrics.timed('graph_batch_query_seconds')
+    def most_relevant_positions(self, start_tools, num_recommendations=5):
+        """
+        Batch form of find_most_relevant_tools over the top-k neighbor index.
+
+        Args:
+            start_tools (list): The starting tools, each built into the neighbor index.
+            num_recommendations (int): The number of recommendations per tool.
+
+        Returns:
+            np.ndarray: An int64 array of shape (len(start_tools), num_recommendations)
+                holding positions in self.tools, best first, padded with -1.
+
+        Raises:
+            ValueError: If a start tool is not in the neighbor index.
+        """
+        rows = np.empty(len(start_tools), dtype=np.int64)
+        for i, tool in enumerate(start_tools):
+            position = self.tool_positions.get(tool)
+            if position is None:
+                raise ValueError(
+                    f"Start tool '{tool.name}' not found in the neighbor index.")
+            rows[i] = position
+
+        begin = self.neighbor_indptr[rows]
+        length = np.minimum(self.neighbor_indptr[rows + 1] - begin, num_recommendations)
+        slots = np.arange(num_recommendations)
+        valid = slots < length[:, None]
+        positions = np.full((len(rows), num_recommendations), -1, dtype=np.int64)
+        positions[valid] = self.neighbor_indices[(begin[:, None] + slots)[valid]]
+        return positions
+
     def __repr__(self):
         """
         Return a string representation of the graph.
@@ -0,0 +1,284 @@
+# labmateai/interaction_sink.py
+
+"""
+Interaction Sink Module for LabMateAI
+
+This module provides a write-behind sink for interactions. Instead of opening a session and
+committing once per interaction, callers queue interactions in memory and a background thread
+writes them in batches: one multi-row INSERT per batch, or COPY on PostgreSQL.
+
+A batch is written when it reaches max_batch_size interactions or when its oldest interaction
+has waited flush_interval seconds, whichever comes first. The queue holds at most
+max_queue_size interactions; once it is full, submit blocks until the writer catches up.
+Queued interactions are flushed when the sink is closed, and at interpreter exit.
+
+A batch that fails to write is retried with exponential backoff. Interactions still unwritten
+after max_retries retries are kept in failed_interactions, counted in the
+interaction_sink_failed_total metric, and reported by the next flush or close, which raise
+RuntimeError, so callers can tell the user their interactions were not saved.
+
+Classes:
+    InteractionSink: Queues interactions and writes them to the database in batches.
+"""
+
+import atexit
+import io
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from . import metrics
+from .models import Interaction
+
+# Columns written for each interaction, in COPY order
+INTERACTION_COLUMNS = ('user_id', 'tool_id', 'rating', 'usage_frequency', 'timestamp')
+
+# Queue markers: write the pending batch now, and stop the writer thread
+_FLUSH = object()
+_STOP = object()
+
+
+class InteractionSink:
+    """
+    Queues interactions and writes them to the database in batches from a background thread.
+    """
+
+    def __init__(self, engine, max_batch_size=200, flush_interval=1.0, max_queue_size=10000,
+                 max_retries=3, retry_delay=0.5):
+        """
+        Initializes the sink and starts its writer thread.
+
+        Args:
+            engine (sqlalchemy.engine.Engine): The engine to write interactions with.
+            max_batch_size (int, optional): Maximum number of interactions per write. Defaults to 200.
+            flush_interval (float, optional): Maximum number of seconds an interaction waits
+                before its batch is written. Defaults to 1.0.
+            max_queue_size (int, optional): Maximum number of queued interactions. Defaults to 10000.
+            max_retries (int, optional): Number of times a failed batch is retried. Defaults to 3.
+            retry_delay (float, optional): Seconds before the first retry; each further retry
+                waits twice as long. Defaults to 0.5.
+
+        Raises:
+            ValueError: If max_batch_size or max_queue_size is less than 1, flush_interval is
+                not positive, or max_retries or retry_delay is negative.
+        """
+        if max_batch_size < 1 or max_queue_size < 1:
+            raise ValueError("max_batch_size and max_queue_size must be at least 1.")
+        if flush_interval <= 0:
+            raise ValueError("flush_interval must be positive.")
+        if max_retries < 0 or retry_delay < 0:
+            raise ValueError("max_retries and retry_delay must not be negative.")
+
+        self.engine = engine
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.written_count = 0
+        self.failed_count = 0
+        # Interactions that could not be written, as tuples ordered as INTERACTION_COLUMNS
+        self.failed_interactions = []
+        self._reported_count = 0
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='labmateai-interaction-sink', daemon=True)
+        self._thread.start()
+        atexit.register(self._close_at_exit)
+
+    def submit(self, user_id, tool_id, rating=None, usage_frequency=None, timestamp=None, timeout=None):
+        """
+        Queues an interaction to be written.
+
+        Args:
+            user_id (int): The ID of the user.
+            tool_id (int): The ID of the tool.
+            rating (int, optional): User rating for the tool (0-5).
+            usage_frequency (str, optional): Frequency of tool usage.
+            timestamp (datetime, optional): Time of the interaction. Defaults to now.
+            timeout (float, optional): Maximum number of seconds to wait for room in a full
+                queue. Defaults to waiting as long as needed.
+
+        Raises:
+            RuntimeError: If the sink is closed.
+            queue.Full: If the queue is still full after timeout seconds.
+        """
+        if self._closed:
+            raise RuntimeError("InteractionSink is closed.")
+        self._queue.put(
+            (user_id, tool_id, rating, usage_frequency, timestamp or datetime.now()),
+            timeout=timeout
+        )
+
+    def flush(self):
+        """
+        Writes all queued interactions and waits until they are written.
+
+        Raises:
+            RuntimeError: If interactions failed to be written since the last flush or close.
+        """
+        if not self._closed:
+            self._queue.put(_FLUSH)
+        self._queue.join()
+        self._raise_failures()
+
+    def close(self):
+        """
+        Writes all queued interactions and stops the writer thread. Closing twice has no effect.
+
+        Raises:
+            RuntimeError: If interactions failed to be written since the last flush or close.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        atexit.unregister(self._close_at_exit)
+        logging.debug("Interaction sink closed after writing %d interactions.", self.written_count)
+        self._raise_failures()
+
+    def _close_at_exit(self):
+        """
+        Closes the sink at interpreter exit, logging interactions that could not be written.
+        """
+        try:
+            self.close()
+        except RuntimeError as e:
+            logging.error("%s", e)
+
+    def _raise_failures(self):
+        """
+        Reports the interactions that failed to be written since the last report.
+
+        Raises:
+            RuntimeError: If there are such interactions.
+        """
+        unreported = self.failed_count - self._reported_count
+        if unreported:
+            self._reported_count = self.failed_count
+            raise RuntimeError(f"Failed to write {unreported} interactions to the database.")
+
+    def __len__(self):
+        """
+        Returns the number of queued interactions, approximately.
+
+        Returns:
+            int: The number of interactions waiting to be written.
+        """
+        return self._queue.qsize()
+
+    def _run(self):
+        """
+        Collects batches from the queue and writes them until the stop marker arrives.
+        """
+        while True:
+            batch = []
+            deadline = None
+            marker = None
+            while len(batch) < self.max_batch_size:
+                try:
+                    if deadline is None:
+                        item = self._queue.get()
+                    else:
+                        item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is _FLUSH or item is _STOP:
+                    marker = item
+                    break
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if batch:
+                self._write(batch)
+            for _ in range(len(batch) + (marker is not None)):
+                self._queue.task_done()
+            if marker is _STOP:
+                return
+
+    def _write(self, batch):
+        """
+        Writes a batch of interactions in one statement, retrying with exponential backoff.
+
+        A batch still failing after max_retries retries is logged and kept in
+        failed_interactions instead of raising.
+
+        Args:
+            batch (list): Tuples of column values, ordered as INTERACTION_COLUMNS.
+        """
+        delay = self.retry_delay
+        for attempt in range(self.max_retries + 1):
+            try:
+                if self.engine.dialect.name == 'postgresql':
+                    self._copy(batch)
+                else:
+                    with self.engine.begin() as connection:
+                        connection.execute(insert(Interaction.__table__).values(
+                            [dict(zip(INTERACTION_COLUMNS, row)) for row in batch]
+                        ))
+                self.written_count += len(batch)
+                return
+            except Exception as e:
+                error = e
+            if attempt < self.max_retries:
+                logging.warning("Failed to write %d interactions; retrying in %.1f s: %s", len(batch), delay, error)
+                metrics.increment('interaction_sink_retries_total')
+                time.sleep(delay)
+                delay *= 2
+
+        self.failed_count += len(batch)
+        self.failed_interactions.extend(batch)
+        metrics.increment('interaction_sink_failed_total', len(batch))
+        logging.error("Failed to write %d interactions after %d retries: %s", len(batch), self.max_retries, error)
+
+    def _copy(self, batch):
+        """
+        Writes a batch of interactions with PostgreSQL COPY.
+
+        Args:
+            batch (list): Tuples of column values, ordered as INTERACTION_COLUMNS.
+        """
+        buffer = io.StringIO(''.join(','.join(_csv_field(value) for value in row) + '\n' for row in batch))
+
+        raw_connection = self.engine.raw_connection()
+        try:
+            with raw_connection.cursor() as cursor:
+                cursor.copy_expert(
+                    f"COPY {Interaction.__tablename__} ({', '.join(INTERACTION_COLUMNS)}) "
+                    "FROM STDIN WITH (FORMAT csv)",
+                    buffer
+                )
+            raw_connection.commit()
+        except Exception:
+            raw_connection.rollback()
+            raise
+        finally:
+            raw_connection.close()
+
+
+def _csv_field(value):
+    """
+    Formats a value as a field of COPY's CSV format.
+
+    In that format an unquoted empty field is NULL and a quoted one an empty string, so every
+    value but None and numbers is quoted, and an empty usage_frequency is stored as the empty
+    string it is on the INSERT path.
+
+    Args:
+        value: The column value.
+
+    Returns:
+        str: The field.
+    """
+    if value is None:
+        return ''
+    if isinstance(value, (int, float)):
+        return str(value)
+    return '"' + str(value).replace('"', '""') + '"'
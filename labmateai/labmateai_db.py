@@ -20,9 +20,6 @@ from sqlalchemy.exc import SQLAlchemyError
 # Load environment variables from .env file
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
-
 # Fetch the database URL
 DATABASE_URL = os.getenv('DATABASE_URL')
 
@@ -43,7 +40,6 @@ def get_connection_pool():
     return connection_pool
 
 
-
 def get_db_connection():
     """
     Gets a connection from the connection pool.
@@ -0,0 +1,483 @@
+# labmateai/metrics.py
+
+"""
+Metrics Module for LabMateAI
+
+This module records where the time goes when recommendations are built and served: timers
+and histograms for the duration of each stage (database load, graph build, pandas
+conversion, nearest-neighbor query, score fusion, ...) and counters for the amount of work
+done. The data loader, Graph, ToolTree, the recommenders, the CLI and the server record into
+one process-wide registry.
+
+Recording is disabled by default, and then costs a single flag check per call. It is enabled
+by setting the LABMATEAI_METRICS environment variable to 1, true or yes, or by calling enable.
+The registry can be exported as Prometheus text or as JSON; the server serves it at /metrics,
+and the CLI writes it to LABMATEAI_METRICS_FILE on exit.
+
+Each process records into its own registry, so the gunicorn workers of the server would each
+export only their own share. Setting LABMATEAI_METRICS_DIR to a directory shared by the
+processes makes every process write its registry to a file of its own there, about once per
+FLUSH_INTERVAL seconds while it records, and the exports merge those files with the registry
+of the exporting process. Files of exited processes are kept, so counters never go back; empty
+the directory when the server starts. A forked child starts with an empty registry, as its
+parent has written what it recorded to its own file.
+
+Metric names are snake_case. Durations are in seconds and end in _seconds; counters end in
+_total. Exported names are prefixed with labmateai_.
+
+Functions:
+    enable_from_environment: Start recording if LABMATEAI_METRICS is set.
+    enable: Start recording, optionally shared through a directory.
+    disable: Stop recording.
+    is_enabled: Check whether metrics are recorded.
+    reset: Clear everything recorded.
+    flush: Write this process's registry to the shared directory.
+    clear_directory: Remove the files of every process from a shared directory.
+    increment: Add to a counter.
+    observe: Record a value in a histogram.
+    timer: Time a block into a histogram.
+    timed: Time every call of a function into a histogram.
+    snapshot: Return everything recorded as a dictionary.
+    to_json: Export everything recorded as JSON.
+    to_prometheus: Export everything recorded in the Prometheus text format.
+    write: Write everything recorded to a file.
+"""
+
+import atexit
+import bisect
+import functools
+import json
+import math
+import os
+import threading
+import time
+
+# Prefix of exported metric names
+PREFIX = 'labmateai_'
+
+# Upper bounds of the histogram buckets, in seconds for durations
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Seconds between writes of the registry to a shared directory
+FLUSH_INTERVAL = 1.0
+
+# Prefix and suffix of the per-process files in a shared directory
+FILE_PREFIX = 'metrics-'
+FILE_SUFFIX = '.json'
+
+_enabled = False
+_lock = threading.Lock()
+_counters = {}
+# Histogram name -> [count per bucket, with a last bucket for larger values, sum, count]
+_histograms = {}
+
+# The shared directory, whether anything was recorded since the last write, the name of this
+# process's file there, and the thread writing it
+_directory = None
+_dirty = False
+_file_name = None
+_writer = None
+
+
+def enable_from_environment():
+    """
+    Starts recording metrics if the LABMATEAI_METRICS environment variable is 1, true or yes.
+
+    Called on import; call it again after loading a .env file.
+
+    Returns:
+        bool: True if metrics are recorded, False otherwise.
+    """
+    if os.getenv('LABMATEAI_METRICS', '').lower() in ('1', 'true', 'yes'):
+        enable(os.getenv('LABMATEAI_METRICS_DIR') or None)
+    return _enabled
+
+
+def enable(directory=None):
+    """
+    Starts recording metrics.
+
+    Args:
+        directory (str, optional): A directory shared with the other processes to export,
+            such as the server's workers. It is created if missing. Defaults to None, which
+            exports only this process.
+    """
+    global _enabled, _directory
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+        _directory = directory
+        _start_writer()
+    _enabled = True
+
+
+def disable():
+    """
+    Stops recording metrics and sharing them. What was recorded is kept until reset.
+    """
+    global _enabled, _directory
+    flush()
+    _enabled = False
+    _directory = None
+
+
+def is_enabled():
+    """
+    Checks whether metrics are recorded.
+
+    Returns:
+        bool: True if metrics are recorded, False otherwise.
+    """
+    return _enabled
+
+
+def reset():
+    """
+    Clears every counter and histogram.
+    """
+    global _dirty
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+        _dirty = False
+    if _directory is not None and _file_name is not None:
+        try:
+            os.remove(os.path.join(_directory, _file_name))
+        except FileNotFoundError:
+            pass
+
+
+def flush():
+    """
+    Writes this process's registry to the shared directory, if one is set and anything was
+    recorded since the last write. The file is replaced atomically, so readers never see a
+    partial write.
+    """
+    global _dirty, _file_name
+    directory = _directory
+    if directory is None:
+        return
+    with _lock:
+        if not _dirty:
+            return
+        recorded = {'counters': dict(_counters),
+                    'histograms': {name: [list(buckets), total, count]
+                                   for name, (buckets, total, count) in _histograms.items()}}
+        _dirty = False
+    if _file_name is None:
+        # The random part keeps a reused process ID from overwriting an exited process's file
+        _file_name = f'{FILE_PREFIX}{os.getpid()}-{os.urandom(4).hex()}{FILE_SUFFIX}'
+    path = os.path.join(directory, _file_name)
+    with open(path + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump(recorded, file)
+    os.replace(path + '.tmp', path)
+
+
+def clear_directory(directory):
+    """
+    Removes the files of every process from a shared directory, such as before the server
+    starts, so the exports do not include a previous run.
+
+    Args:
+        directory (str): The shared directory.
+    """
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return
+    for name in names:
+        if name.startswith(FILE_PREFIX):
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+
+
+def increment(name, value=1):
+    """
+    Adds to a counter.
+
+    Args:
+        name (str): The counter name, ending in _total.
+        value (float, optional): The amount to add. Defaults to 1.
+    """
+    global _dirty
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+        _dirty = True
+
+
+def observe(name, value):
+    """
+    Records a value in a histogram.
+
+    Args:
+        name (str): The histogram name.
+        value (float): The value, such as a duration in seconds.
+    """
+    global _dirty
+    if not _enabled:
+        return
+    bucket = bisect.bisect_left(DEFAULT_BUCKETS, value)
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = [[0] * (len(DEFAULT_BUCKETS) + 1), 0.0, 0]
+        histogram[0][bucket] += 1
+        histogram[1] += value
+        histogram[2] += 1
+        _dirty = True
+
+
+class _Timer:
+    """
+    Records the duration of a with block in a histogram.
+    """
+
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    """
+    Stands in for a timer while metrics are disabled.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name):
+    """
+    Times a with block into a histogram:
+
+        with metrics.timer('graph_build_seconds'):
+            ...
+
+    Args:
+        name (str): The histogram name, ending in _seconds.
+
+    Returns:
+        A context manager recording the duration of its block, or a shared no-op one while
+        metrics are disabled.
+    """
+    return _Timer(name) if _enabled else _NULL_TIMER
+
+
+def timed(name):
+    """
+    Times every call of a function into a histogram.
+
+    Args:
+        name (str): The histogram name, ending in _seconds.
+
+    Returns:
+        Callable: A decorator.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with _Timer(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    """
+    Returns everything recorded, by every process sharing the directory if one is set.
+
+    Returns:
+        dict: 'counters' maps counter names to values. 'histograms' maps histogram names to
+            their count, sum and cumulative bucket counts, as [upper bound, count] pairs ending
+            with an infinite bound.
+    """
+    with _lock:
+        counters = dict(_counters)
+        histograms = {name: (list(buckets), total, count) for name, (buckets, total, count) in _histograms.items()}
+    if _directory is not None:
+        _merge_directory(_directory, counters, histograms)
+
+    bounds = list(DEFAULT_BUCKETS) + [math.inf]
+    exported = {}
+    for name, (buckets, total, count) in sorted(histograms.items()):
+        cumulative, running = [], 0
+        for bound, bucket_count in zip(bounds, buckets):
+            running += bucket_count
+            cumulative.append([bound, running])
+        exported[name] = {'count': count, 'sum': total, 'buckets': cumulative}
+    return {'counters': dict(sorted(counters.items())), 'histograms': exported}
+
+
+def to_json():
+    """
+    Exports everything recorded as JSON, with the infinite bucket bound written as "+Inf".
+
+    Returns:
+        str: The JSON document.
+    """
+    recorded = snapshot()
+    for histogram in recorded['histograms'].values():
+        histogram['buckets'][-1][0] = '+Inf'
+    return json.dumps(recorded)
+
+
+def to_prometheus():
+    """
+    Exports everything recorded in the Prometheus text exposition format.
+
+    Returns:
+        str: The exposition, one sample per line.
+    """
+    recorded = snapshot()
+    lines = []
+    for name, value in recorded['counters'].items():
+        lines.append(f'# TYPE {PREFIX}{name} counter')
+        lines.append(f'{PREFIX}{name} {_format_number(value)}')
+    for name, histogram in recorded['histograms'].items():
+        lines.append(f'# TYPE {PREFIX}{name} histogram')
+        for bound, count in histogram['buckets']:
+            lines.append(f'{PREFIX}{name}_bucket{{le="{_format_number(bound)}"}} {count}')
+        lines.append(f'{PREFIX}{name}_sum {_format_number(histogram["sum"])}')
+        lines.append(f'{PREFIX}{name}_count {histogram["count"]}')
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+def write(path):
+    """
+    Writes everything recorded to a file, as JSON if its name ends in .json and as
+    Prometheus text otherwise.
+
+    Args:
+        path (str): The path of the file.
+    """
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(to_json() if path.endswith('.json') else to_prometheus())
+
+
+def _merge_directory(directory, counters, histograms):
+    """
+    Adds the registries the other processes wrote to a shared directory.
+
+    Args:
+        directory (str): The shared directory.
+        counters (dict): The counters to add to.
+        histograms (dict): The histograms to add to, as (buckets, sum, count) tuples.
+    """
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return
+    for name in names:
+        if not (name.startswith(FILE_PREFIX) and name.endswith(FILE_SUFFIX)) or name == _file_name:
+            continue
+        try:
+            with open(os.path.join(directory, name), encoding='utf-8') as file:
+                recorded = json.load(file)
+        except (OSError, ValueError):
+            # Removed since it was listed
+            continue
+        for counter, value in recorded['counters'].items():
+            counters[counter] = counters.get(counter, 0) + value
+        for histogram, (buckets, total, count) in recorded['histograms'].items():
+            if len(buckets) != len(DEFAULT_BUCKETS) + 1:
+                # Written with other bucket bounds
+                continue
+            merged = histograms.get(histogram)
+            if merged is None:
+                histograms[histogram] = (buckets, total, count)
+            else:
+                histograms[histogram] = ([a + b for a, b in zip(merged[0], buckets)],
+                                         merged[1] + total, merged[2] + count)
+
+
+def _start_writer():
+    """
+    Starts the thread writing this process's registry to the shared directory, unless it runs.
+    """
+    global _writer
+    if _writer is not None and _writer.is_alive():
+        return
+    _writer = threading.Thread(target=_write_periodically, name='labmateai-metrics', daemon=True)
+    _writer.start()
+
+
+def _write_periodically():
+    """
+    Flushes the registry every FLUSH_INTERVAL seconds while a shared directory is set.
+    """
+    while _directory is not None:
+        time.sleep(FLUSH_INTERVAL)
+        _flush_quietly()
+
+
+def _flush_quietly():
+    """
+    Flushes the registry, ignoring a failed write: the next flush retries it, and the registry
+    itself is unaffected.
+    """
+    try:
+        flush()
+    except OSError:
+        pass
+
+
+def _after_fork_in_child():
+    """
+    Starts a forked child with an empty registry and its own file and writer, since what the
+    parent recorded is in the parent's file.
+    """
+    global _lock, _dirty, _file_name, _writer
+    # The parent's lock may have been held by another of its threads at the fork
+    _lock = threading.Lock()
+    _file_name = None
+    _writer = None
+    if _directory is not None:
+        _counters.clear()
+        _histograms.clear()
+        _dirty = False
+        _start_writer()
+
+
+def _format_number(value):
+    """
+    Formats a number as Prometheus expects.
+
+    Args:
+        value (float): The number.
+
+    Returns:
+        str: The number, with infinity as +Inf.
+    """
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(before=_flush_quietly, after_in_child=_after_fork_in_child)
+atexit.register(_flush_quietly)
+
+enable_from_environment()
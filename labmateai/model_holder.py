@@ -0,0 +1,223 @@
+# labmateai/model_holder.py
+
+"""
+Model Holder Module for LabMateAI
+
+This module keeps the served recommenders up to date without pausing the callers that use them.
+A ModelHolder holds a reference to the current RecommenderModel and rebuilds a new one on a
+background thread, every refresh_interval seconds or when refresh is called. The reference is
+only replaced once the new model is complete, so a caller that fetched the model with get
+keeps a consistent set of recommenders for as long as it uses it, and callers never wait on
+a rebuild. A failed rebuild is logged and the previous model kept, and a loader may return
+None to keep the current model when there is nothing new to serve.
+
+Classes:
+    RecommenderModel: The recommenders and search index served together.
+    ModelHolder: Holds the current model and rebuilds it in the background.
+
+Functions:
+    get_refresh_interval: Read the refresh interval from the environment.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Callable, NamedTuple, Optional
+
+from . import metrics
+from .recommenders.collaborative_recommender import CollaborativeRecommender
+from .recommenders.content_based_recommender import ContentBasedRecommender
+from .recommenders.hybrid_recommender import HybridRecommender
+from .search import ToolSearchIndex
+from .tree import ToolTree
+
+
+class RecommenderModel(NamedTuple):
+    """
+    The recommenders and search index served together.
+    """
+
+    content: ContentBasedRecommender
+    collaborative: Optional[CollaborativeRecommender]
+    hybrid: Optional[HybridRecommender]
+    tree: ToolTree
+    search_index: ToolSearchIndex
+
+    @classmethod
+    def build(cls, content, collaborative=None, hybrid=None):
+        """
+        Builds a model from fitted recommenders, indexing the content recommender's tools for search.
+
+        Args:
+            content (ContentBasedRecommender): The content-based recommender.
+            collaborative (CollaborativeRecommender, optional): The collaborative recommender.
+            hybrid (HybridRecommender, optional): The hybrid recommender.
+
+        Returns:
+            RecommenderModel: The model.
+        """
+        tree = content.tree
+        if len(tree.tools) != len(content.tools):
+            tree = ToolTree()
+            tree.build_tree(content.tools)
+        return cls(content, collaborative, hybrid, tree, ToolSearchIndex.from_tree(tree))
+
+
+def get_refresh_interval() -> Optional[float]:
+    """
+    Reads the number of seconds between model rebuilds from LABMATEAI_REFRESH_INTERVAL.
+
+    Returns:
+        Optional[float]: The refresh interval, or None if the variable is unset or not a
+            positive number.
+    """
+    value = os.getenv('LABMATEAI_REFRESH_INTERVAL')
+    if not value:
+        return None
+    try:
+        refresh_interval = float(value)
+    except ValueError:
+        refresh_interval = 0
+    if refresh_interval <= 0:
+        logging.warning("Ignoring LABMATEAI_REFRESH_INTERVAL=%r: not a positive number of seconds.", value)
+        return None
+    return refresh_interval
+
+
+class ModelHolder:
+    """
+    Holds the current model and rebuilds it on a background thread.
+    """
+
+    def __init__(self, loader: Callable[[], Optional[RecommenderModel]], refresh_interval: Optional[float] = None,
+                 model: Optional[RecommenderModel] = None):
+        """
+        Initializes the holder. The rebuild thread is not started until start is called.
+
+        Args:
+            loader (Callable[[], Optional[RecommenderModel]]): Builds a new model, or returns None
+                to keep the current one. It runs on the rebuild thread, so it must not change the
+                model currently served.
+            refresh_interval (Optional[float], optional): Seconds between scheduled rebuilds.
+                Defaults to None, which only rebuilds on refresh.
+            model (Optional[RecommenderModel], optional): The initial model. Defaults to None,
+                which loads it with loader in the calling thread.
+
+        Raises:
+            ValueError: If refresh_interval is not positive.
+        """
+        if refresh_interval is not None and refresh_interval <= 0:
+            raise ValueError("refresh_interval must be positive.")
+
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+        self.refresh_count = 0
+        self.failed_count = 0
+        self._model = loader() if model is None else model
+        self._condition = threading.Condition()
+        # Refresh requests made and answered so far; a rebuild answers every earlier request
+        self._requested = 0
+        self._answered = 0
+        self._closed = False
+        self._thread = None
+
+    def get(self) -> RecommenderModel:
+        """
+        Returns the current model. Callers should fetch it once per request and use that
+        reference throughout, so a swap midway does not mix two models.
+
+        Returns:
+            RecommenderModel: The current model.
+        """
+        return self._model
+
+    def start(self) -> None:
+        """
+        Starts the rebuild thread. Starting a started holder has no effect.
+
+        Threads do not survive fork, so a holder created before forking worker processes is
+        started in each worker.
+        """
+        with self._condition:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._closed = False
+            self._thread = threading.Thread(target=self._run, name='labmateai-model-holder', daemon=True)
+            self._thread.start()
+
+    def refresh(self, wait: bool = False, timeout: Optional[float] = None) -> bool:
+        """
+        Requests a rebuild. Requests made while a rebuild is pending are answered by one rebuild.
+
+        Args:
+            wait (bool, optional): Whether to wait until the rebuild finishes. Defaults to False.
+            timeout (Optional[float], optional): Maximum number of seconds to wait. Defaults to
+                waiting as long as needed.
+
+        Returns:
+            bool: False if the holder is closed or waiting timed out, True otherwise.
+        """
+        with self._condition:
+            if self._closed:
+                return False
+            self._requested += 1
+            request = self._requested
+            self._condition.notify_all()
+            if not wait:
+                return True
+            return self._condition.wait_for(lambda: self._answered >= request or self._closed, timeout) \
+                and self._answered >= request
+
+    def close(self) -> None:
+        """
+        Stops the rebuild thread, waiting for a rebuild in progress. Closing twice has no effect.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _run(self) -> None:
+        """
+        Rebuilds the model on request or schedule until the holder is closed.
+        """
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._closed or self._requested > self._answered, self.refresh_interval)
+                if self._closed:
+                    return
+                request = self._requested
+
+            self._rebuild()
+
+            with self._condition:
+                self._answered = request
+                self._condition.notify_all()
+
+    def _rebuild(self) -> None:
+        """
+        Builds a new model and swaps it in, keeping the current model if the loader fails.
+
+        A loader that calls sys.exit counts as failing too, so it cannot end the rebuild thread.
+        """
+        start = time.perf_counter()
+        try:
+            model = self.loader()
+        except (Exception, SystemExit) as e:
+            self.failed_count += 1
+            metrics.increment('model_refresh_failures_total')
+            logging.error("Failed to rebuild the recommenders; keeping the current model: %s", e)
+            return
+        if model is None:
+            logging.debug("The recommenders are current; keeping the current model.")
+            return
+        # Assigning the reference is atomic, so callers see either the old or the new model
+        self._model = model
+        self.refresh_count += 1
+        elapsed = time.perf_counter() - start
+        metrics.observe('model_refresh_seconds', elapsed)
+        logging.info("Rebuilt the recommenders in %.2f s.", elapsed)
@@ -2,7 +2,7 @@
 """
 This module defines the SQLAlchemy models for the LabMateAI application.
 
-The models include User, Tool, and Interaction classes to represent users, tools, and interactions between users and tools.
+The models include User, Tool, Interaction, and UserToolRating classes to represent users, tools, and interactions between users and tools.
 
 The User class represents a user in the system, including their name, email, department, and role.
 
@@ -10,10 +10,12 @@ The Tool class represents a tool in the system, including its name, category, fe
 
 The Interaction class represents an interaction between a user and a tool, including the user ID, tool ID, rating, usage frequency, and timestamp.
 
+The UserToolRating class represents the aggregated ratings of one tool by one user, kept up to date by database triggers.
+
 These models are used to interact with the database and perform CRUD operations on user, tool, and interaction data.
 """
 from sqlalchemy.orm import declarative_base
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index, text
 from sqlalchemy.orm import relationship
 
 Base = declarative_base()
@@ -95,6 +97,18 @@ class Interaction(Base):
     """
 
     __tablename__ = 'interactions'
+    __table_args__ = (
+        # Interactions of a user, or of one user with one tool
+        Index('ix_interactions_user_id_tool_id', 'user_id', 'tool_id'),
+        # Interactions with a tool, also used by foreign key checks on tool deletion
+        Index('ix_interactions_tool_id', 'tool_id'),
+        # Interactions since a point in time
+        Index('ix_interactions_timestamp', 'timestamp'),
+        # Rated interactions only; holds every column the user-item matrix is built from,
+        # so the recommender's rating query is answered from the index alone
+        Index('ix_interactions_rated', 'user_id', 'tool_id', 'rating',
+              postgresql_where=text('rating IS NOT NULL'), sqlite_where=text('rating IS NOT NULL')),
+    )
 
     interaction_id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
@@ -112,3 +126,42 @@ class Interaction(Base):
         Return a string representation of the Interaction object.
         """
         return f"<Interaction(interaction_id={self.interaction_id}, user_id={self.user_id}, tool_id={self.tool_id}, rating={self.rating})>"
+
+
+class UserToolRating(Base):
+    """
+    Represents the aggregate of a user's ratings of a tool, one row per rated (user, tool) pair.
+
+    Rows are maintained from the interactions table by database triggers created in the
+    migration that adds this table, so they are current as soon as an interaction commits.
+
+    Attributes:
+        user_id (int): The ID of the user.
+        tool_id (int): The ID of the tool.
+        rating_count (int): The number of ratings of the tool by the user.
+        rating_sum (int): The sum of those ratings.
+        latest_rating (int): The most recent of those ratings.
+        latest_interaction_id (int): The ID of the interaction holding the most recent rating.
+    """
+
+    __tablename__ = 'user_tool_ratings'
+
+    user_id = Column(Integer, ForeignKey('users.user_id'), primary_key=True)
+    tool_id = Column(Integer, ForeignKey('tools.tool_id'), primary_key=True)
+    rating_count = Column(Integer, nullable=False)
+    rating_sum = Column(Integer, nullable=False)
+    latest_rating = Column(Integer, nullable=False)
+    latest_interaction_id = Column(Integer, nullable=False)
+
+    @property
+    def mean_rating(self):
+        """
+        The mean of the user's ratings of the tool.
+        """
+        return self.rating_sum / self.rating_count
+
+    def __repr__(self):
+        """
+        Return a string representation of the UserToolRating object.
+        """
+        return f"<UserToolRating(user_id={self.user_id}, tool_id={self.tool_id}, rating_count={self.rating_count}, mean_rating={self.mean_rating})>"
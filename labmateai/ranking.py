@@ -0,0 +1,66 @@
+# ranking.py
+
+"""
+This module provides vectorized top-k selection helpers shared by the graph
+and the recommenders.
+
+Functions:
+    top_k_columns: Select the k best columns of every row of a score matrix.
+    row_blocks: Split the rows of a dense score matrix into bounded blocks.
+"""
+
+import numpy as np
+
+# Upper bound on the number of cells in one dense score block of a batch (rows x tools)
+BATCH_BLOCK_CELLS = 2 ** 22
+
+
+def top_k_columns(scores, k):
+    """
+    Select the k highest-scoring columns of every row.
+
+    Columns are ordered by descending score, ties by ascending column, which is
+    the order a stable descending sort would give. Selection uses a partition
+    rather than a full sort of each row.
+
+    Args:
+        scores (np.ndarray): A 2-D float array of scores. Use -inf, not NaN, for
+            columns that must never be selected ahead of real scores.
+        k (int): Number of columns to keep per row. Capped at the number of columns.
+
+    Returns:
+        tuple: (columns, values) int64 and float arrays of shape (rows, k), best first.
+    """
+    rows, n = scores.shape
+    k = min(k, n)
+    if k <= 0:
+        return np.zeros((rows, 0), dtype=np.int64), np.zeros((rows, 0), dtype=scores.dtype)
+
+    # Select exactly k columns per row; ties at the k-th score go to the lowest columns
+    kth = -np.partition(-scores, k - 1, axis=1)[:, k - 1:k]
+    above = scores > kth
+    tied = scores == kth
+    needed = k - above.sum(axis=1, keepdims=True)
+    keep = above | (tied & (np.cumsum(tied, axis=1) <= needed))
+    columns = np.nonzero(keep)[1].reshape(rows, k)
+    values = np.take_along_axis(scores, columns, axis=1)
+    order = np.lexsort((columns, -values), axis=1)
+    return np.take_along_axis(columns, order, axis=1), np.take_along_axis(values, order, axis=1)
+
+
+def row_blocks(rows, columns, max_cells=None):
+    """
+    Split rows into consecutive blocks of at most max_cells dense cells.
+
+    Args:
+        rows (int): Number of rows.
+        columns (int): Number of columns per row.
+        max_cells (Optional[int]): Cell budget per block. Defaults to BATCH_BLOCK_CELLS.
+
+    Yields:
+        slice: The rows of each block. Every block holds at least one row.
+    """
+    max_cells = BATCH_BLOCK_CELLS if max_cells is None else max_cells
+    step = max(1, max_cells // max(columns, 1))
+    for start in range(0, rows, step):
+        yield slice(start, min(start + step, rows))
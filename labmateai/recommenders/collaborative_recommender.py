@@ -8,6 +8,7 @@ to generate tool recommendations based on user interactions. It adheres to the R
 ensuring consistency across different recommender systems.
 
 Classes:
+    UserPositions: Maps user IDs to rows of the user-item matrix by binary search.
     CollaborativeRecommender: Generates tool recommendations based on user interactions.
 
 Functions:
@@ -16,9 +17,113 @@ Functions:
 
 import pandas as pd
 import numpy as np
+import scipy.sparse as sp
 from sklearn.neighbors import NearestNeighbors
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence, Tuple, Union
+from .. import metrics
 from .recommender_interface import RecommenderInterface
+from .tool_id_index import ToolIdIndex
+from ..ranking import top_k_columns, row_blocks
+
+
+class UserPositions:
+    """
+    A mapping from user ID to row of the user-item matrix, backed by the user_ids array.
+
+    Lookups binary-search a sorted view of the IDs instead of a dictionary, so memory-mapped
+    user_ids stay shared between processes instead of being copied into Python objects. Sorted
+    IDs, as built by build_sparse_user_item_matrix, are searched in place; otherwise a sorted
+    permutation is kept alongside them.
+    """
+
+    def __init__(self, user_ids: np.ndarray):
+        """
+        Initializes the UserPositions.
+
+        Args:
+            user_ids (np.ndarray): The unique user ID of each row, as an int64 array.
+        """
+        self.user_ids = user_ids
+        if np.all(user_ids[1:] > user_ids[:-1]):
+            self._order = None
+            self._sorted_ids = user_ids
+        else:
+            self._order = np.argsort(user_ids, kind='stable')
+            self._sorted_ids = user_ids[self._order]
+
+    def __len__(self) -> int:
+        """
+        Returns the number of users.
+
+        Returns:
+            int: The number of users.
+        """
+        return len(self.user_ids)
+
+    def __contains__(self, user_id) -> bool:
+        """
+        Checks whether a user has a row.
+
+        Args:
+            user_id (int): The user ID to check.
+
+        Returns:
+            bool: True if the user has a row, False otherwise.
+        """
+        return self.get(user_id) is not None
+
+    def __getitem__(self, user_id) -> int:
+        """
+        Returns the row of a user.
+
+        Args:
+            user_id (int): The user ID to look up.
+
+        Returns:
+            int: The row of the user.
+
+        Raises:
+            KeyError: If the user has no row.
+        """
+        position = self.get(user_id)
+        if position is None:
+            raise KeyError(user_id)
+        return position
+
+    def get(self, user_id, default=None) -> Optional[int]:
+        """
+        Returns the row of a user, or a default if the user has no row.
+
+        Args:
+            user_id (int): The user ID to look up.
+            default (Optional[int], optional): The value returned for unknown users. Defaults to None.
+
+        Returns:
+            Optional[int]: The row of the user, or default.
+        """
+        if not isinstance(user_id, (int, np.integer)):
+            return default
+        position = int(self.positions_of([user_id])[0])
+        return default if position < 0 else position
+
+    def positions_of(self, user_ids: Sequence[int]) -> np.ndarray:
+        """
+        Returns the rows of several users.
+
+        Args:
+            user_ids (Sequence[int]): The user IDs to look up.
+
+        Returns:
+            np.ndarray: The int64 row of each user, or -1 for users without a row.
+        """
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        positions = np.searchsorted(self._sorted_ids, user_ids)
+        found = positions < len(self._sorted_ids)
+        found[found] = self._sorted_ids[positions[found]] == user_ids[found]
+        if self._order is not None:
+            positions[found] = self._order[positions[found]]
+        positions[~found] = -1
+        return positions
 
 
 class CollaborativeRecommender(RecommenderInterface):
@@ -26,30 +131,47 @@ class CollaborativeRecommender(RecommenderInterface):
     Collaborative Filtering Recommender using k-Nearest Neighbors.
 
     This recommender suggests tools to users based on the preferences of similar users.
-    It operates on a user-item interaction matrix and requires a DataFrame containing tool details.
+    It operates on a user-item interaction matrix, held as a sparse CSR matrix so memory
+    grows with the number of ratings, and requires a DataFrame containing tool details.
     Implements the RecommenderInterface to ensure consistency across recommenders.
     """
 
     def __init__(
         self,
-        user_item_matrix: pd.DataFrame,
+        user_item_matrix: Union[pd.DataFrame, sp.spmatrix],
         tools_df: pd.DataFrame,
         n_neighbors: int = 5,
         metric: str = 'cosine',
-        algorithm: str = 'brute'
+        algorithm: str = 'brute',
+        user_ids: Optional[Sequence[int]] = None,
+        tool_ids: Optional[Sequence[int]] = None,
+        rating_counts: Optional[Sequence[float]] = None
     ):
         """
         Initializes the CollaborativeRecommender.
 
         Args:
-            user_item_matrix (pd.DataFrame): A DataFrame where rows represent users,
-                columns represent tool IDs, and values represent ratings.
+            user_item_matrix (Union[pd.DataFrame, sp.spmatrix]): A DataFrame where rows represent users,
+                columns represent tool IDs, and values represent ratings, or a scipy sparse matrix
+                laid out the same way with zeros for missing ratings.
             tools_df (pd.DataFrame): A DataFrame containing tool details with a 'tool_id' column.
             n_neighbors (int, optional): Number of similar users to consider. Defaults to 5.
             metric (str, optional): Distance metric for NearestNeighbors. Defaults to 'cosine'.
             algorithm (str, optional): Algorithm to compute nearest neighbors. Defaults to 'brute'.
+                Brute-force cosine search runs directly on the user-item matrix; other
+                combinations fit a scikit-learn NearestNeighbors model on a copy of it.
+            user_ids (Optional[Sequence[int]], optional): The user ID of each row of a sparse
+                user_item_matrix. Ignored for a DataFrame, whose index is used. Defaults to None.
+            tool_ids (Optional[Sequence[int]], optional): The tool ID of each column of a sparse
+                user_item_matrix. Ignored for a DataFrame, whose columns are used. Defaults to None.
+            rating_counts (Optional[Sequence[float]], optional): The number of ratings averaged into
+                each stored value of a sparse user_item_matrix, aligned with its CSR data array, as
+                returned by build_sparse_user_item_matrix. Used by update_interactions to keep
+                averages exact. Defaults to None, which counts every stored value as one rating.
 
         Raises:
+            ValueError: If user_ids or tool_ids do not match a sparse user_item_matrix.
+            ValueError: If rating_counts does not match the ratings of user_item_matrix.
             ValueError: If user_item_matrix is empty.
             ValueError: If tool_ids in user_item_matrix are not present in tools_df.
             ValueError: If there are duplicate tool_ids in tools_df.
@@ -57,28 +179,63 @@ class CollaborativeRecommender(RecommenderInterface):
         """
         super().__init__()
 
-        self.user_item_matrix = user_item_matrix.astype(float)
+        if isinstance(user_item_matrix, pd.DataFrame):
+            user_ids = user_item_matrix.index
+            tool_ids = user_item_matrix.columns
+            matrix = sp.csr_matrix(user_item_matrix.to_numpy(dtype=float))
+        else:
+            if user_ids is None or tool_ids is None:
+                raise ValueError("user_ids and tool_ids must be provided with a sparse user-item matrix.")
+            matrix = sp.csr_matrix(user_item_matrix, dtype=float)
+            if (len(user_ids), len(tool_ids)) != matrix.shape:
+                raise ValueError("user_ids and tool_ids must match the shape of the user-item matrix.")
+
+        if rating_counts is None:
+            if not matrix.has_canonical_format:
+                matrix.sum_duplicates()
+            rating_counts = np.ones(matrix.nnz)
+        elif len(rating_counts) != matrix.nnz:
+            raise ValueError("rating_counts must hold one count per rating of the user-item matrix.")
+        self.user_item_matrix = matrix
+        # Number of ratings averaged into each value of user_item_matrix.data
+        self.rating_counts = np.asarray(rating_counts, dtype=np.float64)
+        # Buffers with spare capacity behind the CSR arrays, allocated by the first insertion
+        self._cell_buffers = None
         self.tools_df = tools_df
 
-        self._validate_inputs(n_neighbors)
-        self.n_neighbors = min(n_neighbors, len(user_item_matrix))
+        self._validate_inputs(n_neighbors, tool_ids)
+        self._requested_neighbors = n_neighbors
+        self.n_neighbors = min(n_neighbors, self.user_item_matrix.shape[0])
+
+        # Row and column id maps of the user-item matrix
+        self.user_ids = np.asarray(user_ids, dtype=np.int64)
+        self.tool_ids = np.asarray(tool_ids, dtype=np.int64)
+        self.user_positions = UserPositions(self.user_ids)
 
         self.tool_id_to_details = self.tools_df.set_index('tool_id').to_dict('index')
         self.all_tool_ids = set(self.tools_df['tool_id'].unique())
+        self.tool_id_index = ToolIdIndex(self.tools_df['tool_id'])
+        # Position in tool_id_index of each column of the user-item matrix
+        self._column_positions = self.tool_id_index.positions_of(self.tool_ids)
+
+        self.metric = metric
+        self.algorithm = algorithm
+        self.model = None
+        if (metric, algorithm) != ('cosine', 'brute'):
+            self.model = NearestNeighbors(
+                metric=metric,
+                algorithm=algorithm,
+                n_neighbors=self.n_neighbors
+            )
+        self._fit_model()
 
-        self.model = NearestNeighbors(
-            metric=metric,
-            algorithm=algorithm,
-            n_neighbors=self.n_neighbors
-        )
-        self.model.fit(self.user_item_matrix)
-
-    def _validate_inputs(self, n_neighbors: int):
+    def _validate_inputs(self, n_neighbors: int, tool_ids: Sequence[int]):
         """
         Validates the input data and parameters.
 
         Args:
             n_neighbors (int): Number of neighbors to validate.
+            tool_ids (Sequence[int]): The tool ID of each column of the user-item matrix.
 
         Raises:
             ValueError: If user_item_matrix is empty.
@@ -86,10 +243,10 @@ class CollaborativeRecommender(RecommenderInterface):
             ValueError: If there are duplicate tool_ids in tools_df.
             ValueError: If n_neighbors is less than 1.
         """
-        if self.user_item_matrix.empty:
+        if 0 in self.user_item_matrix.shape:
             raise ValueError("User-item matrix is empty. Cannot proceed with collaborative filtering.")
 
-        tool_ids_in_matrix = set(self.user_item_matrix.columns)
+        tool_ids_in_matrix = set(tool_ids)
         tool_ids_in_tools_df = set(self.tools_df['tool_id'])
         missing_tool_ids = tool_ids_in_matrix - tool_ids_in_tools_df
         if missing_tool_ids:
@@ -104,6 +261,7 @@ class CollaborativeRecommender(RecommenderInterface):
         if n_neighbors < 1:
             raise ValueError("n_neighbors must be at least 1.")
 
+    @metrics.timed('collaborative_recommend_seconds')
     def recommend(
         self,
         user_id: Optional[int] = None,
@@ -134,7 +292,7 @@ class CollaborativeRecommender(RecommenderInterface):
         if user_id is None:
             raise ValueError("user_id must be provided for collaborative recommendations.")
 
-        if user_id not in self.user_item_matrix.index:
+        if user_id not in self.user_positions:
             raise ValueError(f"User ID {user_id} not found in the user-item matrix.")
 
         # Get recommendation scores
@@ -144,9 +302,8 @@ class CollaborativeRecommender(RecommenderInterface):
         sorted_scores = sorted(scores.items(), key=lambda item: item[1], reverse=True)
 
         # Get the tool IDs the user has already rated
-        user_rated_tools = set(
-            self.user_item_matrix.loc[user_id][self.user_item_matrix.loc[user_id] > 0].index
-        )
+        user_row = self.user_item_matrix[self.user_positions[user_id]]
+        user_rated_tools = set(self.tool_ids[user_row.indices[user_row.data > 0]].tolist())
 
         # Exclude tools already rated by the user
         sorted_scores = [item for item in sorted_scores if item[0] not in user_rated_tools]
@@ -193,7 +350,7 @@ class CollaborativeRecommender(RecommenderInterface):
         except ValueError:
             raise ValueError("Identifier must be a valid user ID represented as a string.")
 
-        if user_id not in self.user_item_matrix.index:
+        if user_id not in self.user_positions:
             raise ValueError(f"User ID {user_id} not found in the user-item matrix.")
 
         return self.get_recommendation_scores_by_user(user_id)
@@ -208,19 +365,404 @@ class CollaborativeRecommender(RecommenderInterface):
         Returns:
             Dict[int, float]: A dictionary mapping tool IDs to their corresponding average ratings.
         """
-        user_vector = self.user_item_matrix.loc[user_id].values.reshape(1, -1)
+        neighbors = self._neighbor_rows(np.array([self.user_positions[user_id]]))
+        return dict(zip(self.tool_ids.tolist(), self._mean_ratings(neighbors)[0].tolist()))
+
+    def get_score_vector(self, user_id: int) -> np.ndarray:
+        """
+        Computes recommendation scores for all tools based on similar users, as a vector
+        aligned to tool_id_index.
+
+        Args:
+            user_id (int): The ID of the user to generate scores for.
+
+        Returns:
+            np.ndarray: A float32 vector where position i holds the average rating of
+                tool_id_index.tool_ids[i] among similar users, or NaN if the tool has no
+                column in the user-item matrix.
+
+        Raises:
+            ValueError: If the user ID is not found in user_item_matrix.
+        """
+        return self.get_score_matrix([user_id])[0]
+
+    def get_score_matrix(self, user_ids: Sequence[int]) -> np.ndarray:
+        """
+        Batch form of get_score_vector, with a single nearest-neighbor query for all users.
+
+        Args:
+            user_ids (Sequence[int]): The IDs of the users to generate scores for.
+
+        Returns:
+            np.ndarray: A float32 array of shape (len(user_ids), len(tool_id_index)).
+
+        Raises:
+            ValueError: If a user ID is not found in user_item_matrix.
+        """
+        positions = self._user_positions_of(user_ids)
+        scores = np.full((len(positions), len(self.tool_id_index)), np.nan, dtype=np.float32)
+        scores[:, self._column_positions] = self._mean_ratings(self._neighbor_rows(positions))
+        return scores
+
+    @metrics.timed('collaborative_recommend_batch_seconds')
+    def recommend_batch(
+        self,
+        user_ids: Optional[Sequence[int]] = None,
+        tool_names: Optional[Sequence[str]] = None,
+        num_recommendations: int = 5
+    ) -> np.ndarray:
+        """
+        Provides the top tool IDs for many users at once, ranked as recommend ranks them.
+
+        Neighbors of all users are found with a single nearest-neighbor query, their ratings
+        are averaged with a sparse product, and the top tools are selected by partitioning.
+
+        Args:
+            user_ids (Optional[Sequence[int]], optional): The IDs of the users.
+            tool_names (Optional[Sequence[str]], optional): Ignored by collaborative filtering.
+            num_recommendations (int, optional): Number of recommendations per user. Defaults to 5.
+
+        Returns:
+            np.ndarray: An int64 array of shape (len(user_ids), num_recommendations) holding
+                the recommended tool IDs of each user, padded with -1.
+
+        Raises:
+            ValueError: If num_recommendations is less than 1.
+            ValueError: If user_ids is not provided.
+            ValueError: If a user ID is not found in user_item_matrix.
+        """
+        self._batch_queries(user_ids, tool_names, num_recommendations)
+        if user_ids is None:
+            raise ValueError("user_ids must be provided for collaborative recommendations.")
+
+        positions = self._user_positions_of(user_ids)
+        neighbors = self._neighbor_rows(positions)
+        result = np.full((len(positions), num_recommendations), -1, dtype=np.int64)
+
+        for block in row_blocks(len(positions), self.user_item_matrix.shape[1]):
+            scores = self._mean_ratings(neighbors[block])
+
+            # Exclude tools already rated by each user
+            rated = self.user_item_matrix[positions[block]]
+            rows = np.repeat(np.arange(rated.shape[0]), np.diff(rated.indptr))
+            positive = rated.data > 0
+            scores[rows[positive], rated.indices[positive]] = -np.inf
+
+            columns, values = top_k_columns(scores, num_recommendations)
+            result[block, :columns.shape[1]] = np.where(values > -np.inf, self.tool_ids[columns], -1)
+
+        return result
+
+    @metrics.timed('collaborative_update_seconds')
+    def update_interactions(
+        self,
+        user_ids: Sequence[int],
+        tool_ids: Sequence[int],
+        ratings: Sequence[float]
+    ) -> None:
+        """
+        Applies new ratings to the user-item matrix in place, without rebuilding it.
+
+        Ratings of cells that already hold a value are folded into its running average. New cells
+        are inserted into the CSR arrays in place, and unseen users and tools get new rows and
+        columns. The arrays keep spare capacity at their end, so an insertion only shifts the
+        entries after the first new cell, and the rows of new users are appended without moving
+        anything. For brute-force cosine search only the norms of the updated rows are computed
+        again, so the ratings are visible to the next recommendation without touching the rest
+        of the matrix. Other metrics and algorithms still refit NearestNeighbors on the whole
+        matrix.
+
+        Args:
+            user_ids (Sequence[int]): The user ID of each new interaction.
+            tool_ids (Sequence[int]): The tool ID of each new interaction.
+            ratings (Sequence[float]): The rating of each new interaction. NaN ratings are ignored.
+
+        Raises:
+            ValueError: If user_ids, tool_ids and ratings differ in length.
+            ValueError: If a tool ID is not present in tools_df.
+            ValueError: If the user-item matrix is read-only, as loaded by load_snapshot with read_only=True.
+        """
+        if not (self.user_item_matrix.data.flags.writeable and self.rating_counts.flags.writeable):
+            raise ValueError("The user-item matrix is read-only and cannot be updated.")
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        tool_ids = np.asarray(tool_ids, dtype=np.int64)
+        ratings = np.asarray(ratings, dtype=np.float64)
+        if not len(user_ids) == len(tool_ids) == len(ratings):
+            raise ValueError("user_ids, tool_ids and ratings must have the same length.")
+
+        rated = ~np.isnan(ratings)
+        user_ids, tool_ids, ratings = user_ids[rated], tool_ids[rated], ratings[rated]
+        if not len(ratings):
+            return
+        metrics.increment('collaborative_updated_ratings_total', len(ratings))
+
+        missing_tool_ids = set(tool_ids.tolist()) - self.tool_id_index.positions.keys()
+        if missing_tool_ids:
+            raise ValueError(f"Interactions contain tool_ids not present in tools_df: {missing_tool_ids}")
+
+        # Append rows for unseen users and columns for tools rated for the first time
+        new_user_ids = np.unique(user_ids[self.user_positions.positions_of(user_ids) < 0])
+        if len(new_user_ids):
+            self.user_ids = np.concatenate([self.user_ids, new_user_ids])
+            self.user_positions = UserPositions(self.user_ids)
+
+        tool_positions = self.tool_id_index.positions_of(tool_ids)
+        column_of = np.full(len(self.tool_id_index), -1, dtype=np.int64)
+        column_of[self._column_positions] = np.arange(len(self._column_positions))
+        new_positions = np.unique(tool_positions[column_of[tool_positions] < 0])
+        column_of[new_positions] = np.arange(len(self.tool_ids), len(self.tool_ids) + len(new_positions))
+        self.tool_ids = np.concatenate([self.tool_ids, self.tool_id_index.tool_ids[new_positions]])
+        self._column_positions = np.concatenate([self._column_positions, new_positions])
+
+        matrix = self.user_item_matrix
+        matrix.resize((len(self.user_ids), len(self.tool_ids)))
+
+        # Sum the new ratings per cell, in row-major order
+        rows = self.user_positions.positions_of(user_ids)
+        cells, inverse = np.unique(rows * matrix.shape[1] + column_of[tool_positions], return_inverse=True)
+        sums = np.bincount(inverse, weights=ratings)
+        counts = np.bincount(inverse).astype(np.float64)
+        rows, columns = np.divmod(cells, matrix.shape[1])
+
+        # Locate each cell within its row of the CSR arrays
+        offsets = np.empty(len(cells), dtype=np.int64)
+        for i, (row, column) in enumerate(zip(rows.tolist(), columns.tolist())):
+            start, end = matrix.indptr[row], matrix.indptr[row + 1]
+            offsets[i] = start + np.searchsorted(matrix.indices[start:end], column)
+        exists = offsets < matrix.indptr[rows + 1]
+        exists[exists] = matrix.indices[offsets[exists]] == columns[exists]
+
+        # Fold ratings of stored cells into their running averages
+        stored = offsets[exists]
+        totals = self.rating_counts[stored] + counts[exists]
+        matrix.data[stored] = (matrix.data[stored] * self.rating_counts[stored] + sums[exists]) / totals
+        self.rating_counts[stored] = totals
+
+        new = ~exists
+        if new.any():
+            self._insert_cells(offsets[new], rows[new], columns[new], sums[new] / counts[new], counts[new])
+
+        self.n_neighbors = min(self._requested_neighbors, self.user_item_matrix.shape[0])
+        if self.model is not None:
+            self.model.set_params(n_neighbors=self.n_neighbors)
+            self._fit_model()
+        else:
+            self._row_norms = np.concatenate([self._row_norms, np.zeros(len(new_user_ids))])
+            touched = np.unique(rows)
+            self._row_norms[touched] = self._norms_of(touched)
+
+    def _insert_cells(
+        self,
+        offsets: np.ndarray,
+        rows: np.ndarray,
+        columns: np.ndarray,
+        values: np.ndarray,
+        counts: np.ndarray
+    ) -> None:
+        """
+        Inserts new cells into the CSR arrays of user_item_matrix and into rating_counts in place.
+
+        The arrays are views of buffers with spare capacity. Entries from the first offset on are
+        shifted towards the end, one segment per new cell, and the buffers are only reallocated,
+        with room to grow, when they are full.
 
-        # Handle users with no ratings
-        if np.all(user_vector == 0.0):
-            mean_ratings = self.user_item_matrix.mean(axis=0)
-            return mean_ratings.to_dict()
+        Args:
+            offsets (np.ndarray): The non-decreasing position of each cell in the CSR arrays
+                before the insertion, which keeps every row sorted.
+            rows (np.ndarray): The row of each cell.
+            columns (np.ndarray): The column of each cell.
+            values (np.ndarray): The rating of each cell.
+            counts (np.ndarray): The number of ratings averaged into each value.
+        """
+        matrix = self.user_item_matrix
+        size = matrix.nnz
+        data, indices, rating_counts = self._reserve_cells(size + len(offsets))
+
+        end = size
+        for i in range(len(offsets) - 1, -1, -1):
+            start = offsets[i]
+            # Overlapping basic slices are copied as with memmove
+            data[start + i + 1:end + i + 1] = data[start:end]
+            indices[start + i + 1:end + i + 1] = indices[start:end]
+            rating_counts[start + i + 1:end + i + 1] = rating_counts[start:end]
+            data[start + i] = values[i]
+            indices[start + i] = columns[i]
+            rating_counts[start + i] = counts[i]
+            end = start
+
+        size += len(offsets)
+        indptr = matrix.indptr
+        if size > np.iinfo(indptr.dtype).max:
+            indptr = indptr.astype(np.int64)
+        indptr[1:] += np.cumsum(np.bincount(rows, minlength=matrix.shape[0])).astype(indptr.dtype)
+        matrix.indptr = indptr
+        matrix.data = data[:size]
+        matrix.indices = indices[:size]
+        self.rating_counts = rating_counts[:size]
+
+    def _reserve_cells(self, size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns buffers for the data, indices and rating counts of at least size cells, whose
+        leading entries hold the current arrays.
 
-        distances, indices = self.model.kneighbors(user_vector, n_neighbors=self.n_neighbors)
-        similar_users_indices = indices.flatten()
-        similar_users_ratings = self.user_item_matrix.iloc[similar_users_indices]
-        mean_ratings = similar_users_ratings.mean(axis=0)
+        Args:
+            size (int): The number of cells the buffers must hold.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: The data, indices and rating count buffers.
+        """
+        matrix = self.user_item_matrix
+        buffers = self._cell_buffers
+        if (buffers is not None and len(buffers[0]) >= size and matrix.data.base is buffers[0]
+                and matrix.indices.base is buffers[1] and self.rating_counts.base is buffers[2]):
+            return buffers
+
+        # Grow by a quarter, so repeated insertions reallocate a logarithmic number of times
+        capacity = size + size // 4 + 16
+        index_dtype = np.int64 if capacity > np.iinfo(np.int32).max else matrix.indices.dtype
+        buffers = (
+            np.empty(capacity, dtype=matrix.data.dtype),
+            np.empty(capacity, dtype=index_dtype),
+            np.empty(capacity, dtype=np.float64)
+        )
+        for buffer, array in zip(buffers, (matrix.data, matrix.indices, self.rating_counts)):
+            buffer[:len(array)] = array
+        self._cell_buffers = buffers
+        return buffers
+
+    def _fit_model(self) -> None:
+        """
+        Prepares the nearest-neighbor search over the user-item matrix.
+
+        Brute-force cosine search only keeps the norm of each row and reads user_item_matrix in
+        place, so memory-mapped ratings are shared by every process that maps them instead of
+        being copied into each one. Other metrics and algorithms fit the NearestNeighbors model,
+        which holds its own copy of the matrix.
+        """
+        with metrics.timer('collaborative_fit_seconds'):
+            if self.model is None:
+                self._row_norms = np.sqrt(np.asarray(self.user_item_matrix.power(2).sum(axis=1)).ravel())
+            else:
+                self.model.fit(self.user_item_matrix)
 
-        return mean_ratings.to_dict()
+    def _norms_of(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Computes the Euclidean norms of some rows of the user-item matrix, reading only those rows.
+
+        Args:
+            rows (np.ndarray): The rows.
+
+        Returns:
+            np.ndarray: The float64 norm of each row.
+        """
+        squares = self.user_item_matrix[rows].power(2)
+        return np.sqrt(np.asarray(squares.sum(axis=1)).ravel())
+
+    def _user_positions_of(self, user_ids: Sequence[int]) -> np.ndarray:
+        """
+        Looks up the rows of several users in the user-item matrix.
+
+        Args:
+            user_ids (Sequence[int]): The IDs of the users.
+
+        Returns:
+            np.ndarray: The int64 row of each user.
+
+        Raises:
+            ValueError: If a user ID is not found in user_item_matrix.
+        """
+        positions = np.empty(len(user_ids), dtype=np.int64)
+        for i, user_id in enumerate(user_ids):
+            position = self.user_positions.get(user_id)
+            if position is None:
+                raise ValueError(f"User ID {user_id} not found in the user-item matrix.")
+            positions[i] = position
+        return positions
+
+    @metrics.timed('collaborative_knn_seconds')
+    def _neighbor_rows(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Finds the nearest neighbors of several users with a single query.
+
+        Args:
+            positions (np.ndarray): The rows of the users in the user-item matrix.
+
+        Returns:
+            np.ndarray: An int64 array of shape (len(positions), n_neighbors) holding the rows
+                of each user's neighbors. Users with no ratings get a row of -1.
+        """
+        neighbors = np.full((len(positions), self.n_neighbors), -1, dtype=np.int64)
+        has_ratings = (self.user_item_matrix[positions] != 0).getnnz(axis=1) > 0
+        if not has_ratings.any():
+            return neighbors
+        if self.model is not None:
+            neighbors[has_ratings] = self.model.kneighbors(
+                self.user_item_matrix[positions[has_ratings]],
+                n_neighbors=self.n_neighbors,
+                return_distance=False
+            )
+        else:
+            neighbors[has_ratings] = self._cosine_neighbor_rows(positions[has_ratings])
+        return neighbors
+
+    def _cosine_neighbor_rows(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Finds the rows with the highest cosine similarity to several rows, by brute force.
+
+        Similarities are computed a block of users at a time as the sparse product of the
+        user-item matrix with the users' rows, divided by the row norms. The matrix is the left
+        operand, so scipy converts only the users' rows and never copies the matrix. As with
+        NearestNeighbors, which of several equally similar rows makes the cut is unspecified;
+        the selected rows are ordered by descending similarity, then ascending row.
+
+        Args:
+            positions (np.ndarray): The rows of the users in the user-item matrix.
+
+        Returns:
+            np.ndarray: An int64 array of shape (len(positions), n_neighbors) holding the rows
+                of each user's neighbors, most similar first. A user is its own nearest neighbor.
+        """
+        matrix = self.user_item_matrix
+        # Rows without ratings have similarity 0 to every row, as with NearestNeighbors
+        norms = np.where(self._row_norms > 0, self._row_norms, 1.0)
+        neighbors = np.empty((len(positions), self.n_neighbors), dtype=np.int64)
+        for block in row_blocks(len(positions), matrix.shape[0]):
+            rows = positions[block]
+            similarities = (matrix @ matrix[rows].T).T.toarray()
+            similarities /= norms[rows][:, None]
+            similarities /= norms
+            # A partition is cheaper than top_k_columns' exact tie-breaking over every row
+            columns = np.argpartition(-similarities, self.n_neighbors - 1, axis=1)[:, :self.n_neighbors]
+            values = np.take_along_axis(similarities, columns, axis=1)
+            order = np.lexsort((columns, -values), axis=1)
+            neighbors[block] = np.take_along_axis(columns, order, axis=1)
+        return neighbors
+
+    def _mean_ratings(self, neighbors: np.ndarray) -> np.ndarray:
+        """
+        Averages the ratings of each user's neighbors, counting missing ratings as zero.
+
+        Args:
+            neighbors (np.ndarray): Neighbor rows as returned by _neighbor_rows.
+
+        Returns:
+            np.ndarray: A float64 array of shape (len(neighbors), tools in the user-item matrix).
+                Users with no ratings get the mean rating over all users.
+        """
+        scores = np.empty((len(neighbors), self.user_item_matrix.shape[1]))
+        cold = neighbors[:, 0] < 0
+        if cold.any():
+            scores[cold] = np.asarray(self.user_item_matrix.mean(axis=0)).ravel()
+
+        warm = neighbors[~cold]
+        if len(warm):
+            # Sum the neighbors' rows with a sparse 0/1 selector, then divide by the neighbor count
+            selector = sp.csr_matrix(
+                (np.ones(warm.size), warm.ravel(), np.arange(0, warm.size + 1, warm.shape[1])),
+                shape=(len(warm), self.user_item_matrix.shape[0])
+            )
+            scores[~cold] = (selector @ self.user_item_matrix).toarray() / warm.shape[1]
+        return scores
 
     def display_recommendations(self, recommendations: List[Dict]) -> None:
         """
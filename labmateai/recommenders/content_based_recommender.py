@@ -9,11 +9,16 @@ It adheres to the RecommenderInterface, ensuring consistency across different re
 """
 
 import os
+import time
+import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.feature_extraction.text import CountVectorizer
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional, Sequence, Tuple
+from .. import metrics
 from .recommender_interface import RecommenderInterface
+from .tool_id_index import ToolIdIndex
 from ..graph import Graph
 from ..tree import ToolTree
 from ..tool import Tool
@@ -60,6 +65,87 @@ def build_user_item_matrix(interactions: pd.DataFrame) -> pd.DataFrame:
     return user_item_matrix
 
 
+def build_sparse_user_item_matrix(
+    user_ids: Sequence[int],
+    tool_ids: Sequence[int],
+    ratings: Sequence[float],
+    return_counts: bool = False,
+    counts: Optional[Sequence[float]] = None
+) -> Tuple:
+    """
+    Creates a sparse user-item matrix directly from interaction triples. Rows represent users,
+    columns represent tools, and values represent ratings, averaged over repeated ratings of the
+    same tool by the same user, as build_user_item_matrix does. Missing ratings are not stored.
+
+    Args:
+        user_ids (Sequence[int]): The user ID of each interaction.
+        tool_ids (Sequence[int]): The tool ID of each interaction.
+        ratings (Sequence[float]): The rating of each interaction. NaN ratings are ignored.
+        return_counts (bool, optional): Whether to also return the number of ratings averaged
+            into each stored value. Defaults to False.
+        counts (Sequence[float], optional): For pre-aggregated input, the number of ratings
+            each rating is the mean of; it is weighted accordingly. Defaults to one each.
+
+    Returns:
+        Tuple: The user-item matrix, the sorted user ID of each row and the sorted tool ID of
+            each column. With return_counts, a fourth element holds the rating count of each
+            stored value, aligned with the matrix's data array.
+
+    Raises:
+        ValueError: If user_ids, tool_ids and ratings differ in length.
+        ValueError: If counts does not hold one count per rating.
+    """
+    user_ids = np.asarray(user_ids, dtype=np.int64)
+    tool_ids = np.asarray(tool_ids, dtype=np.int64)
+    ratings = np.asarray(ratings, dtype=np.float64)
+    if not len(user_ids) == len(tool_ids) == len(ratings):
+        raise ValueError("user_ids, tool_ids and ratings must have the same length.")
+    weights = np.ones(len(ratings)) if counts is None else np.asarray(counts, dtype=np.float64)
+    if len(weights) != len(ratings):
+        raise ValueError("counts must hold one count per rating.")
+
+    rated = ~np.isnan(ratings)
+    row_ids, rows = np.unique(user_ids[rated], return_inverse=True)
+    column_ids, columns = np.unique(tool_ids[rated], return_inverse=True)
+    shape = (len(row_ids), len(column_ids))
+
+    # Converting to CSR sums duplicate cells; both matrices share the same sparsity structure
+    sums = sp.csr_matrix((ratings[rated] * weights[rated], (rows, columns)), shape=shape)
+    counts = sp.csr_matrix((weights[rated], (rows, columns)), shape=shape)
+    sums.data /= counts.data
+    if return_counts:
+        return sums, row_ids, column_ids, counts.data
+    return sums, row_ids, column_ids
+
+
+def build_sparse_user_item_matrix_from_chunks(chunks: Iterable, return_counts: bool = False) -> Tuple:
+    """
+    Creates a sparse user-item matrix from columnar interaction chunks, such as those yielded by
+    data_loader.stream_interactions. Only the rated interactions of each chunk are kept, as
+    numpy arrays, so no Python object is created per interaction.
+
+    Args:
+        chunks (Iterable): Chunks with user_id, tool_id and rating arrays. NaN ratings are ignored.
+        return_counts (bool, optional): Whether to also return the number of ratings averaged
+            into each stored value. Defaults to False.
+
+    Returns:
+        Tuple: As returned by build_sparse_user_item_matrix.
+    """
+    user_ids = [np.empty(0, dtype=np.int64)]
+    tool_ids = [np.empty(0, dtype=np.int64)]
+    ratings = [np.empty(0, dtype=np.float64)]
+    for chunk in chunks:
+        rated = ~np.isnan(chunk.rating)
+        user_ids.append(chunk.user_id[rated])
+        tool_ids.append(chunk.tool_id[rated])
+        ratings.append(chunk.rating[rated])
+    return build_sparse_user_item_matrix(
+        np.concatenate(user_ids), np.concatenate(tool_ids), np.concatenate(ratings),
+        return_counts=return_counts
+    )
+
+
 class ContentBasedRecommender(RecommenderInterface):
     """
     Handles content-based recommendations using Graph and ToolTree.
@@ -70,7 +156,8 @@ class ContentBasedRecommender(RecommenderInterface):
         self,
         tools: List[Tool],
         graph: Optional[Graph] = None,
-        tree: Optional[ToolTree] = None
+        tree: Optional[ToolTree] = None,
+        similarity_matrix: Optional[np.ndarray] = None
     ):
         """
         Initializes the ContentBasedRecommender with a list of tools.
@@ -81,46 +168,54 @@ class ContentBasedRecommender(RecommenderInterface):
                 If None, a new Graph instance is created. Defaults to None.
             tree (Optional[ToolTree], optional): An instance of ToolTree for hierarchical tool organization.
                 If None, a new ToolTree instance is created. Defaults to None.
+            similarity_matrix (Optional[np.ndarray], optional): A previously computed count-vector
+                similarity matrix of tools, used instead of computing it. Defaults to None.
 
         Raises:
             ValueError: If duplicate tool IDs are found.
+            ValueError: If similarity_matrix does not match the number of tools.
         """
         super().__init__()
 
+        self.tools = tools
+        self._index_tools()
+        # An unbuilt graph; the build pipeline below builds it exactly once
+        self.graph = graph if graph else Graph([])
+        self.tree = tree if tree else ToolTree()
+
+        self.tools_df = pd.DataFrame()
+        self.vectorizer = None
+        self.similarity_matrix = None
+        self._initial_similarity_matrix = similarity_matrix
+
+        self.built = False
+        self.build_timings = {}
+        self.build_recommendation_system()
+
+    def _index_tools(self) -> None:
+        """
+        Builds the name and tool-id indexes of self.tools.
+
+        Raises:
+            ValueError: If duplicate tool IDs are found.
+        """
         # Check for duplicate tool IDs
         tool_ids = set()
-        for tool in tools:
+        for tool in self.tools:
             if tool.tool_id in tool_ids:
                 raise ValueError(
                     f"Tool '{tool.name}' already exists in the dataset."
                 )
             tool_ids.add(tool.tool_id)
 
-        self.tools = tools
-        self.graph = graph if graph else Graph(tools)
-        self.tree = tree if tree else ToolTree()
-        self.tool_names = {tool.name.lower() for tool in tools}  # For case-insensitive matching
-
-        self.build_recommendation_system()
-
-        # Preprocess tools for content-based filtering
-        if tools:
-            self.tools_df = pd.DataFrame([tool.__dict__ for tool in tools])
-            self.tools_df['combined_features'] = self.tools_df.apply(
-                lambda row: self._combine_features(row), axis=1
-            )
-            if not self.tools_df['combined_features'].empty:
-                self.vectorizer = CountVectorizer().fit_transform(
-                    self.tools_df['combined_features']
-                )
-                self.similarity_matrix = cosine_similarity(self.vectorizer)
-            else:
-                self.vectorizer = None
-                self.similarity_matrix = None
-        else:
-            self.tools_df = pd.DataFrame()
-            self.vectorizer = None
-            self.similarity_matrix = None
+        self.tool_names = {tool.name.lower() for tool in self.tools}  # For case-insensitive matching
+        # Case-insensitive name -> (Tool, row in tools_df, tool_id); the first tool wins on duplicate names
+        self.tool_index = {}
+        for row, tool in enumerate(self.tools):
+            self.tool_index.setdefault(tool.name.lower(), (tool, row, tool.tool_id))
+        # Canonical tool-id ordering of score vectors, and the position of each tools_df row in it
+        self.tool_id_index = ToolIdIndex(tool.tool_id for tool in self.tools)
+        self._score_positions = self.tool_id_index.positions_of([tool.tool_id for tool in self.tools])
 
     def _combine_features(self, row: pd.Series) -> str:
         """
@@ -136,13 +231,86 @@ class ContentBasedRecommender(RecommenderInterface):
         combined = f"{row['name']} {row['category']} {' '.join(row['features'])} {row['language']} {row['platform']}"
         return combined
 
-    def build_recommendation_system(self) -> None:
+    def build_recommendation_system(self, force: bool = False) -> None:
         """
-        Builds the recommendation system by constructing the graph and tree.
+        Builds the recommendation system by constructing the graph, the tree and the
+        count-vector similarity matrix, recording the duration of each stage in build_timings.
+
+        A graph that is already built is reused, and nothing is rebuilt once the
+        system is built unless force is True. A forced rebuild clears the graph and the
+        tree first and indexes self.tools again, so it picks up a changed tool list.
+
+        Args:
+            force (bool, optional): Rebuild every stage even if already built. Defaults to False.
+
+        Raises:
+            ValueError: If a forced rebuild finds duplicate tool IDs.
         """
-        self.graph.build_graph(self.tools)
+        if self.built and not force:
+            return
+
+        timings = {}
+        if force:
+            self._index_tools()
+            self.graph.clear()
+            self.tree.clear()
+
+        start = time.perf_counter()
+        if force or not getattr(self.graph, 'built', False):
+            self.graph.build_graph(self.tools)
+        timings['graph'] = time.perf_counter() - start
+
+        start = time.perf_counter()
         self.tree.build_tree(self.tools)
+        timings['tree'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self._build_similarity_matrix(None if force else self._initial_similarity_matrix)
+        self._initial_similarity_matrix = None
+        timings['similarity'] = time.perf_counter() - start
+
+        self.build_timings = timings
+        for stage, seconds in timings.items():
+            metrics.observe(f'content_build_{stage}_seconds', seconds)
+        self.built = True
+
+    def _build_similarity_matrix(self, similarity_matrix: Optional[np.ndarray] = None) -> None:
+        """
+        Preprocesses tools for content-based filtering and computes the count-vector similarity matrix.
+
+        Args:
+            similarity_matrix (Optional[np.ndarray], optional): A previously computed similarity
+                matrix to use instead of computing one. Defaults to None.
 
+        Raises:
+            ValueError: If similarity_matrix does not match the number of tools.
+        """
+        if similarity_matrix is not None and similarity_matrix.shape != (len(self.tools), len(self.tools)):
+            raise ValueError("Similarity matrix does not match the number of tools.")
+
+        if self.tools:
+            with metrics.timer('content_tools_dataframe_seconds'):
+                self.tools_df = pd.DataFrame([tool.__dict__ for tool in self.tools])
+                self.tools_df['combined_features'] = self.tools_df.apply(
+                    lambda row: self._combine_features(row), axis=1
+                )
+            if similarity_matrix is not None:
+                self.vectorizer = None
+                self.similarity_matrix = similarity_matrix
+            elif not self.tools_df['combined_features'].empty:
+                self.vectorizer = CountVectorizer().fit_transform(
+                    self.tools_df['combined_features']
+                )
+                self.similarity_matrix = cosine_similarity(self.vectorizer)
+            else:
+                self.vectorizer = None
+                self.similarity_matrix = None
+        else:
+            self.tools_df = pd.DataFrame()
+            self.vectorizer = None
+            self.similarity_matrix = None
+
+    @metrics.timed('content_recommend_seconds')
     def recommend(
         self,
         user_id: Optional[int] = None,
@@ -196,40 +364,137 @@ class ContentBasedRecommender(RecommenderInterface):
             identifier (str): The name of the tool to base scores on.
 
         Returns:
-            Dict[int, float]: A dictionary mapping tool IDs to their corresponding similarity scores.
+            Dict[int, float]: A dictionary mapping tool IDs to their corresponding similarity scores,
+                rounded to three decimals.
 
         Raises:
             ValueError: If the tool_name is not found in the dataset.
         """
-        tool_name_lower = identifier.lower()
-        if tool_name_lower not in self.tool_names:
-            raise ValueError(f"Tool '{identifier}' not found in the dataset.")
+        scores = self._similarity_scores(identifier)
+        if scores is None:
+            return {}
 
-        # Find the Tool object
-        selected_tool = next(
-            (tool for tool in self.tools if tool.name.lower() == tool_name_lower), None
-        )
+        scored = ~np.isnan(scores)
+        return dict(zip(
+            self.tool_id_index.tool_ids[scored].tolist(),
+            [round(score, 3) for score in scores[scored].tolist()]
+        ))
 
-        if not selected_tool:
-            raise ValueError(
-                f"Tool '{identifier}' not found after initial check."
-            )
+    def get_score_vector(self, tool_name: str) -> np.ndarray:
+        """
+        Retrieve similarity scores for all tools based on a tool name, as a vector
+        aligned to tool_id_index.
 
-        # Find the index of the tool in the DataFrame
-        tool_index = self.tools_df[self.tools_df['name'].str.lower() == tool_name_lower].index[0]
+        Args:
+            tool_name (str): The name of the tool to base scores on.
 
-        if self.similarity_matrix is None:
-            return {}
+        Returns:
+            np.ndarray: A float32 vector where position i holds the similarity score of
+                tool_id_index.tool_ids[i], rounded to three decimals as get_recommendation_scores
+                rounds it, so near-ties fuse as ties. The position of the tool itself, and every
+                position when there is no similarity matrix, is NaN.
+
+        Raises:
+            ValueError: If the tool_name is not found in the dataset.
+        """
+        return self.get_score_matrix([tool_name])[0]
+
+    def get_score_matrix(self, tool_names: Sequence[str]) -> np.ndarray:
+        """
+        Batch form of get_score_vector.
+
+        Args:
+            tool_names (Sequence[str]): The names of the tools to base scores on.
+
+        Returns:
+            np.ndarray: A float32 array of shape (len(tool_names), len(tool_id_index)).
+
+        Raises:
+            ValueError: If a tool_name is not found in the dataset.
+        """
+        rows = np.array([self._lookup_tool(name)[1] for name in tool_names], dtype=np.int64)
+        scores = self._similarity_rows(rows)
+        if scores is None:
+            return np.full((len(rows), len(self.tool_id_index)), np.nan, dtype=np.float32)
+        return np.round(scores, 3).astype(np.float32)
+
+    @metrics.timed('content_recommend_batch_seconds')
+    def recommend_batch(
+        self,
+        user_ids: Optional[Sequence[int]] = None,
+        tool_names: Optional[Sequence[str]] = None,
+        num_recommendations: int = 5
+    ) -> np.ndarray:
+        """
+        Provides the top tool IDs for many tools at once, ranked as recommend ranks them.
+
+        The neighbor lists of all tools are sliced from the graph's top-k neighbor index at once.
+
+        Args:
+            user_ids (Optional[Sequence[int]], optional): Ignored by content-based filtering.
+            tool_names (Optional[Sequence[str]], optional): The names of the tools to base
+                recommendations on.
+            num_recommendations (int, optional): Number of recommendations per tool. Defaults to 5.
+
+        Returns:
+            np.ndarray: An int64 array of shape (queries, num_recommendations) holding the
+                recommended tool IDs of each query, padded with -1. Queries without a tool name
+                get no recommendations.
+
+        Raises:
+            ValueError: If num_recommendations is less than 1.
+            ValueError: If neither user_ids nor tool_names is provided.
+            ValueError: If a tool_name is None or not found in the dataset.
+        """
+        queries = self._batch_queries(user_ids, tool_names, num_recommendations, allow_missing=False)
+        if tool_names is None:
+            return np.full((len(queries), num_recommendations), -1, dtype=np.int64)
+
+        start_tools = [self._lookup_tool(name)[0] for name in tool_names]
+        if not getattr(self.graph, 'built', False):
+            return super().recommend_batch(user_ids, tool_names, num_recommendations)
+
+        positions = self.graph.most_relevant_positions(start_tools, num_recommendations)
+        # The trailing -1 turns padding positions (-1) back into -1 tool IDs
+        graph_tool_ids = np.array([tool.tool_id for tool in self.graph.tools] + [-1], dtype=np.int64)
+        return graph_tool_ids[positions]
+
+    def _similarity_scores(self, tool_name: str) -> Optional[np.ndarray]:
+        """
+        Computes the float64 similarity scores of a tool, aligned to tool_id_index.
+
+        Args:
+            tool_name (str): The name of the tool to base scores on.
 
-        # Get the similarity scores for the tool
-        similarity_scores = list(enumerate(self.similarity_matrix[tool_index]))
+        Returns:
+            Optional[np.ndarray]: The scores, with NaN at the position of the tool itself,
+                or None if there is no similarity matrix.
+
+        Raises:
+            ValueError: If the tool_name is not found in the dataset.
+        """
+        _, row, _ = self._lookup_tool(tool_name)
+        scores = self._similarity_rows(np.array([row]))
+        return None if scores is None else scores[0]
 
-        # Create a dictionary of tool_id and their corresponding similarity score
-        scores = {
-            self.tools_df.iloc[tool[0]]['tool_id']: round(tool[1], 3)
-            for tool in similarity_scores if tool[0] != tool_index
-        }
+    def _similarity_rows(self, rows: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Computes the float64 similarity scores of several tools_df rows, aligned to tool_id_index.
+
+        Args:
+            rows (np.ndarray): The rows of the tools in tools_df.
 
+        Returns:
+            Optional[np.ndarray]: An array of shape (len(rows), len(tool_id_index)) with NaN at the
+                position of each tool itself, or None if there is no similarity matrix.
+        """
+        if self.similarity_matrix is None:
+            return None
+
+        similarities = np.asarray(self.similarity_matrix, dtype=np.float64)[rows]
+        scores = np.full((len(rows), len(self.tool_id_index)), np.nan)
+        scores[:, self._score_positions[:similarities.shape[1]]] = similarities
+        scores[np.arange(len(rows)), self._score_positions[rows]] = np.nan
         return scores
 
     def display_recommendations(self, recommendations: List[Dict]) -> None:
@@ -265,19 +530,7 @@ class ContentBasedRecommender(RecommenderInterface):
         Raises:
             ValueError: If the tool_name is not found in the dataset.
         """
-        tool_name_lower = tool_name.lower()
-        if tool_name_lower not in self.tool_names:
-            raise ValueError(f"Tool '{tool_name}' not found in the dataset.")
-
-        # Find the Tool object
-        selected_tool = next(
-            (tool for tool in self.tools if tool.name.lower() == tool_name_lower), None
-        )
-
-        if not selected_tool:
-            raise ValueError(
-                f"Tool '{tool_name}' not found after initial check."
-            )
+        selected_tool, _, _ = self._lookup_tool(tool_name)
 
         # Get recommended Tool objects from the graph
         recommended_tools = self.graph.find_most_relevant_tools(
@@ -287,6 +540,30 @@ class ContentBasedRecommender(RecommenderInterface):
 
         return recommended_tools
 
+    def _lookup_tool(self, tool_name: str) -> Tuple[Tool, int, int]:
+        """
+        Looks up a tool by name, ignoring case.
+
+        Args:
+            tool_name (str): The name of the tool.
+
+        Returns:
+            Tuple[Tool, int, int]: The Tool, its row in tools_df and its tool_id.
+
+        Raises:
+            ValueError: If the tool_name is not found in the dataset.
+        """
+        tool_name_lower = tool_name.lower()
+        if tool_name_lower not in self.tool_names:
+            raise ValueError(f"Tool '{tool_name}' not found in the dataset.")
+
+        entry = self.tool_index.get(tool_name_lower)
+        if entry is None:
+            raise ValueError(
+                f"Tool '{tool_name}' not found after initial check."
+            )
+        return entry
+
     def __repr__(self) -> str:
         """
         Returns a string representation of the ContentBasedRecommender.
@@ -8,11 +8,14 @@ to generate comprehensive tool recommendations for users. It adheres to the Reco
 ensuring consistency across different recommender systems.
 """
 
-import pandas as pd
-from typing import List, Dict, Optional
+import numpy as np
+from typing import List, Dict, Optional, Sequence, Tuple
+from .. import metrics
 from .recommender_interface import RecommenderInterface
 from .collaborative_recommender import CollaborativeRecommender
 from .content_based_recommender import ContentBasedRecommender
+from .tool_id_index import ToolIdIndex
+from ..ranking import top_k_columns, row_blocks
 
 
 class HybridRecommender(RecommenderInterface):
@@ -45,7 +48,10 @@ class HybridRecommender(RecommenderInterface):
         self.content_recommender = content_recommender
         self.collaborative_recommender = collaborative_recommender
         self.alpha = alpha
+        self._layout_key = None
+        self._layout = None
 
+    @metrics.timed('hybrid_recommend_seconds')
     def recommend(
         self,
         user_id: Optional[int] = None,
@@ -75,47 +81,36 @@ class HybridRecommender(RecommenderInterface):
         if user_id is None and tool_name is None:
             raise ValueError("At least one of user_id or tool_name must be provided for recommendations.")
 
+        index, cf_positions, cb_positions, tool_rows, records = self._score_layout()
+        cf_scores = np.full((1, len(index)), np.nan, dtype=np.float32)
+        cb_scores = np.full_like(cf_scores, np.nan)
+
         # Obtain collaborative filtering scores if user_id is provided
         if user_id is not None:
             try:
-                collaborative_scores = self._get_collaborative_scores(user_id)
+                cf_scores[0, cf_positions] = self.collaborative_recommender.get_score_vector(user_id)
             except ValueError as e:
                 raise ValueError(f"Collaborative filtering error: {e}")
         else:
             # If no user_id is provided, use zero scores
-            collaborative_scores = pd.Series(0, index=self.collaborative_recommender.tools_df['tool_id'])
+            cf_scores[0, cf_positions] = 0
 
         # Obtain content-based filtering scores if tool_name is provided
         if tool_name is not None:
             try:
-                content_scores = self._get_content_scores(tool_name)
+                cb_scores[0, cb_positions] = self.content_recommender.get_score_vector(tool_name)
             except ValueError as e:
                 raise ValueError(f"Content-based filtering error: {e}")
         else:
             # If no tool_name is provided, use zero scores
-            content_scores = pd.Series(0, index=self.content_recommender.tools_df['tool_id'])
-
-        # Align indices
-        combined_index = self._align_indices(collaborative_scores, content_scores)
-        collaborative_scores = collaborative_scores.reindex(combined_index, fill_value=0)
-        content_scores = content_scores.reindex(combined_index, fill_value=0)
-
-        # Normalize the scores
-        normalized_cf_scores = self._normalize_scores(collaborative_scores)
-        normalized_cb_scores = self._normalize_scores(content_scores)
-
-        # Combine the scores using the weighting factor alpha
-        combined_scores = self.alpha * normalized_cf_scores + (1 - self.alpha) * normalized_cb_scores
-
-        # Sort the tools based on the combined scores in descending order
-        top_tool_ids = combined_scores.sort_values(ascending=False).head(num_recommendations).index
+            cb_scores[0, cb_positions] = 0
 
-        # Retrieve the tool details from collaborative_recommender's tools_df
-        recommended_tools = self.collaborative_recommender.tools_df[
-            self.collaborative_recommender.tools_df['tool_id'].isin(top_tool_ids)
-        ]
+        # Normalize, combine and select the top tools without sorting the whole index
+        columns, values = top_k_columns(self._fuse(cf_scores, cb_scores), num_recommendations)
+        rows = tool_rows[columns[0][values[0] > -np.inf]]
 
-        return recommended_tools.to_dict('records')
+        # Return the tool details in collaborative_recommender's tools_df order
+        return [dict(records[row]) for row in np.sort(rows[rows >= 0]).tolist()]
 
     def get_recommendation_scores(self, identifier: str) -> Dict[int, float]:
         """
@@ -135,11 +130,101 @@ class HybridRecommender(RecommenderInterface):
         try:
             user_id = int(identifier)
             scores = self._get_collaborative_scores(user_id)
-            return scores.to_dict()
+            return dict(scores)
         except ValueError:
             # If not an integer, treat it as tool_name
             scores = self._get_content_scores(identifier)
-            return scores.to_dict()
+            return dict(scores)
+
+    @metrics.timed('hybrid_recommend_batch_seconds')
+    def recommend_batch(
+        self,
+        user_ids: Optional[Sequence[int]] = None,
+        tool_names: Optional[Sequence[str]] = None,
+        num_recommendations: int = 5
+    ) -> np.ndarray:
+        """
+        Generates hybrid recommendations for many (user_id, tool_name) queries at once.
+
+        Component scores are computed as matrices over the union of both recommenders'
+        tool-id indexes, then normalized, blended and ranked row by row.
+
+        Args:
+            user_ids (Optional[Sequence[int]]): The user ID of each query. If omitted,
+                collaborative scores are zero.
+            tool_names (Optional[Sequence[str]]): The tool name of each query. If omitted,
+                content-based scores are zero.
+            num_recommendations (int, optional): Number of recommendations per query.
+                Defaults to 5.
+
+        Returns:
+            np.ndarray: An int64 array of shape (queries, num_recommendations) holding the
+                recommended tool IDs of each query by descending combined score, padded with -1.
+                Only tools of the collaborative recommender's tools_df are returned.
+
+        Raises:
+            ValueError: If num_recommendations is less than 1.
+            ValueError: If neither user_ids nor tool_names is provided.
+            ValueError: If user_ids and tool_names differ in length.
+            ValueError: If a user ID or tool name is None or not found by its recommender.
+        """
+        queries = self._batch_queries(user_ids, tool_names, num_recommendations, allow_missing=False)
+        index, cf_positions, cb_positions, tool_rows, _ = self._score_layout()
+        returned = tool_rows >= 0
+
+        result = np.full((len(queries), num_recommendations), -1, dtype=np.int64)
+        for block in row_blocks(len(queries), len(index)):
+            cf_scores = np.full((block.stop - block.start, len(index)), np.nan, dtype=np.float32)
+            cb_scores = np.full_like(cf_scores, np.nan)
+
+            if user_ids is not None:
+                try:
+                    cf_scores[:, cf_positions] = self.collaborative_recommender.get_score_matrix(
+                        list(user_ids[block]))
+                except ValueError as e:
+                    raise ValueError(f"Collaborative filtering error: {e}")
+            else:
+                cf_scores[:, cf_positions] = 0
+
+            if tool_names is not None:
+                try:
+                    cb_scores[:, cb_positions] = self.content_recommender.get_score_matrix(
+                        list(tool_names[block]))
+                except ValueError as e:
+                    raise ValueError(f"Content-based filtering error: {e}")
+            else:
+                cb_scores[:, cb_positions] = 0
+
+            columns, values = top_k_columns(self._fuse(cf_scores, cb_scores), num_recommendations)
+
+            # Drop tools without details in the collaborative tools_df, keeping the ranking order
+            kept = (values > -np.inf) & returned[columns]
+            order = np.argsort(~kept, axis=1, kind='stable')
+            tool_ids = np.where(kept, index.tool_ids[columns], -1)
+            result[block, :columns.shape[1]] = np.take_along_axis(tool_ids, order, axis=1)
+
+        return result
+
+    def update_interactions(
+        self,
+        user_ids: Sequence[int],
+        tool_ids: Sequence[int],
+        ratings: Sequence[float]
+    ) -> None:
+        """
+        Applies new ratings to the collaborative recommender in place, so the next hybrid
+        recommendation reflects them. Content-based scores do not depend on ratings.
+
+        Args:
+            user_ids (Sequence[int]): The user ID of each new interaction.
+            tool_ids (Sequence[int]): The tool ID of each new interaction.
+            ratings (Sequence[float]): The rating of each new interaction. NaN ratings are ignored.
+
+        Raises:
+            ValueError: If user_ids, tool_ids and ratings differ in length.
+            ValueError: If a tool ID is not present in the collaborative recommender's tools_df.
+        """
+        self.collaborative_recommender.update_interactions(user_ids, tool_ids, ratings)
 
     def display_recommendations(self, recommendations: List[Dict]) -> None:
         """
@@ -156,7 +241,7 @@ class HybridRecommender(RecommenderInterface):
         for tool in recommendations:
             print(f"- {tool['name']} (Category: {tool['category']}, Language: {tool['language']}, Platform: {tool['platform']})")
 
-    def _get_collaborative_scores(self, user_id: int) -> pd.Series:
+    def _get_collaborative_scores(self, user_id: int) -> Dict[int, float]:
         """
         Retrieves collaborative filtering scores for all tools for a given user.
 
@@ -164,14 +249,14 @@ class HybridRecommender(RecommenderInterface):
             user_id (int): The ID of the user.
 
         Returns:
-            pd.Series: A Series with tool_ids as index and collaborative scores as values.
+            Dict[int, float]: A mapping of tool_ids to collaborative scores.
 
         Raises:
             ValueError: If user_id is not found in the collaborative recommender.
         """
         return self.collaborative_recommender.get_recommendation_scores(user_id)
 
-    def _get_content_scores(self, tool_name: str) -> pd.Series:
+    def _get_content_scores(self, tool_name: str) -> Dict[int, float]:
         """
         Retrieves content-based filtering scores for all tools based on a reference tool.
 
@@ -179,44 +264,85 @@ class HybridRecommender(RecommenderInterface):
             tool_name (str): The name of the tool to base content scores on.
 
         Returns:
-            pd.Series: A Series with tool_ids as index and content-based scores as values.
+            Dict[int, float]: A mapping of tool_ids to content-based scores.
 
         Raises:
             ValueError: If tool_name is not found in the content recommender.
         """
         return self.content_recommender.get_recommendation_scores(tool_name)
 
-    def _normalize_scores(self, scores: pd.Series) -> pd.Series:
+    def _score_layout(self) -> Tuple[ToolIdIndex, np.ndarray, np.ndarray, np.ndarray, List[Dict]]:
         """
-        Normalizes a Series of scores to a range between 0 and 1.
+        Returns the fixed tool-id ordering that component scores are fused over.
 
-        Args:
-            scores (pd.Series): The scores to normalize.
+        The layout is computed once and reused until a component's tool_id_index or the
+        collaborative tools_df is replaced.
 
         Returns:
-            pd.Series: The normalized scores.
-
-        Notes:
-            If all scores are equal, the normalized scores will be zero to avoid division by zero.
+            Tuple[ToolIdIndex, np.ndarray, np.ndarray, np.ndarray, List[Dict]]: The union of both
+                components' tool-id indexes, the positions in it of the collaborative and of the
+                content-based tool_id_index, the collaborative tools_df row of each tool in it
+                (-1 if absent), and the records of the collaborative tools_df.
         """
-        min_score = scores.min()
-        max_score = scores.max()
-        if max_score - min_score == 0:
-            return pd.Series(0, index=scores.index)
-        return (scores - min_score) / (max_score - min_score)
+        cf_index = self.collaborative_recommender.tool_id_index
+        cb_index = self.content_recommender.tool_id_index
+        tools_df = self.collaborative_recommender.tools_df
+        key = (cf_index, cb_index, tools_df)
+        if self._layout_key is None or any(a is not b for a, b in zip(key, self._layout_key)):
+            index = cf_index.union(cb_index)
+            tool_rows = np.full(len(index), -1, dtype=np.int64)
+            tool_rows[index.positions_of(tools_df['tool_id'])] = np.arange(len(tools_df))
+            self._layout = (
+                index,
+                index.positions_of(cf_index.tool_ids),
+                index.positions_of(cb_index.tool_ids),
+                tool_rows,
+                tools_df.to_dict('records')
+            )
+            self._layout_key = key
+        return self._layout
+
+    @metrics.timed('hybrid_fuse_seconds')
+    def _fuse(self, cf_scores: np.ndarray, cb_scores: np.ndarray) -> np.ndarray:
+        """
+        Blends rows of collaborative and content-based scores aligned to one tool-id index.
+
+        NaN marks a tool a component did not score. Tools scored by neither component get -inf;
+        for the others a missing score counts as zero. Each component is min-max normalized over
+        the scored tools of its row, and rows of equal scores normalize to zero.
 
-    def _align_indices(self, series1: pd.Series, series2: pd.Series) -> pd.Index:
+        Args:
+            cf_scores (np.ndarray): Collaborative scores of shape (queries, tools).
+            cb_scores (np.ndarray): Content-based scores of the same shape.
+
+        Returns:
+            np.ndarray: The combined scores, with -inf for tools scored by neither component.
+        """
+        scored = ~(np.isnan(cf_scores) & np.isnan(cb_scores))
+        combined = self._normalize_rows(np.nan_to_num(cf_scores), scored)
+        combined *= self.alpha
+        combined += (1 - self.alpha) * self._normalize_rows(np.nan_to_num(cb_scores), scored)
+        combined[~scored] = -np.inf
+        return combined
+
+    @staticmethod
+    def _normalize_rows(scores: np.ndarray, scored: np.ndarray) -> np.ndarray:
         """
-        Aligns two pandas Series to have the same index.
+        Min-max normalizes each row of scores over its scored entries.
 
         Args:
-            series1 (pd.Series): The first Series.
-            series2 (pd.Series): The second Series.
+            scores (np.ndarray): The scores to normalize, without NaN.
+            scored (np.ndarray): A boolean mask of the entries that take part in each row's range.
 
         Returns:
-            pd.Index: The combined index of both Series.
+            np.ndarray: The normalized scores. Rows whose scored entries are all equal are zero.
         """
-        return series1.index.union(series2.index)
+        low = np.where(scored, scores, np.inf).min(axis=1, keepdims=True)
+        high = np.where(scored, scores, -np.inf).max(axis=1, keepdims=True)
+        span = high - low
+        normalized = np.zeros_like(scores)
+        np.divide(scores - low, span, out=normalized, where=span > 0)
+        return normalized
 
     def __repr__(self) -> str:
         """
@@ -9,7 +9,8 @@ methods defined in this interface.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence, Tuple
+import numpy as np
 
 
 class RecommenderInterface(ABC):
@@ -62,6 +63,87 @@ class RecommenderInterface(ABC):
         """
         pass
 
+    def recommend_batch(
+        self,
+        user_ids: Optional[Sequence[int]] = None,
+        tool_names: Optional[Sequence[str]] = None,
+        num_recommendations: int = 5
+    ) -> np.ndarray:
+        """
+        Generate the top recommended tool IDs for many queries at once.
+
+        Query i is (user_ids[i], tool_names[i]); either sequence may be omitted. This default
+        calls recommend once per query; recommenders override it with a vectorized version.
+
+        Args:
+            user_ids (Optional[Sequence[int]]): The user ID of each query.
+            tool_names (Optional[Sequence[str]]): The tool name of each query.
+            num_recommendations (int, optional): The number of recommendations per query.
+                Defaults to 5.
+
+        Returns:
+            np.ndarray: An int64 array of shape (queries, num_recommendations) holding the
+                recommended tool IDs of each query, padded with -1.
+
+        Raises:
+            ValueError: If num_recommendations is less than 1.
+            ValueError: If neither user_ids nor tool_names is provided.
+            ValueError: If user_ids and tool_names differ in length.
+        """
+        queries = self._batch_queries(user_ids, tool_names, num_recommendations)
+        result = np.full((len(queries), num_recommendations), -1, dtype=np.int64)
+        for row, (user_id, tool_name) in enumerate(queries):
+            recommendations = self.recommend(
+                user_id=user_id,
+                tool_name=tool_name,
+                num_recommendations=num_recommendations
+            )[:num_recommendations]
+            result[row, :len(recommendations)] = [tool['tool_id'] for tool in recommendations]
+        return result
+
+    @staticmethod
+    def _batch_queries(
+        user_ids: Optional[Sequence[int]],
+        tool_names: Optional[Sequence[str]],
+        num_recommendations: int,
+        allow_missing: bool = True
+    ) -> List[Tuple[Optional[int], Optional[str]]]:
+        """
+        Validate the arguments of recommend_batch and pair them into queries.
+
+        Args:
+            user_ids (Optional[Sequence[int]]): The user ID of each query.
+            tool_names (Optional[Sequence[str]]): The tool name of each query.
+            num_recommendations (int): The number of recommendations per query.
+            allow_missing (bool, optional): Whether single queries may have a None user ID or
+                tool name. Vectorized overrides pass False, as they score whole sequences.
+                Defaults to True.
+
+        Returns:
+            List[Tuple[Optional[int], Optional[str]]]: The (user_id, tool_name) of each query.
+
+        Raises:
+            ValueError: If num_recommendations is less than 1.
+            ValueError: If neither user_ids nor tool_names is provided.
+            ValueError: If user_ids and tool_names differ in length.
+            ValueError: If allow_missing is False and a user ID or tool name is None.
+        """
+        if num_recommendations < 1:
+            raise ValueError("num_recommendations must be at least 1.")
+        if user_ids is None and tool_names is None:
+            raise ValueError("At least one of user_ids or tool_names must be provided for recommendations.")
+        if user_ids is not None and tool_names is not None and len(user_ids) != len(tool_names):
+            raise ValueError("user_ids and tool_names must have the same length.")
+        if not allow_missing:
+            for argument, values in (('user_ids', user_ids), ('tool_names', tool_names)):
+                if values is not None and any(value is None for value in values):
+                    raise ValueError(f"{argument} must not contain None; omit {argument} instead.")
+
+        count = len(user_ids) if user_ids is not None else len(tool_names)
+        users = list(user_ids) if user_ids is not None else [None] * count
+        names = list(tool_names) if tool_names is not None else [None] * count
+        return list(zip(users, names))
+
     @abstractmethod
     def display_recommendations(self, recommendations: List[Dict]) -> None:
         """
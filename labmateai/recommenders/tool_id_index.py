@@ -0,0 +1,166 @@
+# labmateai/recommenders/tool_id_index.py
+
+"""
+Tool ID Index Module for LabMateAI
+
+This module provides the ToolIdIndex class, a canonical ordering of tool IDs shared by the
+recommenders. Score vectors returned by the recommenders are aligned to a ToolIdIndex, so
+they can be combined position by position without per-tool dictionary lookups.
+
+Classes:
+    ToolIdIndex: An immutable, sorted index of unique tool IDs.
+"""
+
+from typing import Iterable, Optional
+import numpy as np
+
+
+class ToolIdIndex:
+    """
+    An immutable index of unique tool IDs in ascending order.
+
+    Position i of every score vector aligned to this index holds the score of tool_ids[i].
+    """
+
+    def __init__(self, tool_ids: Iterable[int]):
+        """
+        Initializes the ToolIdIndex.
+
+        Args:
+            tool_ids (Iterable[int]): The tool IDs to index. Duplicates are collapsed.
+        """
+        self.tool_ids = np.unique(np.fromiter((int(tool_id) for tool_id in tool_ids), dtype=np.int64))
+        self.tool_ids.setflags(write=False)
+        self.positions = {tool_id: position for position, tool_id in enumerate(self.tool_ids.tolist())}
+
+    def __len__(self) -> int:
+        """
+        Returns the number of tool IDs in the index.
+
+        Returns:
+            int: The number of tool IDs.
+        """
+        return len(self.tool_ids)
+
+    def __contains__(self, tool_id) -> bool:
+        """
+        Checks whether a tool ID is in the index.
+
+        Args:
+            tool_id (int): The tool ID to check.
+
+        Returns:
+            bool: True if the tool ID is indexed, False otherwise.
+        """
+        return tool_id in self.positions
+
+    def __eq__(self, other) -> bool:
+        """
+        Checks whether two indexes hold the same tool IDs.
+
+        Args:
+            other (ToolIdIndex): The other index.
+
+        Returns:
+            bool: True if both indexes hold the same tool IDs, False otherwise.
+        """
+        if isinstance(other, ToolIdIndex):
+            return np.array_equal(self.tool_ids, other.tool_ids)
+        return False
+
+    __hash__ = None
+
+    def position(self, tool_id: int) -> int:
+        """
+        Returns the position of a tool ID in the index.
+
+        Args:
+            tool_id (int): The tool ID to look up.
+
+        Returns:
+            int: The position of the tool ID.
+
+        Raises:
+            ValueError: If the tool ID is not in the index.
+        """
+        try:
+            return self.positions[tool_id]
+        except KeyError:
+            raise ValueError(f"Tool ID {tool_id} not found in the tool ID index.")
+
+    def positions_of(self, tool_ids: Iterable[int]) -> np.ndarray:
+        """
+        Returns the positions of several tool IDs in the index.
+
+        Args:
+            tool_ids (Iterable[int]): The tool IDs to look up.
+
+        Returns:
+            np.ndarray: The positions of the tool IDs, as an int64 array.
+
+        Raises:
+            ValueError: If any of the tool IDs is not in the index.
+        """
+        tool_ids = np.asarray(tool_ids, dtype=np.int64)
+        positions = np.searchsorted(self.tool_ids, tool_ids)
+        found = positions < len(self.tool_ids)
+        found[found] = self.tool_ids[positions[found]] == tool_ids[found]
+        if not found.all():
+            raise ValueError(
+                f"Tool IDs not found in the tool ID index: {set(tool_ids[~found].tolist())}"
+            )
+        return positions
+
+    def union(self, other: 'ToolIdIndex') -> 'ToolIdIndex':
+        """
+        Returns an index holding the tool IDs of both indexes.
+
+        Args:
+            other (ToolIdIndex): The other index.
+
+        Returns:
+            ToolIdIndex: The union of both indexes. Returns self if both hold the same tool IDs.
+        """
+        if self == other:
+            return self
+        return ToolIdIndex(np.union1d(self.tool_ids, other.tool_ids))
+
+    def align(
+        self,
+        scores: np.ndarray,
+        source: 'ToolIdIndex',
+        fill_value: Optional[float] = np.nan
+    ) -> np.ndarray:
+        """
+        Reorders a score vector aligned to another index onto this index.
+
+        Args:
+            scores (np.ndarray): A score vector aligned to source.
+            source (ToolIdIndex): The index the scores are aligned to. Every tool ID in source
+                must also be in this index.
+            fill_value (Optional[float], optional): The score of tool IDs missing from source.
+                Defaults to NaN.
+
+        Returns:
+            np.ndarray: The scores aligned to this index, with the dtype of scores.
+
+        Raises:
+            ValueError: If the length of scores does not match source.
+            ValueError: If source holds tool IDs missing from this index.
+        """
+        if len(scores) != len(source):
+            raise ValueError("Length of scores does not match the source tool ID index.")
+        if source == self:
+            return scores
+        aligned = np.full(len(self), fill_value, dtype=scores.dtype)
+        aligned[self.positions_of(source.tool_ids)] = scores
+        return aligned
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the ToolIdIndex.
+
+        Returns:
+            str: String representation.
+        """
+        return f"ToolIdIndex(number_of_tools={len(self)})"
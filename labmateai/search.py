@@ -0,0 +1,268 @@
+# search.py
+
+"""
+This module provides ranked keyword search over the tool catalog.
+
+Tools are scored with BM25 on four fields: name, category, features and description.
+Per-field term frequencies are counted once into sparse matrices, and the boosted BM25
+weight of every (tool, term) pair is precomputed, so a query only sums the weight columns
+of its terms and selects the best tools by partitioning.
+
+Classes:
+    ToolSearchIndex: A BM25 index over a list of tools.
+
+Functions:
+    tokenize: Split text into search terms.
+    search_tools: Rank tools with an index, then fill with partial matches from a tool tree.
+"""
+
+import re
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+
+from .ranking import top_k_columns
+
+# Search terms: runs of letters and digits, so 'sequence_analysis' yields two terms
+TERM_PATTERN = re.compile(r'[^\W_]+')
+
+# Weight of a term occurrence in each field relative to the description
+DEFAULT_FIELD_BOOSTS = {
+    'name': 3.0,
+    'category': 1.5,
+    'features': 2.0,
+    'description': 1.0
+}
+
+
+def tokenize(text):
+    """
+    Split text into lowercase search terms.
+
+    Args:
+        text (str): The text to split.
+
+    Returns:
+        list: The search terms of the text, in order.
+    """
+    return TERM_PATTERN.findall(text.lower())
+
+
+def search_tools(index, tree, query, num_results=10):
+    """
+    Ranks tools for a query with a BM25 index, filling the remaining slots with partial matches.
+
+    BM25 only scores whole terms, so tools matching part of a word, as found by the tool
+    tree's keyword index, follow the ranked tools in tree order.
+
+    Args:
+        index (ToolSearchIndex): The BM25 index.
+        tree (ToolTree): The tool tree over the same tools.
+        query (str): The search query.
+        num_results (int, optional): Maximum number of tools to return. Defaults to 10.
+
+    Returns:
+        list: Up to num_results Tool objects, best first.
+
+    Raises:
+        ValueError: If num_results is less than 1.
+    """
+    results = index.search(query, num_results)
+    if len(results) < num_results:
+        ranked = set(results)
+        partial_matches = [tool for tool in tree.search_tools(query) if tool not in ranked]
+        results += partial_matches[:num_results - len(results)]
+    return results
+
+
+class ToolSearchIndex:
+    """
+    A BM25 keyword index over a list of tools, with a boost per field.
+    """
+
+    def __init__(self, tools, field_boosts=None, k1=1.2, b=0.75):
+        """
+        Builds the index.
+
+        Args:
+            tools (list): The Tool objects to index. Ties in score are ranked in this order.
+            field_boosts (dict, optional): Boost of each field, keyed by 'name', 'category',
+                'features' and 'description'. Defaults to DEFAULT_FIELD_BOOSTS.
+            k1 (float, optional): BM25 term-frequency saturation. Defaults to 1.2.
+            b (float, optional): BM25 field-length normalization, between 0 and 1. Defaults to 0.75.
+
+        Raises:
+            ValueError: If field_boosts names an unknown field or holds a negative boost.
+            ValueError: If k1 is negative or b is not between 0 and 1.
+        """
+        field_boosts = DEFAULT_FIELD_BOOSTS if field_boosts is None else field_boosts
+        unknown_fields = set(field_boosts) - set(DEFAULT_FIELD_BOOSTS)
+        if unknown_fields:
+            raise ValueError(f"Unknown search fields: {unknown_fields}")
+        if any(boost < 0 for boost in field_boosts.values()):
+            raise ValueError("Field boosts must be non-negative.")
+        if k1 < 0 or not 0 <= b <= 1:
+            raise ValueError("k1 must be non-negative and b must be between 0 and 1.")
+
+        self.tools = list(tools)
+        self.field_boosts = dict(field_boosts)
+        self.k1 = k1
+        self.b = b
+        self.vocabulary = {}
+
+        # Term frequencies of every field as a (tools x terms) CSR matrix
+        self.term_frequencies = {
+            field: self._count_terms([self._field_text(tool, field) for tool in self.tools])
+            for field in self.field_boosts
+        }
+        for field, frequencies in self.term_frequencies.items():
+            frequencies.resize((len(self.tools), len(self.vocabulary)))
+
+        self.term_weights = self._bm25_weights()
+
+    @classmethod
+    def from_tree(cls, tree, **kwargs):
+        """
+        Builds the index over the tools of a ToolTree, in tree traversal order.
+
+        Args:
+            tree (ToolTree): The tool tree.
+            **kwargs: Keyword arguments passed to the constructor.
+
+        Returns:
+            ToolSearchIndex: The index.
+        """
+        return cls(tree.get_all_tools(), **kwargs)
+
+    def __len__(self):
+        """
+        Returns the number of indexed tools.
+
+        Returns:
+            int: The number of tools.
+        """
+        return len(self.tools)
+
+    def score(self, query):
+        """
+        Computes the BM25 score of every tool for a query.
+
+        Args:
+            query (str): The search query. Repeated terms count repeatedly.
+
+        Returns:
+            np.ndarray: A float64 vector holding the score of each tool, zero if no term matches.
+        """
+        scores = np.zeros(len(self.tools))
+        weights = self.term_weights
+        for term, count in Counter(tokenize(query)).items():
+            column = self.vocabulary.get(term)
+            if column is None:
+                continue
+            start, end = weights.indptr[column], weights.indptr[column + 1]
+            scores[weights.indices[start:end]] += count * weights.data[start:end]
+        return scores
+
+    def search(self, query, num_results=10):
+        """
+        Returns the best-scoring tools for a query.
+
+        Only tools matching at least one query term are returned. Among equal scores,
+        tools keep their index order.
+
+        Args:
+            query (str): The search query.
+            num_results (int, optional): Maximum number of tools to return. Defaults to 10.
+
+        Returns:
+            list: Up to num_results Tool objects, best first.
+
+        Raises:
+            ValueError: If num_results is less than 1.
+        """
+        if num_results < 1:
+            raise ValueError("num_results must be at least 1.")
+
+        scores = self.score(query)
+        matched = np.flatnonzero(scores > 0)
+        columns, _ = top_k_columns(scores[matched][np.newaxis, :], num_results)
+        return [self.tools[position] for position in matched[columns[0]].tolist()]
+
+    def _count_terms(self, texts):
+        """
+        Counts the terms of each text into a sparse matrix, extending the vocabulary.
+
+        Args:
+            texts (list): One text per tool.
+
+        Returns:
+            sparse.csr_matrix: A (texts x current vocabulary) matrix of term counts.
+        """
+        indptr = [0]
+        indices = []
+        counts = []
+        for text in texts:
+            for term, count in Counter(tokenize(text)).items():
+                indices.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                counts.append(count)
+            indptr.append(len(indices))
+        return sparse.csr_matrix(
+            (np.asarray(counts, dtype=np.float64), np.asarray(indices, dtype=np.int64), indptr),
+            shape=(len(texts), len(self.vocabulary))
+        )
+
+    def _bm25_weights(self):
+        """
+        Precomputes the boosted BM25 weight of every term in every tool.
+
+        Each field's term frequencies are saturated and normalized by the field's length,
+        scaled by the field boost and summed over fields. The sum is multiplied by the
+        term's inverse document frequency over tools.
+
+        Returns:
+            sparse.csc_matrix: A (tools x terms) weight matrix, one column per term.
+        """
+        number_of_tools = len(self.tools)
+        weights = sparse.csr_matrix((number_of_tools, len(self.vocabulary)))
+        present = sparse.csr_matrix((number_of_tools, len(self.vocabulary)))
+
+        for field, frequencies in self.term_frequencies.items():
+            lengths = np.asarray(frequencies.sum(axis=1)).ravel()
+            average_length = lengths.mean() if number_of_tools and lengths.mean() > 0 else 1.0
+            norms = self.k1 * (1 - self.b + self.b * lengths / average_length)
+
+            saturated = frequencies.copy()
+            row_norms = np.repeat(norms, np.diff(frequencies.indptr))
+            saturated.data = saturated.data * (self.k1 + 1) / (saturated.data + row_norms)
+            weights = weights + self.field_boosts[field] * saturated
+            present = present + frequencies
+
+        document_frequencies = present.getnnz(axis=0)
+        idf = np.log1p((number_of_tools - document_frequencies + 0.5) / (document_frequencies + 0.5))
+        return sparse.csc_matrix(weights @ sparse.diags(idf))
+
+    @staticmethod
+    def _field_text(tool, field):
+        """
+        Returns the text of one field of a tool.
+
+        Args:
+            tool (Tool): The tool.
+            field (str): The field name.
+
+        Returns:
+            str: The field text. Features are joined with spaces.
+        """
+        if field == 'features':
+            return ' '.join(tool.features)
+        return getattr(tool, field)
+
+    def __repr__(self):
+        """
+        Returns a string representation of the ToolSearchIndex.
+
+        Returns:
+            str: String representation.
+        """
+        return f"ToolSearchIndex(number_of_tools={len(self.tools)}, number_of_terms={len(self.vocabulary)})"
@@ -0,0 +1,408 @@
+# labmateai/server.py
+
+"""
+Server Module for LabMateAI
+
+This module serves the recommenders as a JSON HTTP API. create_app wraps a loaded
+RecommenderModel in a Flask application. Under gunicorn, labmateai.wsgi loads the model
+once in the master process (preload_app in gunicorn.conf.py), so forked workers share
+its fitted arrays copy-on-write instead of each rebuilding the graph. With
+LABMATEAI_SNAPSHOT_DIR set, the model is served from the snapshot mapped read-only, so
+its arrays are file pages shared by every worker rather than heap pages each worker may copy.
+With both LABMATEAI_SNAPSHOT_DIR and LABMATEAI_REFRESH_INTERVAL set, the model is refreshed in
+the background (see model_holder): one worker at a time rebuilds it from the database and
+saves it as the snapshot, and every worker attaches to each saved snapshot between requests.
+The database is then read once per refresh however many workers serve, and the workers keep
+sharing one mapped model.
+
+Endpoints:
+    GET /health: Status and the number of tools.
+    GET /tools/<tool_name>/similar?n=5: Tools similar to a tool.
+    GET /categories/<category>/tools?n=5: Tools in a category.
+    GET /search?q=<query>&n=10: Tools matching a keyword query.
+    GET /users/<user_id>/recommendations?n=5: Collaborative recommendations for a user.
+    GET /users/<user_id>/hybrid?n=5&tool_name=<name>: Hybrid recommendations for a user,
+        optionally blended with a tool the user likes.
+    GET /metrics?format=json: The recorded metrics (see the metrics module) in the Prometheus
+        text format, or as JSON. Answers 404 unless LABMATEAI_METRICS is set.
+
+Errors are returned as {"error": message}: 400 for invalid parameters, 404 for unknown
+tools and users, and 503 when collaborative filtering is not available.
+
+Classes:
+    SharedSnapshotLoader: Refreshes a worker's model through the shared snapshot directory.
+
+Functions:
+    load_model: Load the recommenders from the database.
+    create_model_holder: Load the model into a holder that refreshes it as configured.
+    create_app: Create the Flask application serving a model.
+"""
+
+import dataclasses
+import logging
+import os
+import time
+
+import numpy as np
+from flask import Flask, Response, g, jsonify, request
+
+from . import metrics
+from .model_holder import ModelHolder, RecommenderModel
+from .search import search_tools
+from .tool import Tool
+
+
+def load_model(cli=None):
+    """
+    Loads the recommenders as the CLI does, from a snapshot or cache when configured.
+
+    If the LABMATEAI_SNAPSHOT_DIR environment variable is set, the CLI brings the snapshot up
+    to date and the model is then attached to it read-only instead of served from memory.
+    The database engine is disposed afterwards, so processes forked from the caller do
+    not share its pooled connections.
+
+    Unlike the interactive CLI, which exits when the database cannot be read, load errors are
+    raised, so a model holder rebuilding with this loader keeps running and counts the failure.
+
+    Args:
+        cli (CLI, optional): The CLI to load with. Defaults to a new CLI, which applies the
+            database migrations first.
+
+    Returns:
+        RecommenderModel: The loaded model.
+    """
+    from .cli import CLI
+
+    if cli is None:
+        cli = CLI()
+    try:
+        model = cli._build_model()
+        snapshot_dir = os.getenv('LABMATEAI_SNAPSHOT_DIR')
+        if snapshot_dir:
+            model = _attach_snapshot(cli, snapshot_dir, model)
+    finally:
+        cli.engine.dispose()
+    return model
+
+
+def _attach_snapshot(cli, snapshot_dir, model):
+    """
+    Returns the model of the current snapshot, mapped read-only.
+
+    Keeps the given model if the snapshot could not be saved for the current data.
+
+    Args:
+        cli (CLI): The CLI whose database the snapshot must match.
+        snapshot_dir (str): The snapshot directory.
+        model (RecommenderModel): The model loaded in memory.
+
+    Returns:
+        RecommenderModel: The snapshot's model, or model if there is no current snapshot.
+    """
+    from .snapshot import load_snapshot
+
+    session = cli.Session()
+    try:
+        fingerprint = cli._data_fingerprint(session)
+    finally:
+        session.close()
+    snapshot = load_snapshot(snapshot_dir, fingerprint, read_only=True)
+    if snapshot is None:
+        logging.warning("No current snapshot in %s; serving the recommenders from memory.", snapshot_dir)
+        return model
+    return _model_from_snapshot(*snapshot)
+
+
+def _model_from_snapshot(content, collaborative):
+    """
+    Combines a snapshot's recommenders into a model, as the CLI does when it restores them.
+
+    Args:
+        content (ContentBasedRecommender): The content-based recommender.
+        collaborative (CollaborativeRecommender): The collaborative recommender, or None.
+
+    Returns:
+        RecommenderModel: The model.
+    """
+    from .recommenders.hybrid_recommender import HybridRecommender
+
+    hybrid = HybridRecommender(content, collaborative, alpha=0.5) if collaborative is not None else None
+    return RecommenderModel.build(content, collaborative, hybrid)
+
+
+class SharedSnapshotLoader:
+    """
+    Refreshes a worker's model through the shared snapshot directory.
+
+    Called by each worker's model holder. The worker holding the directory's rebuild lock
+    brings the snapshot up to date from the database; every worker, the rebuilding one
+    included, then attaches read-only to the snapshot if a new one was saved. The lock is held
+    until the rebuilding worker exits, and another worker takes over on its next refresh.
+    """
+
+    REBUILD_LOCK_FILE = 'rebuild.lock'
+
+    def __init__(self, cli, snapshot_dir):
+        """
+        Initializes the loader.
+
+        Args:
+            cli (CLI): The CLI to rebuild with. Its migrations have run, so rebuilds skip them.
+            snapshot_dir (str): The snapshot directory.
+        """
+        self.cli = cli
+        self.snapshot_dir = snapshot_dir
+        # The created_at of the snapshot the served model is attached to
+        self.attached = None
+        self._rebuild_lock = None
+
+    def __call__(self):
+        """
+        Rebuilds the snapshot if this worker holds the rebuild lock, and attaches to it if it changed.
+
+        Returns:
+            RecommenderModel: The model of a newly saved snapshot, or None if the served
+                snapshot is still the latest.
+        """
+        if self._holds_rebuild_lock():
+            # With LABMATEAI_SNAPSHOT_DIR set, building brings the snapshot up to date
+            self.cli._build_model()
+        return self.attach()
+
+    def attach(self):
+        """
+        Attaches read-only to the latest snapshot if it is not the one served.
+
+        Returns:
+            RecommenderModel: The snapshot's model, or None if it is already served or there
+                is no readable snapshot.
+        """
+        from .snapshot import load_snapshot, read_manifest
+
+        manifest = read_manifest(self.snapshot_dir)
+        if manifest is None or manifest.get('created_at') == self.attached:
+            return None
+        snapshot = load_snapshot(self.snapshot_dir, manifest.get('fingerprint'), read_only=True)
+        if snapshot is None:
+            # Replaced since the manifest was read; the next refresh attaches to the new one
+            return None
+        self.attached = manifest.get('created_at')
+        return _model_from_snapshot(*snapshot)
+
+    def _holds_rebuild_lock(self):
+        """
+        Takes the rebuild lock if no other process holds it.
+
+        Returns:
+            bool: True if this process holds the rebuild lock, False otherwise.
+        """
+        import fcntl
+
+        if self._rebuild_lock is not None:
+            return True
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        lock_file = open(os.path.join(self.snapshot_dir, self.REBUILD_LOCK_FILE), 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._rebuild_lock = lock_file
+        logging.info("Process %d rebuilds the recommender snapshot in %s.", os.getpid(), self.snapshot_dir)
+        return True
+
+
+def create_model_holder():
+    """
+    Loads the model into a holder that refreshes it as configured.
+
+    The holder rebuilds every LABMATEAI_REFRESH_INTERVAL seconds through a SharedSnapshotLoader,
+    which needs LABMATEAI_SNAPSHOT_DIR. Without a snapshot directory the model is not refreshed,
+    since every worker would otherwise read the database and keep a private copy of the model.
+
+    Returns:
+        ModelHolder: The holder. Its rebuild thread is not started.
+    """
+    from .cli import CLI
+    from .model_holder import get_refresh_interval
+
+    cli = CLI()
+    refresh_interval = get_refresh_interval()
+    snapshot_dir = os.getenv('LABMATEAI_SNAPSHOT_DIR')
+    if not snapshot_dir:
+        if refresh_interval is not None:
+            logging.warning("LABMATEAI_REFRESH_INTERVAL needs LABMATEAI_SNAPSHOT_DIR; the model is not refreshed.")
+        return ModelHolder(lambda: load_model(cli), model=load_model(cli))
+
+    loader = SharedSnapshotLoader(cli, snapshot_dir)
+    try:
+        # Building brings the snapshot up to date; serve it if it could be saved
+        model = cli._build_model()
+        model = loader.attach() or model
+    finally:
+        cli.engine.dispose()
+    return ModelHolder(loader, refresh_interval=refresh_interval, model=model)
+
+
+def create_app(model):
+    """
+    Creates the Flask application serving a model.
+
+    Args:
+        model (Union[RecommenderModel, ModelHolder]): The model to serve, or a holder whose
+            current model serves each request.
+
+    Returns:
+        Flask: The application.
+    """
+    app = Flask(__name__)
+    # Each request fetches the model once, so a swap midway does not mix two models
+    current_model = model.get if isinstance(model, ModelHolder) else lambda: model
+
+    @app.errorhandler(_RequestError)
+    def handle_request_error(error):
+        return jsonify({'error': error.message}), error.status
+
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        if metrics.is_enabled() and 'request_start' in g:
+            endpoint = request.endpoint or 'unknown'
+            metrics.observe(f'server_{endpoint}_seconds', time.perf_counter() - g.request_start)
+            metrics.increment('server_requests_total')
+            if response.status_code >= 400:
+                metrics.increment('server_errors_total')
+        return response
+
+    @app.get('/metrics')
+    def metrics_endpoint():
+        if not metrics.is_enabled():
+            raise _RequestError(404, "Metrics are disabled. Set LABMATEAI_METRICS to enable them.")
+        if request.args.get('format') == 'json':
+            return Response(metrics.to_json(), mimetype='application/json')
+        return Response(metrics.to_prometheus(), mimetype='text/plain; version=0.0.4')
+
+    @app.get('/health')
+    def health():
+        model = current_model()
+        return jsonify({'status': 'ok', 'tools': len(model.content.tools)})
+
+    @app.get('/tools/<tool_name>/similar')
+    def similar_tools(tool_name):
+        model = current_model()
+        num_results = _num_results()
+        try:
+            tools = model.content.recommend_similar_tools(tool_name, num_results)
+        except ValueError as e:
+            raise _RequestError(404, str(e))
+        return jsonify({'tool_name': tool_name, 'results': [_tool_to_json(tool) for tool in tools]})
+
+    @app.get('/categories/<category>/tools')
+    def category_tools(category):
+        model = current_model()
+        num_results = _num_results()
+        tools = [tool for tool in model.content.tools if tool.category.lower() == category.lower()]
+        return jsonify({'category': category, 'results': [_tool_to_json(tool) for tool in tools[:num_results]]})
+
+    @app.get('/search')
+    def search():
+        model = current_model()
+        num_results = _num_results(default=10)
+        query = request.args.get('q', '').strip()
+        if not query:
+            raise _RequestError(400, "The query parameter 'q' is required.")
+        tools = search_tools(model.search_index, model.tree, query, num_results)
+        return jsonify({'query': query, 'results': [_tool_to_json(tool) for tool in tools]})
+
+    @app.get('/users/<int:user_id>/recommendations')
+    def collaborative_recommendations(user_id):
+        model = current_model()
+        num_results = _num_results()
+        if model.collaborative is None:
+            raise _RequestError(503, "Collaborative filtering is not available.")
+        if user_id not in model.collaborative.user_positions:
+            raise _RequestError(404, f"User ID {user_id} not found in the user-item matrix.")
+        recommendations = model.collaborative.recommend(user_id=user_id, num_recommendations=num_results)
+        return jsonify({'user_id': user_id, 'results': _to_json(recommendations)})
+
+    @app.get('/users/<int:user_id>/hybrid')
+    def hybrid_recommendations(user_id):
+        model = current_model()
+        num_results = _num_results()
+        if model.hybrid is None:
+            raise _RequestError(503, "Collaborative filtering is not available.")
+        try:
+            recommendations = model.hybrid.recommend(
+                user_id=user_id, tool_name=request.args.get('tool_name'), num_recommendations=num_results)
+        except ValueError as e:
+            raise _RequestError(404, str(e))
+        return jsonify({'user_id': user_id, 'results': _to_json(recommendations)})
+
+    return app
+
+
+class _RequestError(Exception):
+    """
+    An error answered with a JSON body and an HTTP status.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _num_results(default=5):
+    """
+    Reads the number of results requested with the 'n' query parameter.
+
+    Args:
+        default (int, optional): The number of results when 'n' is absent. Defaults to 5.
+
+    Returns:
+        int: The number of results.
+
+    Raises:
+        _RequestError: If 'n' is not a positive integer.
+    """
+    value = request.args.get('n')
+    if value is None:
+        return default
+    if not value.isdigit() or int(value) < 1:
+        raise _RequestError(400, "The query parameter 'n' must be a positive integer.")
+    return int(value)
+
+
+def _tool_to_json(tool: Tool):
+    """
+    Converts a Tool into a JSON-serializable dictionary.
+
+    Args:
+        tool (Tool): The tool.
+
+    Returns:
+        dict: The tool's fields, with features as a list.
+    """
+    return _to_json(dataclasses.asdict(tool))
+
+
+def _to_json(value):
+    """
+    Converts recommender output into JSON-serializable values.
+
+    Args:
+        value: A dictionary, sequence or scalar, possibly holding numpy scalars.
+
+    Returns:
+        The value with tuples as lists and numpy scalars as Python scalars.
+    """
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
@@ -0,0 +1,462 @@
+# labmateai/snapshot.py
+
+"""
+Snapshot Module for LabMateAI
+
+This module saves the fitted recommender artifacts to a local directory and loads them back,
+so a restart with unchanged data skips the database scan and the model rebuild.
+
+A snapshot directory holds a versioned manifest.json, the tool tables as JSON, and every
+array as a .npy file that is memory-mapped on load:
+
+    manifest.json                 format version, data fingerprint and model parameters
+    tools.json                    the content-based tools
+    graph_indptr.npy, graph_indices.npy, graph_weights.npy
+                                  the graph's top-k neighbor index
+    similarity.npy                the count-vector similarity matrix
+    collaborative_tools.json      the collaborative tools_df (only with a collaborative model)
+    ratings_data.npy, ratings_indices.npy, ratings_indptr.npy
+                                  the sparse user-item matrix in CSR layout
+    rating_counts.npy             the number of ratings averaged into each stored rating
+    user_ids.npy, tool_ids.npy    the row and column id maps of the user-item matrix
+
+A snapshot doubles as the export of a model served by several processes: loaded with
+read_only=True, every array stays a read-only mapping of its file, so the processes share the
+same page-cache pages however many of them attach.
+
+Saves take the directory's lock file exclusively and loads take it shared, so processes
+saving to the same directory write one at a time and a load never mixes the files of two
+saves. Locking needs fcntl; where it is unavailable, such as on Windows, no lock is taken.
+
+A snapshot is only loaded when its format version and data fingerprint match. The fingerprint's
+max_interaction_id doubles as a high-water mark: a snapshot with the same tools and an older
+high-water mark can be loaded by load_snapshot_for_sync and brought up to date with only the
+interactions above the mark.
+
+Functions:
+    compute_fingerprint: Build the data fingerprint a snapshot is keyed on.
+    save_snapshot: Write the fitted recommenders to a snapshot directory.
+    load_snapshot: Restore the recommenders from a snapshot directory if it is current.
+    load_snapshot_for_sync: Restore the recommenders from a snapshot that may lack new interactions.
+"""
+
+import json
+import logging
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from .graph import Graph
+from .recommenders.collaborative_recommender import CollaborativeRecommender
+from .recommenders.content_based_recommender import ContentBasedRecommender
+from .tool import Tool
+
+# Version of the on-disk layout; snapshots written with another version are ignored
+SNAPSHOT_FORMAT_VERSION = 3
+
+MANIFEST_FILE = 'manifest.json'
+
+LOCK_FILE = '.lock'
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def compute_fingerprint(max_interaction_id: Optional[int], tool_count: int) -> Dict[str, Optional[int]]:
+    """
+    Builds the data fingerprint a snapshot is keyed on.
+
+    Args:
+        max_interaction_id (Optional[int]): The highest interaction_id in the database, or None
+            if there are no interactions.
+        tool_count (int): The number of tools in the database.
+
+    Returns:
+        Dict[str, Optional[int]]: The fingerprint.
+    """
+    return {
+        'max_interaction_id': None if max_interaction_id is None else int(max_interaction_id),
+        'tool_count': int(tool_count)
+    }
+
+
+def save_snapshot(
+    directory: str,
+    fingerprint: Dict[str, Optional[int]],
+    content_recommender: ContentBasedRecommender,
+    collaborative_recommender: Optional[CollaborativeRecommender] = None
+) -> None:
+    """
+    Writes the fitted recommenders to a snapshot directory.
+
+    The manifest is removed first and written last, so an interrupted save leaves no
+    snapshot that load_snapshot would accept. Saves to the same directory, from any number of
+    processes, run one at a time.
+
+    Args:
+        directory (str): The snapshot directory. It is created if missing.
+        fingerprint (Dict[str, Optional[int]]): The data fingerprint from compute_fingerprint.
+        content_recommender (ContentBasedRecommender): A built content-based recommender.
+        collaborative_recommender (Optional[CollaborativeRecommender], optional): The collaborative
+            recommender, if there is one. Defaults to None.
+
+    Raises:
+        ValueError: If the content-based recommender's graph is not built.
+    """
+    graph = content_recommender.graph
+    if not getattr(graph, 'built', False):
+        raise ValueError("The content-based recommender's graph must be built before saving a snapshot.")
+
+    os.makedirs(directory, exist_ok=True)
+    with _snapshot_lock(directory, exclusive=True):
+        _write_snapshot(directory, fingerprint, content_recommender, collaborative_recommender)
+    logging.info("Saved recommender snapshot to %s.", directory)
+
+
+def _write_snapshot(
+    directory: str,
+    fingerprint: Dict[str, Optional[int]],
+    content_recommender: ContentBasedRecommender,
+    collaborative_recommender: Optional[CollaborativeRecommender]
+) -> None:
+    """
+    Writes the files of a snapshot. The caller holds the directory's lock.
+
+    Args:
+        directory (str): The snapshot directory.
+        fingerprint (Dict[str, Optional[int]]): The data fingerprint from compute_fingerprint.
+        content_recommender (ContentBasedRecommender): A built content-based recommender.
+        collaborative_recommender (Optional[CollaborativeRecommender]): The collaborative
+            recommender, or None.
+    """
+    graph = content_recommender.graph
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    _write_json(directory, 'tools.json', [
+        dict(tool.__dict__, features=list(tool.features)) for tool in content_recommender.tools
+    ])
+    _write_array(directory, 'graph_indptr.npy', graph.neighbor_indptr)
+    _write_array(directory, 'graph_indices.npy', graph.neighbor_indices)
+    _write_array(directory, 'graph_weights.npy', graph.neighbor_weights)
+    has_similarity = content_recommender.similarity_matrix is not None
+    if has_similarity:
+        _write_array(directory, 'similarity.npy', np.asarray(content_recommender.similarity_matrix))
+
+    collaborative = None
+    if collaborative_recommender is not None:
+        matrix = collaborative_recommender.user_item_matrix
+        _write_json(directory, 'collaborative_tools.json', {
+            'columns': list(collaborative_recommender.tools_df.columns),
+            'records': collaborative_recommender.tools_df.to_dict('records')
+        })
+        _write_array(directory, 'ratings_data.npy', matrix.data)
+        _write_array(directory, 'ratings_indices.npy', matrix.indices)
+        _write_array(directory, 'ratings_indptr.npy', matrix.indptr)
+        _write_array(directory, 'rating_counts.npy', collaborative_recommender.rating_counts)
+        _write_array(directory, 'user_ids.npy', collaborative_recommender.user_ids)
+        _write_array(directory, 'tool_ids.npy', collaborative_recommender.tool_ids)
+        collaborative = {
+            'shape': list(matrix.shape),
+            # As requested, before the cap to the number of users, which the constructor applies
+            'n_neighbors': collaborative_recommender._requested_neighbors,
+            'metric': collaborative_recommender.metric,
+            'algorithm': collaborative_recommender.algorithm
+        }
+
+    _write_json(directory, MANIFEST_FILE, {
+        'format_version': SNAPSHOT_FORMAT_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'fingerprint': fingerprint,
+        'content': {
+            'top_k': graph.top_k,
+            'has_similarity': has_similarity
+        },
+        'collaborative': collaborative
+    })
+
+
+def load_snapshot(
+    directory: str,
+    fingerprint: Dict[str, Optional[int]],
+    read_only: bool = False
+) -> Optional[Tuple[ContentBasedRecommender, Optional[CollaborativeRecommender]]]:
+    """
+    Restores the recommenders from a snapshot directory if it matches the data fingerprint.
+
+    Arrays are memory-mapped rather than read. The similarity matrix and graph index are
+    mapped read-only; the user-item matrix and its rating counts are mapped copy-on-write so
+    update_interactions can still change them in memory, unless read_only is set.
+
+    Args:
+        directory (str): The snapshot directory.
+        fingerprint (Dict[str, Optional[int]]): The current data fingerprint from compute_fingerprint.
+        read_only (bool, optional): Whether to map the user-item matrix and its rating counts
+            read-only too, so processes serving the snapshot never copy its pages. The collaborative
+            recommender then rejects update_interactions. Defaults to False.
+
+    Returns:
+        Optional[Tuple[ContentBasedRecommender, Optional[CollaborativeRecommender]]]: The content-based
+            and collaborative recommenders, or None if there is no current snapshot.
+    """
+    with _snapshot_lock(directory, exclusive=False):
+        manifest = _read_current_format_manifest(directory)
+        if manifest is None:
+            return None
+        if manifest.get('fingerprint') != fingerprint:
+            logging.info("Snapshot in %s is stale.", directory)
+            return None
+        return _load_recommenders(directory, manifest, read_only)
+
+
+def load_snapshot_for_sync(
+    directory: str,
+    fingerprint: Dict[str, Optional[int]]
+) -> Optional[Tuple[ContentBasedRecommender, Optional[CollaborativeRecommender], Optional[int]]]:
+    """
+    Restores the recommenders from a snapshot that matches the current tools but may predate
+    the newest interactions.
+
+    Interaction IDs are assigned in increasing order, so the snapshot's max_interaction_id is a
+    high-water mark: the interactions it lacks are exactly those with a higher interaction_id.
+
+    Args:
+        directory (str): The snapshot directory.
+        fingerprint (Dict[str, Optional[int]]): The current data fingerprint from compute_fingerprint.
+
+    Returns:
+        Optional[Tuple[ContentBasedRecommender, Optional[CollaborativeRecommender], Optional[int]]]: The
+            content-based and collaborative recommenders and the snapshot's high-water mark, or None
+            if there is no snapshot of the current tools with a high-water mark at or below the
+            current one.
+    """
+    with _snapshot_lock(directory, exclusive=False):
+        manifest = _read_current_format_manifest(directory)
+        if manifest is None:
+            return None
+        saved = manifest.get('fingerprint') or {}
+        high_water_mark = saved.get('max_interaction_id')
+        current_mark = fingerprint['max_interaction_id']
+        if saved.get('tool_count') != fingerprint['tool_count'] or (
+                high_water_mark is not None and (current_mark is None or high_water_mark > current_mark)):
+            logging.info("Snapshot in %s is stale.", directory)
+            return None
+        content_recommender, collaborative_recommender = _load_recommenders(directory, manifest)
+    return content_recommender, collaborative_recommender, high_water_mark
+
+
+@contextmanager
+def _snapshot_lock(directory: str, exclusive: bool):
+    """
+    Holds the lock file of a snapshot directory for the duration of a with block.
+
+    Mapped arrays stay valid after the lock is released, since a later save replaces their
+    files rather than rewriting them.
+
+    Args:
+        directory (str): The snapshot directory.
+        exclusive (bool): Whether to lock exclusively, for a save, or shared, for a load.
+    """
+    if fcntl is None or not os.path.isdir(directory):
+        yield
+        return
+    with open(os.path.join(directory, LOCK_FILE), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _read_current_format_manifest(directory: str) -> Optional[Dict]:
+    """
+    Reads the manifest of a snapshot directory if it was written in the current format.
+
+    Args:
+        directory (str): The snapshot directory.
+
+    Returns:
+        Optional[Dict]: The manifest, or None if there is no snapshot in the current format.
+    """
+    manifest = read_manifest(directory)
+    if manifest is None:
+        return None
+    if manifest.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+        logging.info("Ignoring snapshot in %s with format version %s.", directory, manifest.get('format_version'))
+        return None
+    return manifest
+
+
+def _load_recommenders(
+    directory: str,
+    manifest: Dict,
+    read_only: bool = False
+) -> Tuple[ContentBasedRecommender, Optional[CollaborativeRecommender]]:
+    """
+    Restores the recommenders described by a manifest.
+
+    Args:
+        directory (str): The snapshot directory.
+        manifest (Dict): The snapshot's manifest.
+        read_only (bool, optional): Whether to map the ratings read-only instead of copy-on-write.
+            Defaults to False.
+
+    Returns:
+        Tuple[ContentBasedRecommender, Optional[CollaborativeRecommender]]: The recommenders.
+    """
+    tools = [
+        Tool(**dict(record, features=tuple(record['features'])))
+        for record in _read_json(directory, 'tools.json')
+    ]
+    graph = Graph([], top_k=manifest['content']['top_k'])
+    graph.load_neighbor_index(
+        tools,
+        _read_array(directory, 'graph_indptr.npy'),
+        _read_array(directory, 'graph_indices.npy'),
+        _read_array(directory, 'graph_weights.npy')
+    )
+    similarity_matrix = None
+    if manifest['content']['has_similarity']:
+        similarity_matrix = _read_array(directory, 'similarity.npy')
+    content_recommender = ContentBasedRecommender(
+        tools=tools,
+        graph=graph,
+        similarity_matrix=similarity_matrix
+    )
+
+    collaborative_recommender = None
+    collaborative = manifest.get('collaborative')
+    if collaborative is not None:
+        tools_table = _read_json(directory, 'collaborative_tools.json')
+        ratings_mode = 'r' if read_only else 'c'
+        matrix = sp.csr_matrix(
+            (
+                _read_array(directory, 'ratings_data.npy', mmap_mode=ratings_mode),
+                _read_array(directory, 'ratings_indices.npy', mmap_mode=ratings_mode),
+                _read_array(directory, 'ratings_indptr.npy', mmap_mode=ratings_mode)
+            ),
+            shape=tuple(collaborative['shape'])
+        )
+        collaborative_recommender = CollaborativeRecommender(
+            user_item_matrix=matrix,
+            tools_df=pd.DataFrame(tools_table['records'], columns=tools_table['columns']),
+            n_neighbors=collaborative['n_neighbors'],
+            metric=collaborative['metric'],
+            algorithm=collaborative['algorithm'],
+            user_ids=_read_array(directory, 'user_ids.npy'),
+            tool_ids=_read_array(directory, 'tool_ids.npy'),
+            rating_counts=_read_array(directory, 'rating_counts.npy', mmap_mode=ratings_mode)
+        )
+
+    logging.info("Loaded recommender snapshot from %s.", directory)
+    return content_recommender, collaborative_recommender
+
+
+def read_manifest(directory: str) -> Optional[Dict]:
+    """
+    Reads the manifest of a snapshot directory.
+
+    Args:
+        directory (str): The snapshot directory.
+
+    Returns:
+        Optional[Dict]: The manifest, or None if the directory holds no readable snapshot.
+    """
+    try:
+        return _read_json(directory, MANIFEST_FILE)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_array(directory: str, name: str, array: np.ndarray) -> None:
+    """
+    Writes an array to a .npy file through a temporary file.
+
+    The file is replaced rather than rewritten, so processes that map the previous file keep
+    reading it. Temporary files are named per process, so processes saving at once do not
+    write into each other's.
+
+    Args:
+        directory (str): The snapshot directory.
+        name (str): The file name.
+        array (np.ndarray): The array to write.
+    """
+    path = os.path.join(directory, name)
+    temporary_path = f'{path}.{os.getpid()}.tmp'
+    with open(temporary_path, 'wb') as file:
+        np.save(file, np.ascontiguousarray(array))
+    os.replace(temporary_path, path)
+
+
+def _read_array(directory: str, name: str, mmap_mode: str = 'r') -> np.ndarray:
+    """
+    Memory-maps an array from a .npy file.
+
+    Args:
+        directory (str): The snapshot directory.
+        name (str): The file name.
+        mmap_mode (str, optional): The numpy memory-map mode. Defaults to 'r'.
+
+    Returns:
+        np.ndarray: The memory-mapped array.
+    """
+    return np.load(os.path.join(directory, name), mmap_mode=mmap_mode)
+
+
+def _write_json(directory: str, name: str, payload) -> None:
+    """
+    Writes a JSON file through a temporary file.
+
+    Args:
+        directory (str): The snapshot directory.
+        name (str): The file name.
+        payload: The JSON-serializable payload. Numpy scalars are converted to Python values.
+    """
+    path = os.path.join(directory, name)
+    temporary_path = f'{path}.{os.getpid()}.tmp'
+    with open(temporary_path, 'w', encoding='utf-8') as file:
+        json.dump(payload, file, default=_json_default)
+    os.replace(temporary_path, path)
+
+
+def _read_json(directory: str, name: str):
+    """
+    Reads a JSON file.
+
+    Args:
+        directory (str): The snapshot directory.
+        name (str): The file name.
+
+    Returns:
+        The decoded payload.
+    """
+    with open(os.path.join(directory, name), encoding='utf-8') as file:
+        return json.load(file)
+
+
+def _json_default(value):
+    """
+    Converts values json cannot encode natively.
+
+    Args:
+        value: The value to convert.
+
+    Returns:
+        A JSON-serializable equivalent of value.
+
+    Raises:
+        TypeError: If the value cannot be converted.
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (np.ndarray, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
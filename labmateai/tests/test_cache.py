@@ -0,0 +1,112 @@
+# tests/test_cache.py
+
+"""
+Unit tests for the cache module in LabMateAI.
+"""
+
+import os
+import numpy as np
+import pytest
+from labmateai.cache import INTERACTIONS_FILE, MANIFEST_FILE, is_fresh, read_interaction_chunks, \
+    read_tools, read_users, write_cache
+from labmateai.data_loader import InteractionChunk
+from labmateai.recommenders.content_based_recommender import build_sparse_user_item_matrix, \
+    build_sparse_user_item_matrix_from_chunks
+from labmateai.tool import Tool
+
+pyarrow = pytest.importorskip('pyarrow')
+
+FINGERPRINT = {'max_interaction_id': 6, 'tool_count': 2}
+
+
+@pytest.fixture
+def tables():
+    """
+    Fixture providing tools, users and two interaction chunks, one with an unrated interaction.
+    """
+    tools = [
+        Tool(tool_id=1, name='Tool1', category='Genomics', features=('alignment', 'rna_seq'), cost='Free',
+             description='Aligner', url='https://tool1.example.com/', language='C', platform='Linux'),
+        Tool(tool_id=2, name='Tool2', category='Imaging', features=(), cost='Paid',
+             description='Viewer', url='https://tool2.example.com/', language='Java', platform='Windows'),
+    ]
+    users = [{'user_id': 10, 'user_name': 'Ada', 'email': 'ada@example.com',
+              'department': 'Biology', 'role': 'Researcher'}]
+    chunks = [
+        InteractionChunk(
+            user_id=np.array([10, 10, 11], dtype=np.int64),
+            tool_id=np.array([1, 2, 1], dtype=np.int64),
+            rating=np.array([5.0, np.nan, 3.0]),
+            timestamp=np.array(['2024-01-01T10:00', 'NaT', '2024-01-02T09:30'], dtype='datetime64[us]')
+        ),
+        InteractionChunk(
+            user_id=np.array([12], dtype=np.int64),
+            tool_id=np.array([2], dtype=np.int64),
+            rating=np.array([4.0]),
+            timestamp=np.array(['2024-01-03'], dtype='datetime64[us]')
+        ),
+    ]
+    return tools, users, chunks
+
+
+def test_round_trip(tmp_path, tables):
+    """
+    Test that the cached tables read back equal to what was written, chunk by chunk.
+    """
+    tools, users, chunks = tables
+    assert write_cache(str(tmp_path), FINGERPRINT, tools, users, iter(chunks)) == 4
+
+    assert read_tools(str(tmp_path)) == tools
+    assert read_users(str(tmp_path)) == users
+
+    read_chunks = list(read_interaction_chunks(str(tmp_path)))
+    assert len(read_chunks) == len(chunks)
+    for read_chunk, chunk in zip(read_chunks, chunks):
+        for read_column, column in zip(read_chunk, chunk):
+            np.testing.assert_array_equal(read_column, column)
+        assert read_chunk.timestamp.dtype == np.dtype('datetime64[us]')
+
+
+def test_interactions_are_read_without_copying(tmp_path, tables):
+    """
+    Test that the numeric interaction columns are read-only views of the memory-mapped file,
+    and build the same matrix as the original arrays.
+    """
+    tools, users, chunks = tables
+    write_cache(str(tmp_path), FINGERPRINT, tools, users, chunks)
+
+    read_chunks = list(read_interaction_chunks(str(tmp_path)))
+    for chunk in read_chunks:
+        assert not chunk.user_id.flags.writeable
+        assert not chunk.tool_id.flags.writeable
+        assert not chunk.rating.flags.writeable
+
+    expected = build_sparse_user_item_matrix(
+        [10, 11, 12], [1, 1, 2], [5.0, 3.0, 4.0], return_counts=True)
+    result = build_sparse_user_item_matrix_from_chunks(read_chunks, return_counts=True)
+    assert (result[0] != expected[0]).nnz == 0
+    for result_part, expected_part in zip(result[1:], expected[1:]):
+        np.testing.assert_array_equal(result_part, expected_part)
+
+
+def test_is_fresh(tmp_path, tables):
+    """
+    Test that a cache is fresh only when complete and written with the same fingerprint.
+    """
+    tools, users, chunks = tables
+    assert not is_fresh(str(tmp_path), FINGERPRINT)
+
+    write_cache(str(tmp_path), FINGERPRINT, tools, users, chunks)
+    assert is_fresh(str(tmp_path), FINGERPRINT)
+    assert not is_fresh(str(tmp_path), {'max_interaction_id': 7, 'tool_count': 2})
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        [MANIFEST_FILE, 'tools.parquet', 'users.parquet', INTERACTIONS_FILE])
+
+    # A rewrite that fails partway leaves no manifest, so the old cache is no longer fresh
+    def failing_chunks():
+        yield chunks[0]
+        raise RuntimeError("Connection lost")
+
+    with pytest.raises(RuntimeError, match="Connection lost"):
+        write_cache(str(tmp_path), FINGERPRINT, tools, users, failing_chunks())
+    assert not is_fresh(str(tmp_path), FINGERPRINT)
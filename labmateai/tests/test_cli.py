@@ -69,6 +69,46 @@ class TestCLI(unittest.TestCase):
         """
         patch.stopall()
 
+    def test_run_migrations_skips_current_schema(self):
+        """
+        Test that the Alembic upgrade runs only when the database is behind the head revision.
+        """
+        self.patcher_run_migrations.stop()
+        self.cli.testing = False
+
+        with patch('alembic.command.upgrade') as mock_upgrade, \
+             patch.object(self.cli, '_schema_is_current', return_value=True):
+            self.cli._run_migrations()
+            mock_upgrade.assert_not_called()
+
+        with patch('alembic.command.upgrade') as mock_upgrade, \
+             patch.object(self.cli, '_schema_is_current', return_value=False):
+            self.cli._run_migrations()
+            mock_upgrade.assert_called_once()
+            self.assertEqual(mock_upgrade.call_args.args[1], 'head')
+
+    def test_schema_is_current(self):
+        """
+        Test the revision check against a local database before and after it is stamped at head.
+        """
+        import tempfile
+        from alembic import command
+        from alembic.config import Config
+        from sqlalchemy import create_engine
+        import labmateai
+
+        with tempfile.TemporaryDirectory() as directory:
+            url = f"sqlite:///{os.path.join(directory, 'labmateai.db')}"
+            self.cli.engine = create_engine(url)
+            config = Config()
+            config.set_main_option('script_location', os.path.join(os.path.dirname(labmateai.__file__), 'alembic'))
+            config.set_main_option('sqlalchemy.url', url)
+
+            self.assertFalse(self.cli._schema_is_current(config))
+            command.stamp(config, 'head')
+            self.assertTrue(self.cli._schema_is_current(config))
+            self.cli.engine.dispose()
+
     def test_construct_database_url_testing(self):
         """
         Test that the database URL is constructed correctly in testing mode.
@@ -147,6 +187,35 @@ class TestCLI(unittest.TestCase):
         self.mock_session.add.assert_called()
         self.mock_session.commit.assert_called_once()
 
+    def test_log_interaction_updates_collaborative_recommender(self):
+        """
+        Test that a logged rating is applied to the collaborative recommender in place.
+        """
+        self.cli.cf_recommender = MagicMock()
+
+        self.cli._log_interaction(user_id=1, tool_id=2, rating=4)
+        self.cli.cf_recommender.update_interactions.assert_called_once_with([1], [2], [4])
+
+        self.cli.cf_recommender.reset_mock()
+        self.cli._log_interaction(user_id=1, tool_id=2, usage_frequency='Often')
+        self.cli.cf_recommender.update_interactions.assert_not_called()
+
+    def test_log_interaction_write_behind(self):
+        """
+        Test that LABMATEAI_WRITE_BEHIND queues interactions on one sink instead of committing each.
+        """
+        self.cli.cf_recommender = MagicMock()
+        with patch.dict(os.environ, {'LABMATEAI_WRITE_BEHIND': '1'}), \
+             patch('labmateai.interaction_sink.InteractionSink') as mock_sink_class:
+            self.cli._log_interaction(user_id=1, tool_id=2, rating=4)
+            self.cli._log_interaction(user_id=1, tool_id=3, usage_frequency='Often')
+
+            mock_sink_class.assert_called_once_with(self.cli.engine)
+            mock_sink_class.return_value.submit.assert_any_call(1, 2, rating=4, usage_frequency=None)
+            self.assertEqual(mock_sink_class.return_value.submit.call_count, 2)
+            self.mock_session.commit.assert_not_called()
+            self.cli.cf_recommender.update_interactions.assert_called_once_with([1], [2], [4])
+
     def test_log_interaction_exception(self):
         """
         Test logging an interaction with an exception.
@@ -194,6 +263,54 @@ class TestCLI(unittest.TestCase):
                 self.cli.start()
             mock_print.assert_called_with("Exiting LabMateAI. Goodbye!")
 
+    @patch('labmateai.cli.CLI._load_data_and_initialize_recommenders')
+    @patch('labmateai.cli.CLI._get_or_create_user', return_value=1)
+    @patch('labmateai.cli.input', side_effect=['3', '4'])
+    def test_start_swaps_rebuilt_model_between_actions(self, mock_input, mock_get_user, mock_load_data):
+        """
+        Test that with LABMATEAI_REFRESH_INTERVAL set, the CLI starts a model holder, installs
+        its rebuilt recommenders before the next menu action, and closes it on exit.
+        """
+        from labmateai.model_holder import RecommenderModel
+
+        rebuilt = RecommenderModel(MagicMock(), MagicMock(), MagicMock(), MagicMock(), MagicMock())
+        searched = []
+
+        with patch.dict(os.environ, {'LABMATEAI_REFRESH_INTERVAL': '60'}), \
+             patch('labmateai.model_holder.RecommenderModel.build') as mock_build, \
+             patch('labmateai.model_holder.ModelHolder') as mock_holder_class, \
+             patch.object(self.cli, 'handle_search_tools',
+                          side_effect=lambda user_id: searched.append(self.cli.recommender)):
+            holder = mock_holder_class.return_value
+            holder.get.return_value = rebuilt
+            with self.assertRaises(SystemExit):
+                self.cli.start()
+
+            mock_holder_class.assert_called_once_with(
+                self.cli._build_model, refresh_interval=60.0, model=mock_build.return_value)
+            holder.start.assert_called_once()
+            holder.close.assert_called_once()
+            self.assertEqual(searched, [rebuilt.content])
+            self.assertIs(self.cli.cf_recommender, rebuilt.collaborative)
+            self.assertIs(self.cli.tools, rebuilt.content.tools)
+            self.assertIs(self.cli._get_search_index(rebuilt.tree), rebuilt.search_index)
+
+    def test_build_model_leaves_served_recommenders(self):
+        """
+        Test that building a model in the background loads it without replacing the CLI's recommenders.
+        """
+        served = self.cli.recommender = MagicMock()
+
+        with patch.object(CLI, '_load_recommenders', autospec=True,
+                          side_effect=lambda builder, session: setattr(builder, 'recommender', MagicMock())), \
+             patch('labmateai.model_holder.RecommenderModel.build') as mock_build:
+            model = self.cli._build_model()
+
+        self.assertIs(model, mock_build.return_value)
+        self.assertIsNot(mock_build.call_args.args[0], served)
+        self.assertIs(self.cli.recommender, served)
+        self.mock_session.close.assert_called_once()
+
     @patch('labmateai.cli.CLI.handle_recommend_similar_tools')
     @patch('labmateai.cli.CLI._load_data_and_initialize_recommenders')
     @patch('labmateai.cli.CLI._get_or_create_user', return_value=1)
@@ -349,23 +466,63 @@ class TestCLI(unittest.TestCase):
             mock_print.assert_any_call("No tools found for the given keyword.")
             mock_prompt.assert_not_called()
 
+    @patch('labmateai.cli.CLI._prompt_rating')
+    @patch('labmateai.cli.input', side_effect=['feature2', '3', 'feature1', '3'])
+    def test_handle_search_tools_reuses_index(self, mock_input, mock_prompt):
+        """
+        Test that search matches features through the tool tree, which is built once per tool list.
+        """
+        self.cli.tools = [
+            Tool(tool_id=1, name='Tool1', category='Category1', description='Desc1',
+                 features=['feature1'], cost='Free', url='url1', language='Python', platform='Linux'),
+            Tool(tool_id=2, name='Tool2', category='Category2', description='Desc2',
+                 features=['feature2'], cost='Free', url='url2', language='Python', platform='Linux')
+        ]
+
+        with patch('labmateai.cli.print'):
+            self.cli.handle_search_tools(user_id=1)
+            tree = self.cli._search_tree
+            self.cli.handle_search_tools(user_id=1)
+
+        self.assertIs(self.cli._search_tree, tree)
+        self.assertEqual([call.args[0] for call in mock_prompt.call_args_list],
+                         [[self.cli.tools[1]], [self.cli.tools[0]]])
+
+    @patch('labmateai.cli.CLI._prompt_rating')
+    @patch('labmateai.cli.input', side_effect=['keyword', '3'])
+    def test_handle_search_tools_ranks_then_fills_partial_matches(self, mock_input, mock_prompt):
+        """
+        Test that ranked matches come first, best first, followed by partial matches.
+        """
+        self.cli.tools = [
+            Tool(tool_id=1, name='Keywords Pro', category='Category1', description='Desc1',
+                 features=['feature1'], cost='Free', url='url1', language='Python', platform='Linux'),
+            Tool(tool_id=2, name='Tool2', category='Category1', description='Finds a keyword',
+                 features=['feature2'], cost='Free', url='url2', language='Python', platform='Linux'),
+            Tool(tool_id=3, name='Keyword Tool', category='Category2', description='Desc3',
+                 features=['feature3'], cost='Free', url='url3', language='Python', platform='Linux')
+        ]
+
+        with patch('labmateai.cli.print'):
+            self.cli.handle_search_tools(user_id=1)
+
+        mock_prompt.assert_called_once_with(
+            [self.cli.tools[2], self.cli.tools[1], self.cli.tools[0]], 1)
+
     def test_load_data_and_initialize_recommenders(self):
         """
         Test loading data and initializing recommenders.
         """
-        # Mock the session's query method to return tools
-        from labmateai.models import Tool as ToolModel, Interaction
+        # Mock the session's query method to return tools, then the rating aggregates
+        from labmateai.models import Tool as ToolModel
 
         tool1 = ToolModel(tool_id=1, name='Tool1', category='Category1', description='Desc1',
                           features='{feature1}', cost='Free', url='url1', language='Python', platform='Linux')
         tool2 = ToolModel(tool_id=2, name='Tool2', category='Category2', description='Desc2',
                           features='{feature2}', cost='Free', url='url2', language='Python', platform='Linux')
 
-        self.mock_session.query.return_value.all.return_value = [tool1, tool2]
-
-        # Mock interactions
-        interaction = Interaction(user_id=1, tool_id=1, rating=5, usage_frequency='Often')
-        self.mock_session.query.return_value.filter.return_value.all.return_value = [interaction]
+        # User 1 rated tool 1 twice, with 4 and 5, and tool 2 once
+        self.mock_session.query.return_value.all.side_effect = [[tool1, tool2], [(1, 1, 9, 2), (1, 2, 3, 1)]]
 
         # Mock recommenders
         with patch('labmateai.recommenders.content_based_recommender.ContentBasedRecommender') as mock_cb_recommender, \
@@ -378,6 +535,10 @@ class TestCLI(unittest.TestCase):
             mock_cf_recommender.assert_called_once()
             mock_hybrid_recommender.assert_called_once()
 
+            kwargs = mock_cf_recommender.call_args.kwargs
+            self.assertEqual(kwargs['user_item_matrix'].toarray().tolist(), [[4.5, 3.0]])
+            self.assertEqual(kwargs['rating_counts'].tolist(), [2.0, 1.0])
+
     def test_load_data_and_initialize_recommenders_no_interactions(self):
         """
         Test loading data when there are no interactions.
@@ -388,10 +549,8 @@ class TestCLI(unittest.TestCase):
         tool1 = ToolModel(tool_id=1, name='Tool1', category='Category1', description='Desc1',
                           features='{feature1}', cost='Free', url='url1', language='Python', platform='Linux')
 
-        self.mock_session.query.return_value.all.return_value = [tool1]
-
-        # Mock interactions to be empty
-        self.mock_session.query.return_value.filter.return_value.all.return_value = []
+        # Mock the rating aggregates to be empty
+        self.mock_session.query.return_value.all.side_effect = [[tool1], []]
 
         # Mock recommenders
         with patch('labmateai.recommenders.content_based_recommender.ContentBasedRecommender') as mock_cb_recommender, \
@@ -402,6 +561,144 @@ class TestCLI(unittest.TestCase):
             mock_cb_recommender.assert_called_once()
             mock_logging.warning.assert_any_call("No interactions found in the database.")
 
+    def test_load_data_and_initialize_recommenders_from_snapshot(self):
+        """
+        Test that a current snapshot replaces the rebuild when LABMATEAI_SNAPSHOT_DIR is set.
+        """
+        self.mock_session.query.return_value.scalar.side_effect = [42, 2]
+        content = MagicMock()
+        content.tools = [Tool(1, 'Tool1', 'Category1', 'Desc1', ('feature1',), 'Free', 'url1', 'Python', 'Linux')]
+        collaborative = MagicMock()
+
+        with patch.dict(os.environ, {'LABMATEAI_SNAPSHOT_DIR': '/tmp/labmateai-snapshot'}), \
+             patch('labmateai.snapshot.load_snapshot_for_sync',
+                   return_value=(content, collaborative, 42)) as mock_load, \
+             patch('labmateai.snapshot.save_snapshot') as mock_save, \
+             patch('labmateai.recommenders.hybrid_recommender.HybridRecommender') as mock_hybrid_recommender, \
+             patch.object(self.cli, '_build_recommenders') as mock_build:
+
+            self.cli._load_data_and_initialize_recommenders()
+
+            mock_load.assert_called_once_with(
+                '/tmp/labmateai-snapshot', {'max_interaction_id': 42, 'tool_count': 2})
+            mock_build.assert_not_called()
+            mock_save.assert_not_called()
+            self.assertIs(self.cli.recommender, content)
+            self.assertIs(self.cli.cf_recommender, collaborative)
+            self.assertIs(self.cli.hybrid_recommender, mock_hybrid_recommender.return_value)
+            self.assertEqual(self.cli.tools, content.tools)
+            self.assertTrue(self.cli.data_loaded)
+
+    def test_load_data_and_initialize_recommenders_saves_stale_snapshot(self):
+        """
+        Test that a missing or stale snapshot leads to a rebuild followed by a save.
+        """
+        self.mock_session.query.return_value.scalar.side_effect = [None, 2]
+
+        def build(session):
+            self.cli.tools = []
+            self.cli.recommender = MagicMock()
+            self.cli.cf_recommender = None
+
+        with patch.dict(os.environ, {'LABMATEAI_SNAPSHOT_DIR': '/tmp/labmateai-snapshot'}), \
+             patch('labmateai.snapshot.load_snapshot_for_sync', return_value=None), \
+             patch('labmateai.snapshot.save_snapshot') as mock_save, \
+             patch.object(self.cli, '_build_recommenders', side_effect=build) as mock_build:
+
+            self.cli._load_data_and_initialize_recommenders()
+
+            mock_build.assert_called_once_with(self.mock_session)
+            mock_save.assert_called_once_with(
+                '/tmp/labmateai-snapshot', {'max_interaction_id': None, 'tool_count': 2},
+                self.cli.recommender, None)
+
+    def test_load_data_and_initialize_recommenders_merges_new_interactions(self):
+        """
+        Test that a snapshot behind the newest interactions is updated with only the interactions
+        above its high-water mark, then saved with the current fingerprint.
+        """
+        self.mock_session.query.return_value.scalar.side_effect = [45, 2]
+        self.mock_session.query.return_value.filter.return_value.all.return_value = [(7, 1, 4), (8, 2, None)]
+        content = MagicMock()
+        content.tools = [Tool(1, 'Tool1', 'Category1', 'Desc1', ('feature1',), 'Free', 'url1', 'Python', 'Linux')]
+        collaborative = MagicMock()
+
+        with patch.dict(os.environ, {'LABMATEAI_SNAPSHOT_DIR': '/tmp/labmateai-snapshot'}), \
+             patch('labmateai.snapshot.load_snapshot_for_sync', return_value=(content, collaborative, 42)), \
+             patch('labmateai.snapshot.save_snapshot') as mock_save, \
+             patch('labmateai.recommenders.hybrid_recommender.HybridRecommender'), \
+             patch.object(self.cli, '_build_recommenders') as mock_build:
+
+            self.cli._load_data_and_initialize_recommenders()
+
+            filter_condition = self.mock_session.query.return_value.filter.call_args.args[0]
+            self.assertEqual(str(filter_condition.compile(compile_kwargs={'literal_binds': True})),
+                             'interactions.interaction_id > 42')
+            collaborative.update_interactions.assert_called_once_with((7, 8), (1, 2), (4, None))
+            mock_build.assert_not_called()
+            self.assertIs(self.cli.cf_recommender, collaborative)
+            mock_save.assert_called_once_with(
+                '/tmp/labmateai-snapshot', {'max_interaction_id': 45, 'tool_count': 2}, content, collaborative)
+
+        # A snapshot without a collaborative recommender cannot absorb new interactions
+        self.cli.data_loaded = False
+        self.mock_session.query.return_value.scalar.side_effect = [45, 2]
+        with patch.dict(os.environ, {'LABMATEAI_SNAPSHOT_DIR': '/tmp/labmateai-snapshot'}), \
+             patch('labmateai.snapshot.load_snapshot_for_sync', return_value=(content, None, None)), \
+             patch('labmateai.snapshot.save_snapshot'), \
+             patch.object(self.cli, '_build_recommenders') as mock_build:
+
+            self.cli._load_data_and_initialize_recommenders()
+            mock_build.assert_called_once_with(self.mock_session)
+
+    def test_load_data_and_initialize_recommenders_from_cache(self):
+        """
+        Test that a fresh local cache replaces the tool and interaction queries when
+        LABMATEAI_CACHE_DIR is set, and that a stale one falls back to the database.
+        """
+        import numpy as np
+        from labmateai.data_loader import InteractionChunk
+        from labmateai.tool import Tool as CustomTool
+
+        self.mock_session.query.return_value.scalar.side_effect = [42, 1]
+        tools = [CustomTool(1, 'Tool1', 'Category1', ('feature1',), 'Free', 'Desc1', 'url1', 'Python', 'Linux')]
+        chunk = InteractionChunk(np.array([7, 8]), np.array([1, 1]), np.array([4.0, np.nan]),
+                                 np.array(['2024-01-01', 'NaT'], dtype='datetime64[us]'))
+
+        with patch.dict(os.environ, {'LABMATEAI_CACHE_DIR': '/tmp/labmateai-cache'}), \
+             patch('labmateai.cache.is_fresh', return_value=True) as mock_is_fresh, \
+             patch('labmateai.cache.read_tools', return_value=tools), \
+             patch('labmateai.cache.read_interaction_chunks', return_value=iter([chunk])), \
+             patch('labmateai.recommenders.content_based_recommender.ContentBasedRecommender'), \
+             patch('labmateai.recommenders.collaborative_recommender.CollaborativeRecommender') as mock_cf_recommender, \
+             patch('labmateai.recommenders.hybrid_recommender.HybridRecommender'):
+
+            self.cli._load_data_and_initialize_recommenders()
+
+            mock_is_fresh.assert_called_once_with(
+                '/tmp/labmateai-cache', {'max_interaction_id': 42, 'tool_count': 1})
+            self.mock_session.query.return_value.all.assert_not_called()
+            self.assertEqual(self.cli.tools, tools)
+            kwargs = mock_cf_recommender.call_args.kwargs
+            self.assertEqual(kwargs['user_item_matrix'].nnz, 1)
+            self.assertEqual(list(kwargs['user_ids']), [7])
+            self.assertEqual(list(kwargs['tools_df']['tool_id']), [1])
+
+        from labmateai.models import Tool as ToolModel
+        self.cli.data_loaded = False
+        self.mock_session.query.return_value.scalar.side_effect = [43, 1]
+        self.mock_session.query.return_value.all.side_effect = [[ToolModel(
+            tool_id=1, name='Tool1', category='Category1', description='Desc1',
+            features='{feature1}', cost='Free', url='url1', language='Python', platform='Linux')], []]
+        with patch.dict(os.environ, {'LABMATEAI_CACHE_DIR': '/tmp/labmateai-cache'}), \
+             patch('labmateai.cache.is_fresh', return_value=False), \
+             patch('labmateai.cache.read_tools') as mock_read_tools, \
+             patch('labmateai.recommenders.content_based_recommender.ContentBasedRecommender'):
+
+            self.cli._load_data_and_initialize_recommenders()
+            mock_read_tools.assert_not_called()
+            self.assertEqual([tool.features for tool in self.cli.tools], [('feature1',)])
+
     def test_load_data_and_initialize_recommenders_exception(self):
         """
         Test handling exceptions during data loading.
@@ -441,6 +738,21 @@ class TestCLI(unittest.TestCase):
         self.cli.handle_search_tools(user_id=1)
         mock_print.assert_called_with("An error occurred while searching for tools. Please try again.")
 
+    def test_main_cache_refresh(self):
+        """
+        Test that 'labmateai cache refresh' rebuilds the cache instead of starting the session.
+        """
+        with patch.object(sys, 'argv', ['labmateai', 'cache', 'refresh', '--dir', '/tmp/labmateai-cache']), \
+             patch('labmateai.cli.CLI.__init__', return_value=None), \
+             patch('labmateai.cli.CLI.refresh_cache', return_value=3) as mock_refresh, \
+             patch('labmateai.cli.CLI.start') as mock_start, \
+             patch('labmateai.cli.print') as mock_print:
+            from labmateai.cli import main
+            main()
+            mock_refresh.assert_called_once_with('/tmp/labmateai-cache')
+            mock_start.assert_not_called()
+            mock_print.assert_called_once_with("Cached 3 interactions in /tmp/labmateai-cache.")
+
     def test_main(self):
         """
         Test the main function.
@@ -9,10 +9,13 @@ and functions as expected when providing collaborative filtering-based recommend
 
 import unittest
 from unittest.mock import MagicMock, patch
-from labmateai.recommenders.collaborative_recommender import CollaborativeRecommender
+from labmateai.recommenders.collaborative_recommender import CollaborativeRecommender, UserPositions
+from labmateai.recommenders.content_based_recommender import build_sparse_user_item_matrix
 from labmateai.recommenders.recommender_interface import RecommenderInterface
 import pandas as pd
 import numpy as np
+import scipy.sparse as sp
+from sklearn.neighbors import NearestNeighbors
 
 
 class TestCollaborativeRecommender(unittest.TestCase):
@@ -68,6 +71,7 @@ class TestCollaborativeRecommender(unittest.TestCase):
         self.assertEqual(len(self.collab_recommender.all_tool_ids), 4)
         self.assertIn(1, self.collab_recommender.tool_id_to_details)
         self.assertIn(4, self.collab_recommender.tool_id_to_details)
+        self.assertEqual(self.collab_recommender.tool_id_index.tool_ids.tolist(), [1, 2, 3, 4])
 
     def test_initialization_empty_user_item_matrix(self):
         """
@@ -386,6 +390,244 @@ class TestCollaborativeRecommender(unittest.TestCase):
 
             self.assertEqual(scores, expected_scores)
 
+    def test_sparse_matrix_matches_dataframe(self):
+        """
+        Test that fitting on a sparse matrix with id maps gives the same scores and
+        recommendations as fitting on the equivalent DataFrame.
+        """
+        sparse_recommender = CollaborativeRecommender(
+            user_item_matrix=sp.csr_matrix(self.user_item_matrix.to_numpy(dtype=float)),
+            tools_df=self.tools_df,
+            n_neighbors=2,
+            user_ids=self.user_item_matrix.index,
+            tool_ids=self.user_item_matrix.columns
+        )
+
+        self.assertTrue(sp.issparse(sparse_recommender.user_item_matrix))
+        reference = NearestNeighbors(n_neighbors=2, metric='cosine', algorithm='brute').fit(
+            self.user_item_matrix.to_numpy(dtype=float))
+        for user_id in self.user_item_matrix.index:
+            sparse_scores = sparse_recommender.get_recommendation_scores(str(user_id))
+            dense_scores = self.user_item_matrix.iloc[
+                reference.kneighbors(
+                    self.user_item_matrix.loc[[user_id]].to_numpy(dtype=float),
+                    return_distance=False
+                ).ravel()
+            ].mean(axis=0).to_dict()
+            self.assertEqual(sparse_scores.keys(), dense_scores.keys())
+            for tool_id, score in dense_scores.items():
+                self.assertAlmostEqual(sparse_scores[tool_id], score)
+            self.assertEqual(
+                sparse_recommender.recommend(user_id=user_id, num_recommendations=2),
+                self.collab_recommender.recommend(user_id=user_id, num_recommendations=2)
+            )
+
+    def test_recommend_batch_matches_recommend(self):
+        """
+        Test that recommend_batch ranks every user's tools as recommend does, padded with -1.
+        """
+        user_ids = list(self.user_item_matrix.index)
+
+        with patch.object(self.collab_recommender, '_cosine_neighbor_rows',
+                          wraps=self.collab_recommender._cosine_neighbor_rows) as mock_neighbors:
+            result = self.collab_recommender.recommend_batch(user_ids=user_ids, num_recommendations=3)
+            mock_neighbors.assert_called_once()
+
+        self.assertEqual(result.shape, (len(user_ids), 3))
+        for user_id, row in zip(user_ids, result):
+            expected = [tool['tool_id'] for tool in
+                        self.collab_recommender.recommend(user_id=user_id, num_recommendations=3)]
+            self.assertEqual(row[:len(expected)].tolist(), expected)
+            self.assertTrue((row[len(expected):] == -1).all())
+
+        with self.assertRaises(ValueError) as context:
+            self.collab_recommender.recommend_batch(user_ids=[101, 999])
+        self.assertIn("User ID 999 not found in the user-item matrix.", str(context.exception))
+        with self.assertRaises(ValueError) as context:
+            self.collab_recommender.recommend_batch(tool_names=["Alpha"])
+        self.assertIn("user_ids must be provided", str(context.exception))
+
+    def test_get_score_matrix_matches_scores(self):
+        """
+        Test that get_score_matrix returns the dictionary scores aligned to tool_id_index.
+        """
+        matrix = self.collab_recommender.get_score_matrix([101, 104])
+        self.assertEqual(matrix.dtype, np.float32)
+        for user_id, row in zip([101, 104], matrix):
+            scores = self.collab_recommender.get_recommendation_scores(str(user_id))
+            expected = [scores[tool_id] for tool_id in self.collab_recommender.tool_id_index.tool_ids]
+            np.testing.assert_allclose(row, expected, rtol=1e-6)
+
+    def test_update_interactions_matches_rebuild(self):
+        """
+        Test that applying new interactions in place gives the same ratings, scores and
+        recommendations as rebuilding from all interactions, including repeated ratings,
+        new users and tools rated for the first time.
+        """
+        interactions = [
+            (101, 1, 5), (101, 3, 3), (102, 1, 4), (102, 2, 2), (103, 2, 5),
+            (103, 3, 4), (104, 3, 5), (105, 1, 1), (105, 2, 2)
+        ]
+        new_interactions = [
+            (101, 1, 2), (101, 1, 4), (102, 4, 1), (106, 3, 2), (106, 4, 5),
+            (104, 4, 5), (105, 4, 4), (103, 1, np.nan)
+        ]
+
+        def fit(triples):
+            matrix, user_ids, tool_ids, counts = build_sparse_user_item_matrix(*zip(*triples), return_counts=True)
+            return CollaborativeRecommender(
+                user_item_matrix=matrix,
+                tools_df=self.tools_df,
+                n_neighbors=2,
+                user_ids=user_ids,
+                tool_ids=tool_ids,
+                rating_counts=counts
+            )
+
+        updated = fit(interactions)
+        updated.update_interactions(*zip(*new_interactions))
+        rebuilt = fit(interactions + new_interactions)
+
+        self.assertEqual(updated.user_item_matrix.shape, rebuilt.user_item_matrix.shape)
+        self.assertEqual(updated.user_positions[106], 5)
+        self.assertEqual(updated.tool_ids.tolist(), [1, 2, 3, 4])
+        np.testing.assert_allclose(updated.user_item_matrix.toarray(), rebuilt.user_item_matrix.toarray())
+        np.testing.assert_allclose(updated.rating_counts, rebuilt.rating_counts)
+
+        user_ids = [101, 102, 103, 104, 105, 106]
+        np.testing.assert_allclose(updated.get_score_matrix(user_ids), rebuilt.get_score_matrix(user_ids))
+        np.testing.assert_array_equal(
+            updated.recommend_batch(user_ids=user_ids, num_recommendations=2),
+            rebuilt.recommend_batch(user_ids=user_ids, num_recommendations=2)
+        )
+
+        with self.assertRaises(ValueError) as context:
+            updated.update_interactions([101], [99], [5])
+        self.assertIn("tool_ids not present in tools_df: {99}", str(context.exception))
+
+    def test_update_interactions_refreshes_only_touched_rows(self):
+        """
+        Test that repeated updates with cosine brute-force search recompute the norms of the
+        updated rows only and insert cells into the buffers in place, matching a rebuild, while
+        other metrics refit NearestNeighbors.
+        """
+        interactions = [(101, 1, 5), (101, 3, 3), (102, 1, 4), (103, 2, 5), (104, 3, 5), (105, 2, 2)]
+        batches = [
+            [(102, 2, 3), (101, 1, 1)],
+            [(106, 4, 5), (103, 1, 2), (103, 4, 4)],
+            [(101, 2, 4), (107, 1, 3), (106, 4, 1)],
+        ]
+
+        def fit(triples, **kwargs):
+            matrix, user_ids, tool_ids, counts = build_sparse_user_item_matrix(*zip(*triples), return_counts=True)
+            return CollaborativeRecommender(user_item_matrix=matrix, tools_df=self.tools_df, n_neighbors=2,
+                                            user_ids=user_ids, tool_ids=tool_ids, rating_counts=counts, **kwargs)
+
+        updated = fit(interactions)
+        applied = list(interactions)
+        with patch.object(CollaborativeRecommender, '_fit_model') as mock_fit, \
+                patch('numpy.insert') as mock_insert, \
+                patch.object(CollaborativeRecommender, '_norms_of', autospec=True,
+                             side_effect=CollaborativeRecommender._norms_of) as mock_norms:
+            for batch in batches:
+                mock_norms.reset_mock()
+                updated.update_interactions(*zip(*batch))
+                applied += batch
+                touched = sorted({updated.user_positions[user_id] for user_id, _, _ in batch})
+                self.assertEqual(mock_norms.call_args[0][1].tolist(), touched)
+            buffers = updated._cell_buffers
+            updated.update_interactions([107], [2], [5])
+            applied.append((107, 2, 5))
+            self.assertIs(updated._cell_buffers, buffers)
+        mock_fit.assert_not_called()
+        mock_insert.assert_not_called()
+
+        rebuilt = fit(applied)
+        np.testing.assert_allclose(updated.user_item_matrix.toarray(), rebuilt.user_item_matrix.toarray())
+        np.testing.assert_allclose(updated.rating_counts, rebuilt.rating_counts)
+        np.testing.assert_allclose(updated._row_norms, rebuilt._row_norms)
+        user_ids = rebuilt.user_ids.tolist()
+        np.testing.assert_array_equal(updated.recommend_batch(user_ids=user_ids, num_recommendations=3),
+                                      rebuilt.recommend_batch(user_ids=user_ids, num_recommendations=3))
+
+        refitted = fit(interactions, metric='euclidean')
+        with patch.object(refitted.model, 'fit') as mock_model_fit:
+            refitted.update_interactions([106], [4], [5])
+        mock_model_fit.assert_called_once_with(refitted.user_item_matrix)
+
+    def test_user_positions(self):
+        """
+        Test that UserPositions finds the rows of sorted and unsorted user IDs, and rejects unknown
+        or non-integer IDs.
+        """
+        for user_ids in ([101, 102, 105, 109], [105, 101, 109, 102]):
+            positions = UserPositions(np.array(user_ids, dtype=np.int64))
+            self.assertEqual(len(positions), 4)
+            self.assertEqual([positions[user_id] for user_id in user_ids], [0, 1, 2, 3])
+            self.assertEqual(positions.positions_of([109, 100, 110, 101]).tolist(),
+                             [user_ids.index(109), -1, -1, user_ids.index(101)])
+            self.assertNotIn(103, positions)
+            self.assertNotIn('101', positions)
+            self.assertIsNone(positions.get(110))
+            with self.assertRaises(KeyError):
+                positions[110]
+
+    def test_cosine_neighbors_match_nearest_neighbors(self):
+        """
+        Test that the brute-force cosine search keeps no model, and finds neighbors as similar as
+        scikit-learn's NearestNeighbors does, while other metrics fit a NearestNeighbors model.
+        """
+        self.assertIsNone(self.collab_recommender.model)
+
+        rng = np.random.default_rng(5)
+        dense = rng.integers(1, 6, (60, 12)) * (rng.random((60, 12)) < 0.2)
+        dense[7] = 0
+        matrix = sp.csr_matrix(dense, dtype=float)
+        tools_df = pd.DataFrame({'tool_id': np.arange(1, 13)})
+        recommender = CollaborativeRecommender(
+            user_item_matrix=matrix, tools_df=tools_df, n_neighbors=4,
+            user_ids=np.arange(60), tool_ids=np.arange(1, 13))
+
+        positions = np.arange(60)
+        neighbors = recommender._neighbor_rows(positions)
+        rated = matrix.getnnz(axis=1) > 0
+        self.assertTrue((neighbors[~rated] == -1).all())
+        self.assertFalse(rated[7])
+        distances = NearestNeighbors(n_neighbors=4, metric='cosine', algorithm='brute').fit(matrix).kneighbors(
+            matrix[rated])[0]
+        rows = matrix.toarray()
+        norms = np.linalg.norm(rows, axis=1)
+        norms[norms == 0] = 1
+        found = 1 - np.einsum('ij,ikj->ik', rows[rated], rows[neighbors[rated]]) \
+            / (norms[rated][:, None] * norms[neighbors[rated]])
+        np.testing.assert_allclose(found, distances, atol=1e-12)
+
+        euclidean = CollaborativeRecommender(
+            user_item_matrix=matrix, tools_df=tools_df, n_neighbors=4, metric='euclidean',
+            user_ids=np.arange(60), tool_ids=np.arange(1, 13))
+        self.assertIsInstance(euclidean.model, NearestNeighbors)
+        np.testing.assert_array_equal(
+            euclidean._neighbor_rows(positions[rated]),
+            euclidean.model.kneighbors(matrix[rated], return_distance=False))
+
+    def test_sparse_matrix_requires_id_maps(self):
+        """
+        Test that a sparse matrix without matching user_ids and tool_ids raises ValueError.
+        """
+        matrix = sp.csr_matrix(self.user_item_matrix.to_numpy(dtype=float))
+        with self.assertRaises(ValueError) as context:
+            CollaborativeRecommender(user_item_matrix=matrix, tools_df=self.tools_df)
+        self.assertIn("user_ids and tool_ids must be provided", str(context.exception))
+
+        with self.assertRaises(ValueError) as context:
+            CollaborativeRecommender(
+                user_item_matrix=matrix,
+                tools_df=self.tools_df,
+                user_ids=[101, 102],
+                tool_ids=[1, 2, 3, 4]
+            )
+        self.assertIn("must match the shape", str(context.exception))
+
     def test_repr_method(self):
         """
         Test the __repr__ method for correct string representation.
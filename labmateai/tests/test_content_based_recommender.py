@@ -8,12 +8,15 @@ and functions as expected when providing content-based recommendations.
 """
 
 import unittest
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
-from labmateai.recommenders.content_based_recommender import ContentBasedRecommender, load_data, build_user_item_matrix
+from labmateai.recommenders.content_based_recommender import ContentBasedRecommender, load_data, build_user_item_matrix, \
+    build_sparse_user_item_matrix, build_sparse_user_item_matrix_from_chunks
 from labmateai.recommenders.recommender_interface import RecommenderInterface
 from labmateai.graph import Graph
 from labmateai.tree import ToolTree
 from labmateai.tool import Tool
+import numpy as np
 import pandas as pd
 
 
@@ -112,6 +115,74 @@ class TestContentBasedRecommender(unittest.TestCase):
         self.assertIsNotNone(self.cbr.similarity_matrix)
         self.assertIsNotNone(self.cbr.vectorizer)
 
+    def test_build_pipeline_builds_graph_once(self):
+        """
+        Test that constructing the recommender without a graph builds the content graph exactly once.
+        """
+        with patch.object(Graph, 'build_graph', autospec=True, side_effect=Graph.build_graph) as mock_build:
+            cbr = ContentBasedRecommender(tools=self.tools)
+
+        mock_build.assert_called_once()
+        self.assertTrue(cbr.built)
+        self.assertTrue(cbr.graph.built)
+        self.assertEqual(len(cbr.tree.tools), 4)
+        self.assertEqual(set(cbr.build_timings), {'graph', 'tree', 'similarity'})
+
+    def test_build_pipeline_reuses_built_graph(self):
+        """
+        Test that a graph that is already built is not rebuilt by the recommender.
+        """
+        graph = Graph(self.tools)
+        with patch.object(graph, 'build_graph') as mock_build:
+            cbr = ContentBasedRecommender(tools=self.tools, graph=graph)
+        mock_build.assert_not_called()
+        self.assertIs(cbr.graph, graph)
+
+    def test_build_recommendation_system_is_idempotent(self):
+        """
+        Test that building again is a no-op unless forced.
+        """
+        self.cbr.build_recommendation_system()
+        self.mock_graph.build_graph.assert_called_once_with(self.tools)
+        self.mock_tool_tree.build_tree.assert_called_once_with(self.tools)
+
+        self.cbr.build_recommendation_system(force=True)
+        self.assertEqual(self.mock_graph.build_graph.call_count, 2)
+        self.assertEqual(self.mock_tool_tree.build_tree.call_count, 2)
+        self.mock_graph.clear.assert_called_once_with()
+        self.mock_tool_tree.clear.assert_called_once_with()
+
+    def test_forced_rebuild_replaces_changed_tools(self):
+        """
+        Test that a forced rebuild with a changed tool list leaves nothing of removed or
+        changed tools in the graph, the tree or the indexes.
+        """
+        cbr = ContentBasedRecommender(tools=[self.tool1, self.tool2, self.tool3, self.tool4])
+        changed_tool3 = Tool(
+            tool_id=3,
+            name="Gamma",
+            category="Proteomics",
+            features=["protein_identification"],
+            cost=150,
+            description="Gamma Description",
+            url="http://gamma.com",
+            language="R",
+            platform="Windows"
+        )
+        cbr.tools = [self.tool1, self.tool2, changed_tool3]
+
+        cbr.build_recommendation_system(force=True)
+
+        self.assertEqual(set(cbr.graph.graph.nodes), {self.tool1, self.tool2, changed_tool3})
+        self.assertEqual(cbr.graph.tools, cbr.tools)
+        self.assertEqual(cbr.tree.tools, cbr.tools)
+        self.assertNotIn("delta", cbr.tool_index)
+        self.assertEqual(cbr.tool_index["gamma"], (changed_tool3, 2, 3))
+        self.assertEqual(cbr.tool_id_index.tool_ids.tolist(), [1, 2, 3])
+        self.assertEqual(cbr.similarity_matrix.shape, (3, 3))
+        recommended = [tool['tool_id'] for tool in cbr.recommend(tool_name="Beta", num_recommendations=5)]
+        self.assertNotIn(4, recommended)
+
     def test_initialization_with_duplicate_tool_ids(self):
         """
         Test that initializing ContentBasedRecommender with duplicate tool IDs raises ValueError.
@@ -234,6 +305,131 @@ class TestContentBasedRecommender(unittest.TestCase):
 
         self.assertEqual(scores, expected_scores)
 
+    def test_get_score_vector_aligned_to_tool_id_index(self):
+        """
+        Test that get_score_vector returns float32 scores in tool_id_index order,
+        with NaN for the tool itself, matching the dictionary API.
+        """
+        self.cbr.similarity_matrix = pd.DataFrame(
+            [
+                [1.0, 0.8, 0.6, 0.4],
+                [0.8, 1.0, 0.7, 0.5],
+                [0.6, 0.7, 1.0, 0.9],
+                [0.4, 0.5, 0.9, 1.0]
+            ]
+        )
+
+        vector = self.cbr.get_score_vector("gamma")
+
+        self.assertEqual(vector.dtype, np.float32)
+        self.assertEqual(self.cbr.tool_id_index.tool_ids.tolist(), [1, 2, 3, 4])
+        np.testing.assert_allclose(vector, [0.6, 0.7, np.nan, 0.9])
+        self.assertEqual(self.cbr.get_recommendation_scores("gamma"), {1: 0.6, 2: 0.7, 4: 0.9})
+
+        self.cbr.similarity_matrix = None
+        self.assertTrue(np.isnan(self.cbr.get_score_vector("gamma")).all())
+
+    def test_build_sparse_user_item_matrix_matches_pivot(self):
+        """
+        Test that the sparse user-item matrix built from triples matches build_user_item_matrix,
+        averaging repeated ratings and ignoring missing ones.
+        """
+        interactions = pd.DataFrame({
+            'user_id': [3, 1, 1, 3, 2],
+            'tool_id': [10, 5, 5, 7, 10],
+            'rating': [4, 2, 5, 1, np.nan]
+        })
+
+        matrix, user_ids, tool_ids = build_sparse_user_item_matrix(
+            interactions['user_id'], interactions['tool_id'], interactions['rating']
+        )
+        expected = build_user_item_matrix(interactions)
+
+        self.assertEqual(matrix.nnz, 3)
+        self.assertEqual(user_ids.tolist(), expected.index.tolist())
+        self.assertEqual(tool_ids.tolist(), expected.columns.tolist())
+        np.testing.assert_array_equal(matrix.toarray(), expected.to_numpy())
+
+        with self.assertRaises(ValueError):
+            build_sparse_user_item_matrix([1], [1, 2], [5])
+
+    def test_build_sparse_user_item_matrix_from_chunks(self):
+        """
+        Test that building from columnar chunks matches building from the concatenated triples,
+        including the rating counts.
+        """
+        user_ids = np.array([3, 1, 1, 3, 2, 1])
+        tool_ids = np.array([10, 5, 5, 7, 10, 5])
+        ratings = np.array([4, 2, 5, 1, np.nan, 3])
+        chunks = [
+            SimpleNamespace(user_id=user_ids[i:i + 4], tool_id=tool_ids[i:i + 4], rating=ratings[i:i + 4])
+            for i in range(0, len(ratings), 4)
+        ]
+
+        matrix, chunk_user_ids, chunk_tool_ids, counts = build_sparse_user_item_matrix_from_chunks(
+            chunks, return_counts=True)
+        expected, expected_user_ids, expected_tool_ids, expected_counts = build_sparse_user_item_matrix(
+            user_ids, tool_ids, ratings, return_counts=True)
+
+        np.testing.assert_array_equal(matrix.toarray(), expected.toarray())
+        np.testing.assert_array_equal(chunk_user_ids, expected_user_ids)
+        np.testing.assert_array_equal(chunk_tool_ids, expected_tool_ids)
+        np.testing.assert_array_equal(counts, expected_counts)
+        self.assertEqual(build_sparse_user_item_matrix_from_chunks([])[0].shape, (0, 0))
+
+    def test_build_sparse_user_item_matrix_from_aggregates(self):
+        """
+        Test that per-pair means with their counts build the same matrix and counts as the raw triples.
+        """
+        matrix, user_ids, tool_ids, counts = build_sparse_user_item_matrix(
+            [3, 1, 1, 3, 1], [10, 5, 5, 7, 5], [4, 2, 5, 1, 3], return_counts=True)
+        aggregated = build_sparse_user_item_matrix(
+            [1, 3, 3], [5, 7, 10], [10 / 3, 1, 4], return_counts=True, counts=[3, 1, 1])
+
+        np.testing.assert_allclose(aggregated[0].toarray(), matrix.toarray())
+        np.testing.assert_array_equal(aggregated[1], user_ids)
+        np.testing.assert_array_equal(aggregated[2], tool_ids)
+        np.testing.assert_array_equal(aggregated[3], counts)
+
+        with self.assertRaises(ValueError):
+            build_sparse_user_item_matrix([1], [1], [5], counts=[1, 2])
+
+    def test_recommend_batch_matches_recommend_with_built_graph(self):
+        """
+        Test that recommend_batch slices the graph index into the rankings recommend returns.
+        """
+        cbr = ContentBasedRecommender(tools=self.tools)
+        names = [tool.name for tool in self.tools]
+
+        result = cbr.recommend_batch(tool_names=names, num_recommendations=3)
+
+        self.assertEqual(result.shape, (len(names), 3))
+        for name, row in zip(names, result):
+            expected = [tool['tool_id'] for tool in cbr.recommend(tool_name=name, num_recommendations=3)]
+            self.assertEqual(row[:len(expected)].tolist(), expected)
+            self.assertTrue((row[len(expected):] == -1).all())
+
+        self.assertEqual(cbr.recommend_batch(user_ids=[1, 2]).tolist(), [[-1] * 5] * 2)
+        with self.assertRaises(ValueError):
+            cbr.recommend_batch(tool_names=["Unknown"])
+        with self.assertRaises(ValueError) as context:
+            cbr.recommend_batch(tool_names=[names[0], None])
+        self.assertIn("tool_names must not contain None", str(context.exception))
+
+    def test_tool_index_maps_names_case_insensitively(self):
+        """
+        Test that the name index maps lowercase names to the Tool, its row and its tool_id.
+        """
+        self.assertEqual(self.cbr.tool_index['gamma'], (self.tool3, 2, 3))
+        self.assertEqual(set(self.cbr.tool_index), self.cbr.tool_names)
+
+        self.mock_graph.find_most_relevant_tools.return_value = [self.tool1]
+        self.cbr.recommend_similar_tools(tool_name="GAMMA", num_recommendations=1)
+        self.mock_graph.find_most_relevant_tools.assert_called_once_with(
+            start_tool=self.tool3,
+            num_recommendations=1
+        )
+
     def test_get_recommendation_scores_invalid_tool(self):
         """
         Test that get_recommendation_scores raises ValueError when the tool name is not found.
@@ -293,7 +489,7 @@ class TestContentBasedRecommender(unittest.TestCase):
         self.mock_graph.find_most_relevant_tools.return_value = []
 
         # Force the selected_tool to None after initial check
-        with patch.object(self.cbr, 'tools', new=[]):
+        with patch.dict(self.cbr.tool_index, clear=True):
             with self.assertRaises(ValueError) as context:
                 self.cbr.recommend_similar_tools(tool_name=tool_name, num_recommendations=2)
             self.assertIn(f"Tool '{tool_name}' not found after initial check.", str(context.exception))
@@ -638,7 +834,7 @@ class TestContentBasedRecommenderInterfaceCompliance(unittest.TestCase):
         self.mock_graph.find_most_relevant_tools.return_value = []
 
         # Force the selected_tool to None after initial check
-        with patch.object(self.cbr, 'tools', new=[]):
+        with patch.dict(self.cbr.tool_index, clear=True):
             with self.assertRaises(ValueError) as context:
                 self.cbr.recommend_similar_tools(tool_name=tool_name, num_recommendations=2)
             self.assertIn(f"Tool '{tool_name}' not found after initial check.", str(context.exception))
@@ -4,9 +4,13 @@
 Unit tests for the data_loader module using the PostgreSQL database.
 """
 
+import json
+import sqlite3
+import numpy as np
 import pytest
 from unittest.mock import patch, MagicMock
-from labmateai.data_loader import load_tools_from_db, load_users_from_db, load_interactions_from_db
+from labmateai.data_loader import load_tools_from_db, load_users_from_db, load_interactions_from_db, load_all, \
+    stream_interactions, STREAM_CURSOR_NAME, InteractionChunk
 from labmateai.tool import Tool
 
 # Sample data for mocking database response
@@ -146,3 +150,205 @@ def test_load_interactions_from_db_success(mock_connect):
             4], f"Expected usage_frequency '{expected_row[4]}', got '{interaction['usage_frequency']}'."
         assert interaction['timestamp'] == expected_row[
             5], f"Expected timestamp '{expected_row[5]}', got '{interaction['timestamp']}'."
+
+
+@pytest.fixture
+def sqlite_conn():
+    """
+    Fixture providing a SQLite stand-in for the database, filled with the sample rows.
+    """
+    conn = sqlite3.connect(':memory:')
+    conn.executescript("""
+        CREATE TABLE tools (tool_id INTEGER PRIMARY KEY, name TEXT, category TEXT, features TEXT,
+                            cost TEXT, description TEXT, url TEXT, language TEXT, platform TEXT);
+        CREATE TABLE users (user_id INTEGER PRIMARY KEY, user_name TEXT, email TEXT,
+                            department TEXT, role TEXT);
+        CREATE TABLE interactions (interaction_id INTEGER PRIMARY KEY, user_id INTEGER, tool_id INTEGER,
+                                   rating INTEGER, usage_frequency TEXT, timestamp TEXT);
+    """)
+    conn.executemany("INSERT INTO tools VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", SAMPLE_TOOLS_DB_ROWS)
+    conn.executemany("INSERT INTO users VALUES (?, ?, ?, ?, ?)", SAMPLE_USERS_DB_ROWS)
+    conn.executemany("INSERT INTO interactions VALUES (?, ?, ?, ?, ?, ?)", SAMPLE_INTERACTIONS_DB_ROWS)
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+@patch('psycopg2.connect')
+def test_load_all_matches_individual_loaders(mock_connect, sqlite_conn):
+    """
+    Test that load_all returns what the three loaders return, from one read-only transaction.
+
+    Args:
+        mock_connect: Mock for psycopg2.connect, serving the same rows to the individual loaders.
+        sqlite_conn: The SQLite stand-in database.
+    """
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_connect.return_value = mock_conn
+    mock_conn.__enter__.return_value = mock_conn
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    mock_cursor.fetchall.side_effect = [
+        SAMPLE_TOOLS_DB_ROWS, SAMPLE_USERS_DB_ROWS, SAMPLE_INTERACTIONS_DB_ROWS
+    ]
+    expected = (load_tools_from_db(), load_users_from_db(), load_interactions_from_db())
+
+    statements = []
+    sqlite_conn.set_trace_callback(statements.append)
+    assert load_all(sqlite_conn) == expected
+    sqlite_conn.set_trace_callback(None)
+
+    assert statements[0] == "BEGIN"
+    assert statements[-1] == "ROLLBACK"
+    assert not sqlite_conn.in_transaction
+
+
+def test_load_all_borrows_one_pooled_connection(sqlite_conn):
+    """
+    Test that load_all without a connection borrows one from the pool and returns it.
+
+    Args:
+        sqlite_conn: The SQLite stand-in database, served by the mocked pool.
+    """
+    with patch('labmateai.labmateai_db.get_db_connection', return_value=sqlite_conn) as mock_get, \
+            patch('labmateai.labmateai_db.release_db_connection') as mock_release:
+        tools, users, interactions = load_all()
+
+    mock_get.assert_called_once_with()
+    mock_release.assert_called_once_with(sqlite_conn)
+    assert [tool.tool_id for tool in tools] == [119, 359, 360]
+    assert len(users) == 3 and len(interactions) == 3
+
+
+def test_load_all_error():
+    """
+    Test that a failing query raises RuntimeError and still releases the pooled connection.
+    """
+    conn = sqlite3.connect(':memory:')
+    with patch('labmateai.labmateai_db.get_db_connection', return_value=conn), \
+            patch('labmateai.labmateai_db.release_db_connection') as mock_release:
+        with pytest.raises(RuntimeError, match="Error loading data from the database"):
+            load_all()
+    mock_release.assert_called_once_with(conn)
+    conn.close()
+
+
+def test_stream_interactions_yields_columnar_chunks(sqlite_conn):
+    """
+    Test that interactions are streamed as typed column arrays of at most itersize rows.
+
+    Args:
+        sqlite_conn: The SQLite stand-in database.
+    """
+    sqlite_conn.execute("INSERT INTO interactions VALUES (4, 1, 360, NULL, 'Rarely', NULL)")
+    sqlite_conn.commit()
+
+    chunks = list(stream_interactions(sqlite_conn, itersize=3))
+
+    assert [len(chunk.user_id) for chunk in chunks] == [3, 1]
+    assert chunks[0].user_id.dtype == np.int64 and chunks[0].tool_id.dtype == np.int64
+    np.testing.assert_array_equal(chunks[0].rating, [5.0, 4.0, 3.0])
+    assert chunks[0].timestamp[0] == np.datetime64('2023-09-15T12:34:56')
+    assert np.isnan(chunks[1].rating[0]) and np.isnat(chunks[1].timestamp[0])
+    assert not sqlite_conn.in_transaction
+
+    chunks = list(stream_interactions(sqlite_conn, after_interaction_id=2))
+    np.testing.assert_array_equal(chunks[0].tool_id, [360, 360])
+
+    with pytest.raises(ValueError, match="itersize must be at least 1."):
+        next(stream_interactions(sqlite_conn, itersize=0))
+
+
+def test_stream_interactions_uses_named_server_side_cursor():
+    """
+    Test that a PostgreSQL connection is read through a named cursor with the given itersize,
+    and that the pooled connection is released when the stream is closed early.
+    """
+    mock_conn = MagicMock()
+    mock_cursor = mock_conn.cursor.return_value
+    rows = [(user_id, tool_id, rating, timestamp)
+            for _, user_id, tool_id, rating, _, timestamp in SAMPLE_INTERACTIONS_DB_ROWS]
+    mock_cursor.fetchmany.side_effect = [rows[:2], rows[2:], []]
+
+    with patch('labmateai.labmateai_db.get_db_connection', return_value=mock_conn), \
+            patch('labmateai.labmateai_db.release_db_connection') as mock_release:
+        stream = stream_interactions(itersize=2)
+        chunk = next(stream)
+        mock_release.assert_not_called()
+        stream.close()
+
+    mock_conn.cursor.assert_called_once_with(name=STREAM_CURSOR_NAME)
+    assert mock_cursor.itersize == 2
+    mock_cursor.fetchmany.assert_called_once_with(2)
+    np.testing.assert_array_equal(chunk.tool_id, [119, 359])
+    mock_cursor.close.assert_called_once()
+    mock_release.assert_called_once_with(mock_conn)
+
+
+# The fingerprint of the sample rows in the SQLite stand-in database
+SAMPLE_FINGERPRINT = {'max_interaction_id': 3, 'tool_count': 3}
+
+
+def test_stale_or_broken_cache_falls_back_to_the_database(tmp_path, monkeypatch, sqlite_conn):
+    """
+    Test that a missing, stale, or unreadable cache is ignored and the database is read.
+
+    Args:
+        tmp_path: The cache directory.
+        monkeypatch: Sets LABMATEAI_CACHE_DIR.
+        sqlite_conn: The SQLite stand-in database.
+    """
+    monkeypatch.setenv('LABMATEAI_CACHE_DIR', str(tmp_path))
+    expected = load_all(sqlite_conn)
+    assert [tool.tool_id for tool in expected[0]] == [119, 359, 360]
+
+    # A manifest matching the database without any data files, as left by a partial copy
+    with open(tmp_path / 'manifest.json', 'w', encoding='utf-8') as file:
+        json.dump({'format_version': 1, 'fingerprint': SAMPLE_FINGERPRINT}, file)
+
+    assert load_all(sqlite_conn) == expected
+    assert sum(len(chunk.user_id) for chunk in stream_interactions(sqlite_conn)) == 3
+    assert not sqlite_conn.in_transaction
+
+
+def test_fresh_cache_is_read_instead_of_the_database(tmp_path, monkeypatch, sqlite_conn):
+    """
+    Test that a cache matching the database serves the tools, the users and the full stream,
+    while interactions above a high-water mark still come from the database.
+
+    Args:
+        tmp_path: The cache directory.
+        monkeypatch: Sets LABMATEAI_CACHE_DIR.
+        sqlite_conn: The SQLite stand-in database.
+    """
+    pytest.importorskip('pyarrow')
+    from labmateai.cache import write_cache
+
+    tools = [Tool(tool_id=119, name='Cached', category='Cache', features=('cached',), cost='Free',
+                  description='From the cache.', url='https://cache.example.com/', language='C',
+                  platform='Linux')]
+    users = [{'user_id': 1, 'user_name': 'Cached', 'email': 'cached@example.com',
+              'department': 'Cache', 'role': 'Reader'}]
+    chunk = InteractionChunk(
+        user_id=np.array([1], dtype=np.int64), tool_id=np.array([119], dtype=np.int64),
+        rating=np.array([2.0]), timestamp=np.array(['2024-01-01'], dtype='datetime64[us]'))
+    write_cache(str(tmp_path), SAMPLE_FINGERPRINT, tools, users, iter([chunk]))
+    monkeypatch.setenv('LABMATEAI_CACHE_DIR', str(tmp_path))
+
+    cached_tools, cached_users, interactions = load_all(sqlite_conn)
+    assert cached_tools == tools and cached_tools[0].features == ['cached']
+    assert cached_users == users
+    assert len(interactions) == 3
+
+    chunks = list(stream_interactions(sqlite_conn))
+    np.testing.assert_array_equal(chunks[0].rating, [2.0])
+    chunks = list(stream_interactions(sqlite_conn, use_cache=False))
+    assert len(chunks[0].user_id) == 3
+    chunks = list(stream_interactions(sqlite_conn, after_interaction_id=2))
+    np.testing.assert_array_equal(chunks[0].tool_id, [360])
+    assert not sqlite_conn.in_transaction
+
+    # Once the database moves on, the cache is stale
+    sqlite_conn.execute("INSERT INTO interactions VALUES (4, 1, 360, 1, 'Rarely', NULL)")
+    sqlite_conn.commit()
+    assert [tool.tool_id for tool in load_all(sqlite_conn)[0]] == [119, 359, 360]
@@ -91,6 +91,17 @@ def test_graph_initialization_empty():
     ) == 0, "Expected empty graph upon initialization."
 
 
+def test_graph_built_flag(tools, graph_instance):
+    """
+    Test that a graph is marked as built only after build_graph runs.
+    """
+    graph = Graph([])
+    assert not graph.built, "Expected an empty graph to be unbuilt."
+    graph.build_graph(tools)
+    assert graph.built, "Expected the graph to be built after build_graph."
+    assert graph_instance.built, "Expected a graph initialized with tools to be built."
+
+
 def test_build_graph_adds_all_tools(tools, graph_instance):
     """
     Test that build_graph correctly adds all tools as nodes in the graph.
@@ -326,3 +337,181 @@ def test_graph_repr(graph_instance, tools):
             expected_substring = f"{neighbor.name} (similarity: {weight:.2f})"
             assert expected_substring in graph_repr, \
                 f"Expected '{expected_substring}' to be in graph representation."
+
+
+@pytest.fixture
+def varied_tools():
+    """
+    Fixture to provide a larger, varied catalog for comparing build methods.
+    """
+    categories = ['Genomics', 'Proteomics', 'Single-Cell Analysis', 'RNA']
+    feature_pool = ['Sequence Alignment', 'Variant Calling', 'Genome Assembly', 'Clustering',
+                    'Visualization', 'Single-cell RNA-seq', 'Mass Spectrometry', 'Data Analysis',
+                    'Differential Expression', 'Pathway Analysis']
+    costs = ['Free', 'Paid', 'Subscription']
+    languages = ['Python', 'R', 'C++']
+    platforms = ['Linux', 'Windows, Linux', 'Mac', 'Cross-platform', 'Windows, Mac']
+    tools = []
+    for i in range(24):
+        tools.append(Tool(
+            tool_id=i,
+            name=f'Tool{i}',
+            category=categories[i % len(categories)],
+            features=[feature_pool[(i * 3) % len(feature_pool)], feature_pool[(i * 7 + 1) % len(feature_pool)]],
+            cost=costs[i % len(costs)],
+            description=f'Description {i}',
+            url=f'https://tool{i}.example.com/',
+            language=languages[(i // 2) % len(languages)],
+            platform=platforms[i % len(platforms)]
+        ))
+    # Tool with only stop-word features to exercise empty feature vectors
+    tools.append(Tool(
+        tool_id=99, name='EmptyFeatures', category='Genomics', features=['the', 'and'],
+        cost='Free', description='No usable features.', url='https://empty.example.com/',
+        language='Python', platform='Linux'
+    ))
+    return tools
+
+
+def test_similarity_blocks_match_pairwise_scores(varied_tools, monkeypatch):
+    """
+    Test that the vectorized similarity blocks equal calculate_similarity for every pair.
+    """
+    monkeypatch.setattr('labmateai.graph.BLOCK_CELLS', 7 * len(varied_tools))
+    graph = Graph([])
+    blocks = list(graph.similarity_blocks(varied_tools))
+    assert len(blocks) > 1, "Expected the scores to be computed in several blocks."
+
+    for start, block in blocks:
+        for offset, row in enumerate(block):
+            i = start + offset
+            for j, score in enumerate(row):
+                if i == j or 'EmptyFeatures' in (varied_tools[i].name, varied_tools[j].name):
+                    continue
+                expected = graph.calculate_similarity(varied_tools[i], varied_tools[j])
+                assert score == pytest.approx(expected, abs=1e-12), \
+                    f"Score mismatch between {varied_tools[i].name} and {varied_tools[j].name}."
+
+
+def test_build_graph_bulk_matches_pairwise(varied_tools):
+    """
+    Test that the bulk and pairwise build methods produce the same weighted edges.
+    """
+    tools = [tool for tool in varied_tools if tool.name != 'EmptyFeatures']
+    bulk = Graph([])
+    bulk.build_graph(tools, method='bulk')
+    pairwise = Graph([])
+    pairwise.build_graph(tools, method='pairwise')
+
+    assert list(bulk.graph.edges()) == list(pairwise.graph.edges())
+    for tool1, tool2, attrs in pairwise.graph.edges(data=True):
+        assert bulk.graph[tool1][tool2]['weight'] == pytest.approx(attrs['weight'], abs=1e-12)
+
+
+def test_build_graph_invalid_method(tools):
+    """
+    Test that an unknown build method raises ValueError.
+    """
+    with pytest.raises(ValueError) as exc_info:
+        Graph([]).build_graph(tools, method='dense')
+    assert "Unknown build method 'dense'" in str(exc_info.value)
+
+
+def test_neighbor_index_is_bounded_by_top_k(varied_tools):
+    """
+    Test that the neighbor index keeps at most top_k neighbors per tool, best first.
+    """
+    graph = Graph(varied_tools, top_k=3)
+    counts = graph.neighbor_indptr[1:] - graph.neighbor_indptr[:-1]
+    assert len(graph.neighbor_indptr) == len(varied_tools) + 1
+    assert counts.max() <= 3, "Expected at most 3 neighbors per tool."
+    assert len(graph.neighbor_indices) == len(graph.neighbor_weights) == counts.sum()
+    assert graph.graph.number_of_edges() <= 3 * len(varied_tools)
+
+    for position in range(len(varied_tools)):
+        weights = graph.neighbor_weights[graph.neighbor_indptr[position]:graph.neighbor_indptr[position + 1]]
+        assert list(weights) == sorted(weights, reverse=True), "Neighbors should be sorted by similarity."
+
+
+def test_find_most_relevant_tools_matches_unbounded_graph(varied_tools):
+    """
+    Test that top-k lookups return the leading neighbors of the unbounded threshold graph.
+    """
+    bounded = Graph(varied_tools, top_k=4)
+    unbounded = Graph(varied_tools, top_k=None)
+
+    for tool in varied_tools:
+        neighbors = sorted(unbounded.graph[tool].items(), key=lambda x: x[1]['weight'], reverse=True)
+        expected = [neighbor for neighbor, attrs in neighbors[:4]]
+        assert bounded.find_most_relevant_tools(tool, num_recommendations=10) == expected
+        assert unbounded.find_most_relevant_tools(tool, num_recommendations=2) == expected[:2]
+
+
+def test_most_relevant_positions_matches_find_most_relevant_tools(varied_tools):
+    """
+    Test that batch lookups return the positions of find_most_relevant_tools, padded with -1.
+    """
+    graph = Graph(varied_tools, top_k=4)
+    positions = graph.most_relevant_positions(varied_tools, num_recommendations=6)
+
+    assert positions.shape == (len(varied_tools), 6)
+    for tool, row in zip(varied_tools, positions):
+        expected = [graph.tool_positions[neighbor]
+                    for neighbor in graph.find_most_relevant_tools(tool, num_recommendations=6)]
+        assert row[:len(expected)].tolist() == expected
+        assert (row[len(expected):] == -1).all()
+
+
+def test_load_neighbor_index_restores_graph(varied_tools):
+    """
+    Test that a graph loaded from a neighbor index matches the graph it was built from.
+    """
+    built = Graph(varied_tools, top_k=4)
+    loaded = Graph([], top_k=4)
+    loaded.load_neighbor_index(varied_tools, built.neighbor_indptr,
+                               built.neighbor_indices, built.neighbor_weights)
+
+    assert loaded.built
+    assert loaded.graph.adj == built.graph.adj
+    for tool in varied_tools:
+        assert loaded.find_most_relevant_tools(tool) == built.find_most_relevant_tools(tool)
+
+    with pytest.raises(ValueError, match="does not match the number of tools"):
+        Graph([]).load_neighbor_index(varied_tools[:-1], built.neighbor_indptr,
+                                      built.neighbor_indices, built.neighbor_weights)
+
+
+def test_most_relevant_positions_unindexed_node(graph_instance):
+    """
+    Test that batch lookups reject tools outside the neighbor index.
+    """
+    new_tool = Tool(
+        tool_id=362, name='BioToolZ', category='Bioinformatics', features=['Data Analysis'],
+        cost='Free', description='A bioinformatics tool for data analysis.',
+        url='https://biotoolz.example.com/', language='Python', platform='Cross-platform'
+    )
+    graph_instance.add_node(new_tool)
+    with pytest.raises(ValueError, match="not found in the neighbor index"):
+        graph_instance.most_relevant_positions([new_tool])
+
+
+def test_find_most_relevant_tools_unindexed_node(graph_instance):
+    """
+    Test that tools added with add_node fall back to their graph neighbors.
+    """
+    new_tool = Tool(
+        tool_id=361, name='BioToolY', category='Bioinformatics', features=['Data Analysis'],
+        cost='Free', description='A bioinformatics tool for data analysis.',
+        url='https://biotooly.example.com/', language='Python', platform='Cross-platform'
+    )
+    graph_instance.add_node(new_tool)
+    assert graph_instance.find_most_relevant_tools(new_tool) == []
+
+
+def test_graph_invalid_top_k(tools):
+    """
+    Test that a top_k below 1 raises ValueError.
+    """
+    with pytest.raises(ValueError) as exc_info:
+        Graph(tools, top_k=0)
+    assert "top_k must be at least 1." in str(exc_info.value)
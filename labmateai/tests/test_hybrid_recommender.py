@@ -8,12 +8,15 @@ and functions as expected when combining content-based and collaborative filteri
 """
 
 import unittest
+import numpy as np
 import pandas as pd
 from unittest.mock import MagicMock, patch
 from labmateai.recommenders.hybrid_recommender import HybridRecommender
 from labmateai.recommenders.recommender_interface import RecommenderInterface
 from labmateai.recommenders.collaborative_recommender import CollaborativeRecommender
 from labmateai.recommenders.content_based_recommender import ContentBasedRecommender
+from labmateai.recommenders.tool_id_index import ToolIdIndex
+from labmateai.tool import Tool
 
 
 class TestHybridRecommender(unittest.TestCase):
@@ -67,6 +70,10 @@ class TestHybridRecommender(unittest.TestCase):
         self.content_tools_df = pd.DataFrame(self.content_tools_data)
         self.mock_content_recommender.tools_df = self.content_tools_df
 
+        # Both recommenders score tools 1-4 in the same canonical order
+        self.mock_collaborative_recommender.tool_id_index = ToolIdIndex([1, 2, 3, 4])
+        self.mock_content_recommender.tool_id_index = ToolIdIndex([1, 2, 3, 4])
+
         # Initialize HybridRecommender with alpha=0.6
         self.hybrid_recommender = HybridRecommender(
             content_recommender=self.mock_content_recommender,
@@ -121,7 +128,7 @@ class TestHybridRecommender(unittest.TestCase):
             3: 4.8,
             4: 2.1
         })
-        self.mock_collaborative_recommender.get_recommendation_scores.return_value = collaborative_scores
+        self.mock_collaborative_recommender.get_score_vector.return_value = collaborative_scores.to_numpy(np.float32)
 
         # Mock content_scores
         content_scores = pd.Series({
@@ -130,7 +137,8 @@ class TestHybridRecommender(unittest.TestCase):
             3: 0.8,
             4: 0.2
         })
-        self.mock_content_recommender.get_recommendation_scores.return_value = content_scores
+        self.mock_content_recommender.get_score_vector.return_value = np.array(
+            [np.nan, 0.6, 0.8, 0.2], dtype=np.float32)  # NaN for the reference tool
 
         # Expected normalization
         expected_normalized_cf = (collaborative_scores - collaborative_scores.min()) / (collaborative_scores.max() - collaborative_scores.min())
@@ -166,9 +174,9 @@ class TestHybridRecommender(unittest.TestCase):
             num_recommendations=num_recommendations
         )
 
-        # Assert that get_recommendation_scores was called correctly
-        self.mock_collaborative_recommender.get_recommendation_scores.assert_called_once_with(user_id)
-        self.mock_content_recommender.get_recommendation_scores.assert_called_once_with(tool_name)
+        # Assert that get_score_vector was called correctly
+        self.mock_collaborative_recommender.get_score_vector.assert_called_once_with(user_id)
+        self.mock_content_recommender.get_score_vector.assert_called_once_with(tool_name)
 
         # Expected recommended tools
         expected_recommended_tools = self.collaborative_tools_df[self.collaborative_tools_df['tool_id'].isin(expected_top_tool_ids)].to_dict('records')
@@ -191,7 +199,7 @@ class TestHybridRecommender(unittest.TestCase):
             3: 2.5,
             4: 4.5
         })
-        self.mock_collaborative_recommender.get_recommendation_scores.return_value = collaborative_scores
+        self.mock_collaborative_recommender.get_score_vector.return_value = collaborative_scores.to_numpy(np.float32)
 
         # Since tool_name is not provided, content_scores should NOT be called
         # Therefore, no need to set content_scores
@@ -219,9 +227,9 @@ class TestHybridRecommender(unittest.TestCase):
             num_recommendations=num_recommendations
         )
 
-        # Assert that get_recommendation_scores was called correctly
-        self.mock_collaborative_recommender.get_recommendation_scores.assert_called_once_with(user_id)
-        self.mock_content_recommender.get_recommendation_scores.assert_not_called()
+        # Assert that get_score_vector was called correctly
+        self.mock_collaborative_recommender.get_score_vector.assert_called_once_with(user_id)
+        self.mock_content_recommender.get_score_vector.assert_not_called()
 
         # Expected recommended tools
         expected_recommended_tools = self.collaborative_tools_df[self.collaborative_tools_df['tool_id'].isin(expected_top_tool_ids)].to_dict('records')
@@ -272,10 +280,10 @@ class TestHybridRecommender(unittest.TestCase):
             3: 4.8,
             4: 2.1
         })
-        self.mock_collaborative_recommender.get_recommendation_scores.return_value = collaborative_scores
+        self.mock_collaborative_recommender.get_score_vector.return_value = collaborative_scores.to_numpy(np.float32)
 
         # Mock content_scores to raise ValueError
-        self.mock_content_recommender.get_recommendation_scores.side_effect = ValueError("Tool 'NonExistentTool' not found in the dataset.")
+        self.mock_content_recommender.get_score_vector.side_effect = ValueError("Tool 'NonExistentTool' not found in the dataset.")
 
         with self.assertRaises(ValueError) as context:
             self.hybrid_recommender.recommend(
@@ -284,8 +292,8 @@ class TestHybridRecommender(unittest.TestCase):
                 num_recommendations=num_recommendations
             )
         self.assertIn("Content-based filtering error: Tool 'NonExistentTool' not found in the dataset.", str(context.exception))
-        self.mock_collaborative_recommender.get_recommendation_scores.assert_called_once_with(user_id)
-        self.mock_content_recommender.get_recommendation_scores.assert_called_once_with(tool_name)
+        self.mock_collaborative_recommender.get_score_vector.assert_called_once_with(user_id)
+        self.mock_content_recommender.get_score_vector.assert_called_once_with(tool_name)
 
     def test_recommend_collaborative_recommender_error(self):
         """
@@ -296,7 +304,7 @@ class TestHybridRecommender(unittest.TestCase):
         num_recommendations = 2
 
         # Mock collaborative_scores to raise ValueError
-        self.mock_collaborative_recommender.get_recommendation_scores.side_effect = ValueError("User ID 999 not found.")
+        self.mock_collaborative_recommender.get_score_vector.side_effect = ValueError("User ID 999 not found.")
 
         with self.assertRaises(ValueError) as context:
             self.hybrid_recommender.recommend(
@@ -305,8 +313,8 @@ class TestHybridRecommender(unittest.TestCase):
                 num_recommendations=num_recommendations
             )
         self.assertIn("Collaborative filtering error: User ID 999 not found.", str(context.exception))
-        self.mock_collaborative_recommender.get_recommendation_scores.assert_called_once_with(user_id)
-        self.mock_content_recommender.get_recommendation_scores.assert_not_called()
+        self.mock_collaborative_recommender.get_score_vector.assert_called_once_with(user_id)
+        self.mock_content_recommender.get_score_vector.assert_not_called()
 
     def test_recommend_no_collaborative_scores(self):
         """
@@ -319,13 +327,8 @@ class TestHybridRecommender(unittest.TestCase):
         # Mock collaborative_scores should NOT be called; hence, no need to set return_value
 
         # Mock content_scores
-        content_scores = pd.Series({
-            1: 0.0,  # Reference tool
-            2: 0.6,
-            3: 0.8,
-            4: 0.2
-        })
-        self.mock_content_recommender.get_recommendation_scores.return_value = content_scores
+        self.mock_content_recommender.get_score_vector.return_value = np.array(
+            [np.nan, 0.6, 0.8, 0.2], dtype=np.float32)  # NaN for the reference tool
 
         # Expected combined scores = 0.6 * 0 + 0.4 * content_scores = 0.4 * content_scores
         # Thus, scores: 1:0.0, 2:0.24, 3:0.32, 4:0.08
@@ -343,9 +346,9 @@ class TestHybridRecommender(unittest.TestCase):
             num_recommendations=num_recommendations
         )
 
-        # Assert that get_recommendation_scores was called correctly
-        self.mock_collaborative_recommender.get_recommendation_scores.assert_not_called()
-        self.mock_content_recommender.get_recommendation_scores.assert_called_once_with(tool_name)
+        # Assert that get_score_vector was called correctly
+        self.mock_collaborative_recommender.get_score_vector.assert_not_called()
+        self.mock_content_recommender.get_score_vector.assert_called_once_with(tool_name)
 
         # Expected recommended tools
         expected_recommended_tools = self.collaborative_tools_df[self.collaborative_tools_df['tool_id'].isin(expected_top_tool_ids)].to_dict('records')
@@ -435,6 +438,123 @@ class TestHybridRecommender(unittest.TestCase):
         self.mock_collaborative_recommender.get_recommendation_scores.assert_not_called()
         self.mock_content_recommender.get_recommendation_scores.assert_called_once_with(identifier)
 
+    def test_recommend_matches_pandas_fusion(self):
+        """
+        Test that the vectorized fusion selects the same tools as the Series-based fusion
+        (union, reindex, min-max normalize, blend, sort) on random scores.
+        """
+        rng = np.random.default_rng(7)
+        cf_ids = [1, 2, 3, 4]
+        cb_ids = [1, 2, 3, 4, 5, 6]
+        self.mock_content_recommender.tool_id_index = ToolIdIndex(cb_ids)
+
+        def reference(cf_vector, cb_vector, num_recommendations):
+            cf = pd.Series(cf_vector, index=cf_ids).dropna()
+            cb = pd.Series(cb_vector, index=cb_ids).dropna()
+            combined_index = cf.index.union(cb.index)
+            cf = cf.reindex(combined_index, fill_value=0)
+            cb = cb.reindex(combined_index, fill_value=0)
+
+            def normalize(x):
+                return (x - x.min()) / (x.max() - x.min())
+
+            combined = 0.6 * normalize(cf) + 0.4 * normalize(cb)
+            top_tool_ids = combined.sort_values(ascending=False).head(num_recommendations).index
+            return self.collaborative_tools_df[
+                self.collaborative_tools_df['tool_id'].isin(top_tool_ids)].to_dict('records')
+
+        for _ in range(20):
+            cf_vector = rng.random(len(cf_ids)).astype(np.float32)
+            cf_vector[rng.integers(len(cf_ids))] = np.nan  # A tool without ratings
+            cb_vector = rng.random(len(cb_ids)).astype(np.float32)
+            cb_vector[rng.integers(len(cb_ids))] = np.nan  # The reference tool
+            self.mock_collaborative_recommender.get_score_vector.return_value = cf_vector
+            self.mock_content_recommender.get_score_vector.return_value = cb_vector
+
+            for num_recommendations in (1, 3, 6):
+                recommendations = self.hybrid_recommender.recommend(
+                    user_id=1, tool_name="Alpha", num_recommendations=num_recommendations)
+                self.assertEqual(recommendations, reference(cf_vector, cb_vector, num_recommendations))
+
+    def test_near_tie_content_scores_fuse_rounded(self):
+        """
+        Test that content scores are fused rounded to three decimals, as get_recommendation_scores
+        returned them to the Series-based fusion, so a near-tie is left to the collaborative scores.
+        """
+        tools = [Tool(**{**record, 'features': record['features'].split(';')})
+                 for record in self.collaborative_tools_df.to_dict('records')]
+        # Beta and Gamma differ by less than the rounding, in Gamma's favor
+        similarity_matrix = np.eye(4)
+        similarity_matrix[0] = [1.0, 0.4996, 0.5004, 0.0]
+        content = ContentBasedRecommender(tools, similarity_matrix=similarity_matrix)
+        hybrid = HybridRecommender(content, self.mock_collaborative_recommender, alpha=0.6)
+        # Beta is a little ahead on collaborative scores
+        cf_vector = np.array([0.0, 0.5001, 0.5, 1.0], dtype=np.float32)
+        self.mock_collaborative_recommender.get_score_vector.return_value = cf_vector
+        self.mock_collaborative_recommender.get_score_matrix.return_value = cf_vector[np.newaxis]
+
+        cf = pd.Series(cf_vector.astype(float), index=[1, 2, 3, 4])
+        cb = pd.Series(content.get_recommendation_scores("Alpha")).reindex(cf.index, fill_value=0)
+        combined = 0.6 * (cf - cf.min()) / (cf.max() - cf.min()) + 0.4 * (cb - cb.min()) / (cb.max() - cb.min())
+        self.assertEqual(combined.idxmax(), 2)
+
+        recommendations = hybrid.recommend(user_id=1, tool_name="Alpha", num_recommendations=1)
+        self.assertEqual([tool['tool_id'] for tool in recommendations], [2])
+        self.assertEqual(hybrid.recommend_batch(user_ids=[1], tool_names=["Alpha"], num_recommendations=1).tolist(),
+                         [[2]])
+
+    def test_recommend_batch_fuses_score_matrices(self):
+        """
+        Test that recommend_batch normalizes and blends component score matrices over the union
+        of both tool-id indexes, and drops tools missing from the collaborative tools_df.
+        """
+        self.mock_collaborative_recommender.tool_id_index = ToolIdIndex([1, 2, 3, 4])
+        self.mock_content_recommender.tool_id_index = ToolIdIndex([1, 2, 3, 4, 5])
+        self.mock_collaborative_recommender.get_score_matrix.return_value = np.array(
+            [[4.0, 2.0, np.nan, 1.0]], dtype=np.float32)
+        self.mock_content_recommender.get_score_matrix.return_value = np.array(
+            [[np.nan, 0.8, 0.5, 0.2, 1.0]], dtype=np.float32)
+
+        # Combined scores: 2 -> 0.62, 1 -> 0.6, 5 -> 0.4 (no details), 4 -> 0.23, 3 -> 0.2
+        result = self.hybrid_recommender.recommend_batch(
+            user_ids=[1], tool_names=["Alpha"], num_recommendations=3)
+
+        self.assertEqual(result.tolist(), [[2, 1, -1]])
+        self.mock_collaborative_recommender.get_score_matrix.assert_called_once_with([1])
+        self.mock_content_recommender.get_score_matrix.assert_called_once_with(["Alpha"])
+
+        # Without tool names only the collaborative scores rank the tools
+        result = self.hybrid_recommender.recommend_batch(user_ids=[1], num_recommendations=5)
+        self.assertEqual(result.tolist(), [[1, 2, 4, 3, -1]])
+
+    def test_recommend_batch_component_error(self):
+        """
+        Test that recommend_batch reports which component failed.
+        """
+        self.mock_collaborative_recommender.tool_id_index = ToolIdIndex([1, 2, 3, 4])
+        self.mock_content_recommender.tool_id_index = ToolIdIndex([1, 2, 3, 4])
+        self.mock_collaborative_recommender.get_score_matrix.side_effect = ValueError("User ID 9 not found.")
+
+        with self.assertRaises(ValueError) as context:
+            self.hybrid_recommender.recommend_batch(user_ids=[9])
+        self.assertIn("Collaborative filtering error: User ID 9 not found.", str(context.exception))
+
+    def test_recommend_batch_rejects_missing_tool_names(self):
+        """
+        Test that recommend_batch rejects a None tool name instead of failing inside the lookup.
+        """
+        with self.assertRaises(ValueError) as context:
+            self.hybrid_recommender.recommend_batch(user_ids=[1, 2], tool_names=["Tool1", None])
+        self.assertIn("tool_names must not contain None", str(context.exception))
+        self.mock_content_recommender.get_score_matrix.assert_not_called()
+
+    def test_update_interactions_delegates_to_collaborative(self):
+        """
+        Test that update_interactions applies the ratings to the collaborative recommender.
+        """
+        self.hybrid_recommender.update_interactions([1, 2], [3, 4], [5, 4])
+        self.mock_collaborative_recommender.update_interactions.assert_called_once_with([1, 2], [3, 4], [5, 4])
+
     def test_repr_method(self):
         """
         Test the __repr__ method for correct string representation.
@@ -0,0 +1,164 @@
+# tests/test_interaction_sink.py
+
+"""
+Unit tests for the interaction_sink module in LabMateAI.
+"""
+
+import queue
+import threading
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.pool import StaticPool
+
+from labmateai.interaction_sink import InteractionSink
+from labmateai.models import Base, Interaction, Tool, User
+
+
+@pytest.fixture
+def engine():
+    """
+    Fixture providing an in-memory SQLite database with one user and two tools.
+    """
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(User.__table__.insert(), [{'user_id': 1, 'user_name': 'Ada', 'email': 'ada@example.com'}])
+        connection.execute(Tool.__table__.insert(), [{'tool_id': 1, 'name': 'Tool1'}, {'tool_id': 2, 'name': 'Tool2'}])
+    return engine
+
+
+def count_interactions(engine):
+    """
+    Returns the number of rows in the interactions table.
+    """
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(Interaction.__table__)).scalar()
+
+
+def test_batches_are_written_in_one_statement(engine):
+    """
+    Test that queued interactions are written by size in single multi-row INSERTs, and that
+    flush writes a partial batch.
+    """
+    inserts = []
+    event.listen(engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: inserts.append(statement)
+                 if statement.startswith('INSERT INTO interactions') else None)
+
+    sink = InteractionSink(engine, max_batch_size=4, flush_interval=60)
+    for i in range(10):
+        sink.submit(1, 1 + i % 2, rating=i % 6, usage_frequency='Often' if i % 2 else None)
+    sink.flush()
+
+    assert count_interactions(engine) == 10
+    assert sink.written_count == 10
+    assert len(inserts) == 3
+    sink.close()
+
+
+def test_time_threshold_and_close(engine):
+    """
+    Test that a partial batch is written after flush_interval, that close writes what is
+    still queued, and that a closed sink rejects interactions.
+    """
+    sink = InteractionSink(engine, max_batch_size=100, flush_interval=0.05)
+    sink.submit(1, 1, rating=5, timestamp=datetime(2024, 1, 1))
+    sink._queue.join()
+    assert count_interactions(engine) == 1
+
+    sink.submit(1, 2)
+    sink.close()
+    sink.close()
+    assert count_interactions(engine) == 2
+
+    with pytest.raises(RuntimeError, match="InteractionSink is closed."):
+        sink.submit(1, 1)
+
+
+def test_full_queue_applies_backpressure(engine):
+    """
+    Test that submit blocks while the queue is full and a write is in progress.
+    """
+    sink = InteractionSink(engine, max_batch_size=1, flush_interval=60, max_queue_size=1)
+    release = threading.Event()
+    write = sink._write
+    sink._write = lambda batch: (release.wait(), write(batch))
+
+    sink.submit(1, 1)  # Taken by the writer, which blocks
+    sink.submit(1, 2)  # Fills the queue
+    with pytest.raises(queue.Full):
+        sink.submit(1, 1, timeout=0.05)
+
+    release.set()
+    sink.close()
+    assert count_interactions(engine) == 2
+
+
+def test_failed_write_is_retried_and_reported(engine):
+    """
+    Test that a failing batch is retried, then kept, counted and reported by flush without
+    stopping the writer.
+    """
+    sink = InteractionSink(engine, flush_interval=60, max_retries=2, retry_delay=0.001)
+    # The second row has no timestamp, so the batch fails as a whole
+    sink.submit(1, 1)
+    sink._queue.put((1, 2, None, None, None))
+    with pytest.raises(RuntimeError, match="Failed to write 2 interactions"):
+        sink.flush()
+    assert sink.failed_count == 2
+    assert [row[:2] for row in sink.failed_interactions] == [(1, 1), (1, 2)]
+    sink.flush()
+
+    sink.submit(1, 1)
+    sink.close()
+    assert sink.written_count == 1
+
+
+def test_transient_failure_is_retried(engine):
+    """
+    Test that a batch is written once a transient failure clears.
+    """
+    attempts = []
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def fail_once(*args):
+        attempts.append(None)
+        if len(attempts) == 1:
+            raise RuntimeError("Connection reset")
+
+    sink = InteractionSink(engine, flush_interval=60, retry_delay=0.001)
+    sink.submit(1, 1, rating=5)
+    sink.close()
+    event.remove(engine, 'before_cursor_execute', fail_once)
+    assert sink.written_count == 1
+    assert sink.failed_count == 0
+    assert count_interactions(engine) == 1
+
+
+def test_postgresql_uses_copy():
+    """
+    Test that batches are written with COPY in CSV format on PostgreSQL, with NULLs as
+    unquoted empty fields and empty strings quoted.
+    """
+    engine = MagicMock()
+    engine.dialect.name = 'postgresql'
+    raw_connection = engine.raw_connection.return_value
+    cursor = raw_connection.cursor.return_value.__enter__.return_value
+    written = []
+    cursor.copy_expert.side_effect = lambda statement, buffer: written.append((statement, buffer.read()))
+
+    sink = InteractionSink(engine)
+    sink.submit(1, 2, rating=4, timestamp=datetime(2024, 1, 1, 12))
+    sink.submit(1, 3, usage_frequency='Often', timestamp=datetime(2024, 1, 2))
+    sink.submit(1, 4, usage_frequency='', timestamp=datetime(2024, 1, 3))
+    sink.close()
+
+    assert written == [(
+        'COPY interactions (user_id, tool_id, rating, usage_frequency, timestamp) FROM STDIN WITH (FORMAT csv)',
+        '1,2,4,,"2024-01-01 12:00:00"\n1,3,,"Often","2024-01-02 00:00:00"\n1,4,,"","2024-01-03 00:00:00"\n'
+    )]
+    raw_connection.commit.assert_called_once()
+    raw_connection.close.assert_called_once()
@@ -0,0 +1,162 @@
+# tests/test_metrics.py
+
+"""
+Unit tests for the metrics module in LabMateAI.
+"""
+
+import json
+import os
+
+import pytest
+
+from labmateai import metrics
+from labmateai.graph import Graph
+from labmateai.tool import Tool
+
+
+@pytest.fixture
+def enabled():
+    """
+    Fixture recording metrics for the duration of a test.
+    """
+    metrics.reset()
+    metrics.enable()
+    yield
+    metrics.disable()
+    metrics.reset()
+
+
+def test_disabled_records_nothing(monkeypatch):
+    """
+    Test that nothing is recorded while metrics are disabled, and that LABMATEAI_METRICS enables them.
+    """
+    metrics.reset()
+    assert not metrics.is_enabled()
+    metrics.increment('calls_total')
+    metrics.observe('call_seconds', 0.1)
+    with metrics.timer('block_seconds'):
+        pass
+    assert metrics.timed('call_seconds')(lambda x: x * 2)(3) == 6
+    assert metrics.snapshot() == {'counters': {}, 'histograms': {}}
+    assert metrics.to_prometheus() == ''
+
+    monkeypatch.setenv('LABMATEAI_METRICS', 'true')
+    try:
+        assert metrics.enable_from_environment()
+    finally:
+        metrics.disable()
+
+
+def test_counters_and_histograms(enabled):
+    """
+    Test that counters add up and that histograms count values into cumulative buckets.
+    """
+    metrics.increment('calls_total')
+    metrics.increment('calls_total', 2)
+    metrics.observe('call_seconds', 0.0001)
+    metrics.observe('call_seconds', 0.003)
+    metrics.observe('call_seconds', 100)
+
+    @metrics.timed('decorated_seconds')
+    def double(x):
+        return x * 2
+
+    assert double(3) == 6
+    with pytest.raises(ZeroDivisionError):
+        with metrics.timer('failing_seconds'):
+            1 / 0
+
+    recorded = metrics.snapshot()
+    assert recorded['counters'] == {'calls_total': 3}
+    histogram = recorded['histograms']['call_seconds']
+    assert histogram['count'] == 3
+    assert histogram['sum'] == pytest.approx(100.0031)
+    buckets = dict(histogram['buckets'])
+    assert buckets[0.0005] == 1
+    assert buckets[0.0025] == 1
+    assert buckets[0.005] == 2
+    assert buckets[60.0] == 2
+    assert histogram['buckets'][-1][1] == 3
+    assert recorded['histograms']['decorated_seconds']['count'] == 1
+    assert recorded['histograms']['failing_seconds']['count'] == 1
+
+
+def test_exports(enabled, tmp_path):
+    """
+    Test the Prometheus and JSON exports and writing them to files.
+    """
+    metrics.increment('calls_total')
+    metrics.observe('call_seconds', 0.25)
+
+    text = metrics.to_prometheus()
+    assert '# TYPE labmateai_calls_total counter\nlabmateai_calls_total 1\n' in text
+    assert '# TYPE labmateai_call_seconds histogram' in text
+    assert 'labmateai_call_seconds_bucket{le="0.1"} 0' in text
+    assert 'labmateai_call_seconds_bucket{le="0.25"} 1' in text
+    assert 'labmateai_call_seconds_bucket{le="+Inf"} 1' in text
+    assert 'labmateai_call_seconds_sum 0.25' in text
+    assert 'labmateai_call_seconds_count 1' in text
+
+    recorded = json.loads(metrics.to_json())
+    assert recorded['histograms']['call_seconds']['buckets'][-1] == ['+Inf', 1]
+
+    metrics.write(str(tmp_path / 'metrics.json'))
+    metrics.write(str(tmp_path / 'metrics.prom'))
+    assert json.loads((tmp_path / 'metrics.json').read_text()) == recorded
+    assert (tmp_path / 'metrics.prom').read_text() == text
+
+
+def test_shared_directory_merges_processes(tmp_path):
+    """
+    Test that a shared directory merges what every process recorded, each counted once, and
+    that a forked child starts empty instead of repeating its parent's registry.
+    """
+    directory = str(tmp_path / 'metrics')
+    metrics.reset()
+    metrics.enable(directory)
+    try:
+        metrics.increment('calls_total', 2)
+        metrics.observe('call_seconds', 0.25)
+
+        # Another worker recorded into the same directory
+        pid = os.fork()
+        if pid == 0:
+            metrics.increment('calls_total', 3)
+            metrics.observe('call_seconds', 2.0)
+            metrics.flush()
+            os._exit(0 if metrics.snapshot()['counters'] == {'calls_total': 5} else 1)
+        assert os.waitpid(pid, 0)[1] == 0
+
+        recorded = metrics.snapshot()
+        assert recorded['counters'] == {'calls_total': 5}
+        assert recorded['histograms']['call_seconds']['count'] == 2
+        assert recorded['histograms']['call_seconds']['sum'] == 2.25
+        assert recorded['histograms']['call_seconds']['buckets'][8] == [0.25, 1]
+        assert len(os.listdir(directory)) == 2
+
+        metrics.clear_directory(directory)
+        assert os.listdir(directory) == []
+        assert metrics.snapshot()['counters'] == {'calls_total': 2}
+    finally:
+        metrics.disable()
+        metrics.reset()
+
+
+def test_graph_is_instrumented(enabled):
+    """
+    Test that building and querying a graph records their durations.
+    """
+    tools = [
+        Tool(tool_id=1, name='Seurat', category='Single-Cell Analysis', features=('Single-cell RNA-seq',),
+             cost='Free', description='R package for single-cell genomics.', url='https://satijalab.org/seurat/',
+             language='R', platform='Cross-platform'),
+        Tool(tool_id=2, name='Scanpy', category='Single-Cell Analysis', features=('Single-cell RNA-seq',),
+             cost='Free', description='Python-based tool for single-cell analysis.',
+             url='https://scanpy.readthedocs.io/', language='Python', platform='Cross-platform')
+    ]
+    graph = Graph(tools)
+    graph.find_most_relevant_tools(tools[0], num_recommendations=1)
+
+    histograms = metrics.snapshot()['histograms']
+    assert histograms['graph_build_seconds']['count'] == 1
+    assert histograms['graph_query_seconds']['count'] == 1
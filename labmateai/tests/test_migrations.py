@@ -0,0 +1,152 @@
+# tests/test_migrations.py
+
+"""
+Tests for the Alembic migrations: query plans of the interaction indexes, and the
+user_tool_ratings summary table and its triggers.
+"""
+
+import os
+from datetime import datetime
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, func, select, text
+
+import labmateai
+from labmateai.models import Base, Interaction, Tool, User, UserToolRating
+
+ALEMBIC_DIR = os.path.join(os.path.dirname(labmateai.__file__), 'alembic')
+
+# Queries of the recommender and the index each one must use
+QUERY_PLANS = [
+    (select(Interaction.user_id, Interaction.tool_id, Interaction.rating).where(Interaction.rating.isnot(None)),
+     'COVERING INDEX ix_interactions_rated'),
+    (select(Interaction).where(Interaction.user_id == 1, Interaction.tool_id == 2),
+     'INDEX ix_interactions_user_id_tool_id'),
+    (select(Interaction).where(Interaction.user_id == 1),
+     'INDEX ix_interactions_user_id_tool_id'),
+    (select(func.count()).select_from(Interaction).where(Interaction.tool_id == 2),
+     'COVERING INDEX ix_interactions_tool_id'),
+    (select(Interaction).where(Interaction.timestamp > datetime(2024, 1, 1)),
+     'INDEX ix_interactions_timestamp'),
+    (select(User).where(User.email == 'ada@example.com'),
+     'INDEX sqlite_autoindex_users_1'),
+]
+
+
+@pytest.fixture
+def database(tmp_path):
+    """
+    Fixture providing a SQLite database created from the models and an Alembic
+    configuration stamped at the head revision.
+    """
+    url = f"sqlite:///{tmp_path / 'labmateai.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+
+    config = Config()
+    config.set_main_option('script_location', ALEMBIC_DIR)
+    config.set_main_option('sqlalchemy.url', url)
+    command.stamp(config, 'head')
+    yield engine, config
+    engine.dispose()
+
+
+def query_plan(engine, query):
+    """
+    Returns the EXPLAIN QUERY PLAN details of a query, joined into one string.
+    """
+    compiled = query.compile(engine, compile_kwargs={'literal_binds': True})
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").fetchall()
+    return ' | '.join(row[-1] for row in rows)
+
+
+@pytest.mark.parametrize('query, index', QUERY_PLANS)
+def test_queries_use_indexes(database, query, index):
+    """
+    Test that each hot query is answered through its index.
+    """
+    engine, _ = database
+    assert index in query_plan(engine, query)
+
+
+def test_migration_round_trip(database):
+    """
+    Test that downgrading the index migration leaves full scans, and upgrading restores the plans.
+    """
+    engine, config = database
+
+    command.downgrade(config, '697518134a33')
+    # EXPLAIN does not reload a schema changed by another connection, so reconnect
+    engine.dispose()
+    rated_query, rated_index = QUERY_PLANS[0]
+    assert rated_index not in query_plan(engine, rated_query)
+    assert 'SCAN interactions' in query_plan(engine, QUERY_PLANS[4][0])
+
+    command.upgrade(config, 'head')
+    engine.dispose()
+    for query, index in QUERY_PLANS:
+        assert index in query_plan(engine, query)
+
+
+def expected_ratings(engine):
+    """
+    Aggregates the rated interactions in Python, as user_tool_ratings rows.
+    """
+    with engine.connect() as connection:
+        rows = connection.execute(select(
+            Interaction.interaction_id, Interaction.user_id, Interaction.tool_id, Interaction.rating
+        ).where(Interaction.rating.isnot(None)).order_by(Interaction.interaction_id)).fetchall()
+    pairs = {}
+    for interaction_id, user_id, tool_id, rating in rows:
+        count, total, _, _ = pairs.get((user_id, tool_id), (0, 0, None, None))
+        pairs[(user_id, tool_id)] = (count + 1, total + rating, rating, interaction_id)
+    return sorted(pair + aggregate for pair, aggregate in pairs.items())
+
+
+def test_user_tool_ratings_are_backfilled_and_maintained(tmp_path):
+    """
+    Test that the summary migration backfills user_tool_ratings from existing interactions and
+    that its triggers keep it equal to the aggregate of the interactions on every change.
+    """
+    url = f"sqlite:///{tmp_path / 'labmateai.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine, tables=[User.__table__, Tool.__table__, Interaction.__table__])
+    config = Config()
+    config.set_main_option('script_location', ALEMBIC_DIR)
+    config.set_main_option('sqlalchemy.url', url)
+    command.stamp(config, 'b3f9c2d71e4a')
+
+    def execute(statement):
+        with engine.begin() as connection:
+            connection.execute(text(statement))
+
+    def summary():
+        with engine.connect() as connection:
+            return sorted(tuple(row) for row in connection.execute(select(UserToolRating.__table__)))
+
+    execute("INSERT INTO users (user_id, user_name, email) VALUES (1, 'Ada', 'ada'), (2, 'Bo', 'bo')")
+    execute("INSERT INTO tools (tool_id, name) VALUES (1, 'Tool1'), (2, 'Tool2')")
+    execute("INSERT INTO interactions (user_id, tool_id, rating, timestamp) VALUES "
+            "(1, 1, 4, '2024-01-01'), (1, 1, 2, '2024-01-02'), (2, 1, NULL, '2024-01-02')")
+
+    command.upgrade(config, 'head')
+    assert summary() == expected_ratings(engine) == [(1, 1, 2, 6, 2, 2)]
+
+    for statement in [
+        "INSERT INTO interactions (user_id, tool_id, rating, timestamp) VALUES "
+        "(1, 1, 5, '2024-01-03'), (2, 2, 3, '2024-01-03'), (2, 1, NULL, '2024-01-04')",
+        "UPDATE interactions SET rating = 1 WHERE interaction_id = 1",
+        "UPDATE interactions SET tool_id = 2 WHERE interaction_id = 4",
+        "UPDATE interactions SET rating = 4 WHERE interaction_id = 3",
+        "DELETE FROM interactions WHERE interaction_id = 5",
+    ]:
+        execute(statement)
+        assert summary() == expected_ratings(engine), statement
+
+    command.downgrade(config, 'b3f9c2d71e4a')
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE name LIKE 'user_tool_ratings%'").fetchall() == []
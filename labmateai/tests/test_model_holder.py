@@ -0,0 +1,142 @@
+# tests/test_model_holder.py
+
+"""
+Unit tests for the model_holder module in LabMateAI.
+"""
+
+import sys
+import threading
+
+import pytest
+
+from labmateai.model_holder import ModelHolder, get_refresh_interval
+
+
+class Loader:
+    """
+    A loader returning numbered models, optionally blocking until released or failing.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+        self.started = threading.Event()
+        self.error = None
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return f'model{self.calls}'
+
+
+def test_refresh_swaps_the_model_when_the_rebuild_finishes():
+    """
+    Test that the initial model is loaded in the caller, and that a rebuild only replaces
+    the model once it is complete.
+    """
+    loader = Loader()
+    holder = ModelHolder(loader)
+    assert holder.get() == 'model1'
+    holder.start()
+
+    loader.release.clear()
+    assert holder.refresh()
+    assert loader.started.wait(5)
+    # Callers keep being served the previous model while the rebuild runs
+    assert holder.get() == 'model1'
+    assert not holder.refresh(wait=True, timeout=0.05)
+
+    loader.release.set()
+    assert holder.refresh(wait=True, timeout=5)
+    assert holder.get() == 'model3'
+    assert holder.refresh_count == 2
+    holder.close()
+
+
+def test_failed_rebuild_keeps_the_model():
+    """
+    Test that a failing loader is counted and leaves the current model in place.
+    """
+    loader = Loader()
+    holder = ModelHolder(loader, model='initial')
+    holder.start()
+    loader.error = RuntimeError("Database Error")
+
+    assert holder.refresh(wait=True, timeout=5)
+    assert holder.get() == 'initial'
+    assert holder.failed_count == 1
+    assert loader.calls == 1
+    holder.close()
+
+
+def test_exiting_loader_keeps_the_rebuild_thread():
+    """
+    Test that a loader calling sys.exit counts as a failed rebuild and leaves the rebuild
+    thread running.
+    """
+    calls = []
+
+    def loader():
+        calls.append(None)
+        if len(calls) == 1:
+            sys.exit(1)
+        return 'rebuilt'
+
+    holder = ModelHolder(loader, model='initial')
+    holder.start()
+    assert holder.refresh(wait=True, timeout=5)
+    assert holder.get() == 'initial'
+    assert holder.failed_count == 1
+
+    assert holder.refresh(wait=True, timeout=5)
+    assert holder.get() == 'rebuilt'
+    holder.close()
+
+
+def test_scheduled_rebuild_and_close():
+    """
+    Test that the model is rebuilt every refresh_interval seconds, and that a closed holder
+    rejects refresh requests.
+    """
+    loader = Loader()
+    holder = ModelHolder(loader, refresh_interval=0.01, model='initial')
+    holder.start()
+    holder.start()
+    loader.started.wait(5)
+    holder.close()
+    holder.close()
+
+    assert holder.get().startswith('model')
+    assert not holder.refresh()
+
+    with pytest.raises(ValueError, match="refresh_interval must be positive."):
+        ModelHolder(loader, refresh_interval=0)
+
+
+@pytest.mark.parametrize('value, expected', [(None, None), ('300', 300.0), ('0.5', 0.5), ('0', None), ('soon', None)])
+def test_get_refresh_interval(monkeypatch, value, expected):
+    """
+    Test that LABMATEAI_REFRESH_INTERVAL is read as a positive number of seconds.
+    """
+    if value is None:
+        monkeypatch.delenv('LABMATEAI_REFRESH_INTERVAL', raising=False)
+    else:
+        monkeypatch.setenv('LABMATEAI_REFRESH_INTERVAL', value)
+    assert get_refresh_interval() == expected
+
+
+def test_loader_returning_none_keeps_the_model():
+    """
+    Test that a loader returning None keeps the current model without counting a rebuild.
+    """
+    holder = ModelHolder(lambda: None, model='initial')
+    holder.start()
+    assert holder.refresh(wait=True, timeout=5)
+    assert holder.get() == 'initial'
+    assert holder.refresh_count == 0
+    assert holder.failed_count == 0
+    holder.close()
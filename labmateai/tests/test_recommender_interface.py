@@ -8,6 +8,7 @@ and that any concrete subclasses adhere to its contract.
 """
 
 import unittest
+from unittest.mock import MagicMock
 from typing import List, Dict, Optional
 from abc import ABC, abstractmethod
 from labmateai.recommenders.recommender_interface import RecommenderInterface
@@ -93,6 +94,38 @@ class TestRecommenderInterface(unittest.TestCase):
         self.assertIsInstance(recommendations, list)
         self.assertIsInstance(scores, dict)
 
+    def test_recommend_batch_default_calls_recommend(self):
+        """
+        Test that the default recommend_batch calls recommend per query and pads with -1.
+        """
+        mock_recommender = MockRecommender()
+        mock_recommender.recommend = MagicMock(side_effect=[
+            [{'tool_id': 7}, {'tool_id': 3}],
+            []
+        ])
+
+        result = mock_recommender.recommend_batch(user_ids=[1, 2], tool_names=["Alpha", None],
+                                                  num_recommendations=3)
+
+        self.assertEqual(result.tolist(), [[7, 3, -1], [-1, -1, -1]])
+        mock_recommender.recommend.assert_any_call(user_id=1, tool_name="Alpha", num_recommendations=3)
+        mock_recommender.recommend.assert_any_call(user_id=2, tool_name=None, num_recommendations=3)
+
+    def test_recommend_batch_invalid_arguments(self):
+        """
+        Test that recommend_batch validates its arguments.
+        """
+        mock_recommender = MockRecommender()
+        with self.assertRaises(ValueError) as context:
+            mock_recommender.recommend_batch(user_ids=[1], num_recommendations=0)
+        self.assertIn("num_recommendations must be at least 1.", str(context.exception))
+        with self.assertRaises(ValueError) as context:
+            mock_recommender.recommend_batch()
+        self.assertIn("At least one of user_ids or tool_names", str(context.exception))
+        with self.assertRaises(ValueError) as context:
+            mock_recommender.recommend_batch(user_ids=[1, 2], tool_names=["Alpha"])
+        self.assertIn("must have the same length", str(context.exception))
+
     def test_repr_method(self):
         """
         Test the __repr__ method of the RecommenderInterface.
@@ -0,0 +1,105 @@
+# tests/test_search.py
+
+"""
+Unit tests for the search module in LabMateAI.
+"""
+
+import numpy as np
+import pytest
+from labmateai.search import ToolSearchIndex, tokenize
+from labmateai.tool import Tool
+from labmateai.tree import ToolTree
+
+
+def make_tool(tool_id, name, category, features, description):
+    """
+    Builds a Tool with placeholder values for the fields search ignores.
+    """
+    return Tool(tool_id=tool_id, name=name, category=category, features=tuple(features),
+                cost='Free', description=description, url=f'https://tool{tool_id}.example.com/',
+                language='Python', platform='Linux')
+
+
+@pytest.fixture
+def tools():
+    """
+    Fixture providing a small catalog where the same terms appear in different fields.
+    """
+    return [
+        make_tool(1, 'Aligner', 'Genomics', ['sequence_analysis'], 'Fast sequence alignment'),
+        make_tool(2, 'Sequence Studio', 'Genomics', ['visualization'], 'Browse genomes'),
+        make_tool(3, 'Mass Spec Suite', 'Proteomics', ['mass_spectrometry'], 'Protein identification'),
+        make_tool(4, 'Viewer', 'Imaging', ['visualization'], 'Image viewer for sequence data'),
+        make_tool(5, 'Plotter', 'Statistics', ['visualization'], 'Plots'),
+    ]
+
+
+def test_tokenize_splits_on_underscores():
+    """
+    Test that feature names like 'sequence_analysis' yield one term per word.
+    """
+    assert tokenize('Sequence_Analysis, RNA-seq v2') == ['sequence', 'analysis', 'rna', 'seq', 'v2']
+
+
+def test_search_ranks_by_boosted_bm25(tools):
+    """
+    Test that a name match outranks feature and description matches, and that
+    tools without any query term are not returned.
+    """
+    index = ToolSearchIndex(tools)
+
+    results = index.search('sequence', num_results=5)
+    assert [tool.tool_id for tool in results] == [2, 1, 4]
+
+    # The rarer term dominates a query that also holds a common one
+    results = index.search('visualization protein', num_results=2)
+    assert results[0].tool_id == 3
+
+    assert index.search('nonexistent') == []
+
+
+def test_search_scores_match_bm25_formula(tools):
+    """
+    Test the precomputed weights against a direct BM25 computation for one term.
+    """
+    index = ToolSearchIndex(tools, field_boosts={'description': 1.0}, k1=1.5, b=0.5)
+    lengths = np.array([len(tokenize(tool.description)) for tool in tools])
+    tf = np.array([tokenize(tool.description).count('sequence') for tool in tools])
+    df = int((tf > 0).sum())
+    idf = np.log1p((len(tools) - df + 0.5) / (df + 0.5))
+    expected = idf * tf * 2.5 / (tf + 1.5 * (0.5 + 0.5 * lengths / lengths.mean()))
+
+    np.testing.assert_allclose(index.score('sequence'), expected)
+    np.testing.assert_allclose(index.score('sequence sequence'), 2 * expected)
+
+
+def test_search_ties_keep_index_order(tools):
+    """
+    Test that equal scores are ranked in index order and results are capped at num_results.
+    """
+    index = ToolSearchIndex(tools, field_boosts={'features': 1.0})
+    assert [tool.tool_id for tool in index.search('visualization', num_results=2)] == [2, 4]
+
+    with pytest.raises(ValueError, match="num_results must be at least 1."):
+        index.search('visualization', num_results=0)
+
+
+def test_from_tree_uses_traversal_order(tools):
+    """
+    Test that an index built from a ToolTree holds its tools in traversal order.
+    """
+    tree = ToolTree()
+    tree.build_tree(tools[::-1])
+    index = ToolSearchIndex.from_tree(tree)
+    assert index.tools == tree.get_all_tools()
+    assert len(index) == len(tools)
+
+
+def test_invalid_parameters(tools):
+    """
+    Test that unknown fields and out-of-range BM25 parameters raise ValueError.
+    """
+    with pytest.raises(ValueError, match="Unknown search fields"):
+        ToolSearchIndex(tools, field_boosts={'url': 1.0})
+    with pytest.raises(ValueError, match="b must be between 0 and 1"):
+        ToolSearchIndex(tools, b=1.5)
@@ -0,0 +1,252 @@
+# tests/test_server.py
+
+"""
+Unit tests for the server module in LabMateAI.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+from labmateai.recommenders.collaborative_recommender import CollaborativeRecommender
+from labmateai.recommenders.content_based_recommender import ContentBasedRecommender, \
+    build_sparse_user_item_matrix
+from labmateai.recommenders.hybrid_recommender import HybridRecommender
+from labmateai import metrics
+from labmateai.model_holder import ModelHolder
+from labmateai.server import RecommenderModel, SharedSnapshotLoader, create_app, create_model_holder, load_model
+from labmateai.snapshot import compute_fingerprint, save_snapshot
+from labmateai.tool import Tool
+
+
+@pytest.fixture
+def tools():
+    """
+    Fixture providing a small catalog across two categories.
+    """
+    return [
+        Tool(tool_id=i, name=name, category=category, features=tuple(features), cost='Free',
+             description=description, url=f'https://tool{i}.example.com/', language='Python', platform='Linux')
+        for i, (name, category, features, description) in enumerate([
+            ('Aligner', 'Genomics', ['sequence_analysis', 'alignment'], 'Fast sequence alignment'),
+            ('Assembler', 'Genomics', ['genome_assembly', 'alignment'], 'Genome assembly'),
+            ('Caller', 'Genomics', ['variant_calling'], 'Variant calling from sequences'),
+            ('Spectra', 'Proteomics', ['mass_spectrometry'], 'Protein identification'),
+            ('Quant', 'Proteomics', ['mass_spectrometry', 'quantification'], 'Protein quantification'),
+        ], start=1)
+    ]
+
+
+@pytest.fixture
+def client(tools):
+    """
+    Fixture providing a test client of an application serving all three recommenders.
+    """
+    content = ContentBasedRecommender(tools)
+    matrix, user_ids, tool_ids = build_sparse_user_item_matrix(
+        [10, 10, 11, 11, 12], [1, 2, 1, 4, 5], [5, 4, 5, 2, 3])
+    collaborative = CollaborativeRecommender(
+        user_item_matrix=matrix, tools_df=pd.DataFrame([tool.__dict__ for tool in tools]),
+        n_neighbors=2, user_ids=user_ids, tool_ids=tool_ids)
+    hybrid = HybridRecommender(content, collaborative)
+    app = create_app(RecommenderModel.build(content, collaborative, hybrid))
+    return app.test_client()
+
+
+def test_health(client):
+    """
+    Test that the health endpoint reports the number of tools.
+    """
+    assert client.get('/health').get_json() == {'status': 'ok', 'tools': 5}
+
+
+def test_similar_tools(client):
+    """
+    Test that similar tools are returned as JSON tools, and unknown tools give 404.
+    """
+    response = client.get('/tools/aligner/similar?n=2')
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert len(results) == 2
+    assert results[0]['name'] == 'Assembler'
+    assert results[0]['features'] == ['genome_assembly', 'alignment']
+
+    response = client.get('/tools/Unknown/similar')
+    assert response.status_code == 404
+    assert 'error' in response.get_json()
+
+
+def test_category_and_search(client):
+    """
+    Test category listing, case-insensitively, and ranked search with partial matches.
+    """
+    results = client.get('/categories/proteomics/tools').get_json()['results']
+    assert [tool['name'] for tool in results] == ['Spectra', 'Quant']
+
+    results = client.get('/search?q=protein&n=3').get_json()['results']
+    assert {tool['name'] for tool in results} == {'Spectra', 'Quant'}
+
+    # 'sequen' is no whole term, so only partial matches are found
+    results = client.get('/search?q=sequen').get_json()['results']
+    assert [tool['name'] for tool in results] == ['Aligner', 'Caller']
+
+    assert client.get('/search').status_code == 400
+
+
+def test_user_recommendations(client):
+    """
+    Test collaborative and hybrid recommendations, which exclude tools the user rated.
+    """
+    response = client.get('/users/12/recommendations?n=2')
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert 0 < len(results) <= 2
+    assert all(isinstance(result['tool_id'], int) and result['tool_id'] != 5 for result in results)
+
+    response = client.get('/users/10/hybrid?n=3&tool_name=Spectra')
+    assert response.status_code == 200
+    assert len(response.get_json()['results']) == 3
+
+    assert client.get('/users/99/recommendations').status_code == 404
+    assert client.get('/users/99/hybrid').status_code == 404
+
+
+@pytest.mark.parametrize('n', ['0', '-1', 'many'])
+def test_invalid_number_of_results(client, n):
+    """
+    Test that a number of results that is not a positive integer gives 400.
+    """
+    response = client.get(f'/tools/Aligner/similar?n={n}')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': "The query parameter 'n' must be a positive integer."}
+
+
+def test_collaborative_unavailable(tools):
+    """
+    Test that user endpoints give 503 when the model has no collaborative recommender.
+    """
+    client = create_app(RecommenderModel.build(ContentBasedRecommender(tools))).test_client()
+    assert client.get('/users/10/recommendations').status_code == 503
+    assert client.get('/users/10/hybrid').status_code == 503
+    assert client.get('/categories/Genomics/tools?n=1').get_json()['results'][0]['name'] == 'Aligner'
+
+
+def test_load_model_attaches_to_snapshot(tools, tmp_path, monkeypatch):
+    """
+    Test that with a snapshot directory the model is served from the current snapshot mapped
+    read-only, from the CLI's recommenders when there is no current snapshot, and that load
+    errors are raised rather than exiting.
+    """
+    content = ContentBasedRecommender(tools)
+    matrix, user_ids, tool_ids = build_sparse_user_item_matrix([10, 11], [1, 2], [5, 4])
+    collaborative = CollaborativeRecommender(
+        user_item_matrix=matrix, tools_df=pd.DataFrame([tool.__dict__ for tool in tools]),
+        n_neighbors=1, user_ids=user_ids, tool_ids=tool_ids)
+    save_snapshot(str(tmp_path), compute_fingerprint(2, 5), content, collaborative)
+    monkeypatch.setenv('LABMATEAI_SNAPSHOT_DIR', str(tmp_path))
+
+    with patch('labmateai.cli.CLI') as mock_cli_class:
+        cli = mock_cli_class.return_value
+        cli._build_model.return_value = RecommenderModel.build(content)
+
+        cli._data_fingerprint.return_value = compute_fingerprint(2, 5)
+        model = load_model()
+        assert not model.collaborative.user_item_matrix.data.flags.writeable
+        assert model.hybrid.collaborative_recommender is model.collaborative
+        cli.engine.dispose.assert_called_once()
+
+        cli._data_fingerprint.return_value = compute_fingerprint(3, 5)
+        assert load_model(cli).collaborative is None
+        assert mock_cli_class.call_count == 1
+
+        cli._build_model.side_effect = RuntimeError("Database Error")
+        with pytest.raises(RuntimeError, match="Database Error"):
+            load_model(cli)
+        assert cli.engine.dispose.call_count == 3
+
+
+def test_app_serves_the_current_model_of_a_holder(tools):
+    """
+    Test that an application serving a model holder answers each request with its current model.
+    """
+    holder = ModelHolder(lambda: RecommenderModel.build(ContentBasedRecommender(tools)))
+    client = create_app(holder).test_client()
+    assert client.get('/health').get_json()['tools'] == 5
+
+    holder.loader = lambda: RecommenderModel.build(ContentBasedRecommender(tools[:3]))
+    holder.start()
+    assert holder.refresh(wait=True, timeout=10)
+    holder.close()
+    assert client.get('/health').get_json()['tools'] == 3
+    assert client.get('/categories/Proteomics/tools').get_json()['results'] == []
+
+
+def test_metrics_endpoint(client):
+    """
+    Test that /metrics is disabled by default, and otherwise exports request and
+    recommender timings as Prometheus text or JSON.
+    """
+    assert client.get('/metrics').status_code == 404
+
+    metrics.reset()
+    metrics.enable()
+    try:
+        client.get('/users/10/recommendations')
+        client.get('/search')
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        text = response.get_data(as_text=True)
+        assert 'labmateai_server_collaborative_recommendations_seconds_count 1' in text
+        assert 'labmateai_server_errors_total 1' in text
+        assert 'labmateai_collaborative_recommend_seconds_bucket{le="+Inf"} 1' in text
+
+        recorded = client.get('/metrics?format=json').get_json()
+        assert recorded['counters']['server_requests_total'] == 3
+        assert recorded['histograms']['server_search_seconds']['count'] == 1
+    finally:
+        metrics.disable()
+        metrics.reset()
+
+
+def test_shared_snapshot_loader_rebuilds_in_one_worker(tools, tmp_path):
+    """
+    Test that only the worker holding the rebuild lock rebuilds the snapshot, and that every
+    worker attaches to each new snapshot once.
+    """
+    matrix, user_ids, tool_ids = build_sparse_user_item_matrix([10, 11], [1, 2], [5, 4])
+    collaborative = CollaborativeRecommender(
+        user_item_matrix=matrix, tools_df=pd.DataFrame([tool.__dict__ for tool in tools]),
+        n_neighbors=1, user_ids=user_ids, tool_ids=tool_ids)
+    fingerprints = iter(range(2, 10))
+
+    def publish():
+        save_snapshot(str(tmp_path), compute_fingerprint(next(fingerprints), 5),
+                      ContentBasedRecommender(tools), collaborative)
+
+    leader_cli, follower_cli = MagicMock(), MagicMock()
+    leader_cli._build_model.side_effect = publish
+    leader = SharedSnapshotLoader(leader_cli, str(tmp_path))
+    follower = SharedSnapshotLoader(follower_cli, str(tmp_path))
+
+    model = leader()
+    assert not model.collaborative.user_item_matrix.data.flags.writeable
+    assert follower().hybrid is not None
+    assert follower() is None
+    assert leader() is not None
+    assert follower() is not None
+    assert leader_cli._build_model.call_count == 2
+    follower_cli._build_model.assert_not_called()
+
+
+def test_create_model_holder_needs_a_snapshot_to_refresh(tools, monkeypatch):
+    """
+    Test that without a snapshot directory the model is loaded but not refreshed.
+    """
+    monkeypatch.delenv('LABMATEAI_SNAPSHOT_DIR', raising=False)
+    monkeypatch.setenv('LABMATEAI_REFRESH_INTERVAL', '60')
+    with patch('labmateai.cli.CLI') as mock_cli_class:
+        mock_cli_class.return_value._build_model.return_value = RecommenderModel.build(ContentBasedRecommender(tools))
+        holder = create_model_holder()
+    assert holder.refresh_interval is None
+    assert len(holder.get().content.tools) == 5
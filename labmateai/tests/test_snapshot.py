@@ -0,0 +1,215 @@
+# tests/test_snapshot.py
+
+"""
+Unit tests for the snapshot module in LabMateAI.
+"""
+
+import json
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from labmateai.recommenders.collaborative_recommender import CollaborativeRecommender
+from labmateai.recommenders.content_based_recommender import ContentBasedRecommender, \
+    build_sparse_user_item_matrix
+from labmateai.snapshot import LOCK_FILE, compute_fingerprint, fcntl, load_snapshot, load_snapshot_for_sync, \
+    save_snapshot, read_manifest
+from labmateai.tool import Tool
+
+
+@pytest.fixture
+def recommenders():
+    """
+    Fixture providing a built content-based and collaborative recommender.
+    """
+    rng = np.random.default_rng(3)
+    tools = [
+        Tool(
+            tool_id=i, name=f'Tool{i}', category=f'Category{i % 3}',
+            features=tuple(f'feature{j}' for j in rng.choice(6, 2, replace=False)),
+            cost='Free', description=f'Description {i}', url=f'https://tool{i}.example.com/',
+            language=['Python', 'R'][i % 2], platform='Linux'
+        )
+        for i in range(1, 16)
+    ]
+    content = ContentBasedRecommender(tools=tools)
+    matrix, user_ids, tool_ids = build_sparse_user_item_matrix(
+        rng.integers(100, 120, 80), rng.integers(1, 16, 80), rng.integers(1, 6, 80)
+    )
+    collaborative = CollaborativeRecommender(
+        user_item_matrix=matrix,
+        tools_df=pd.DataFrame([tool.__dict__ for tool in tools]),
+        n_neighbors=3,
+        user_ids=user_ids,
+        tool_ids=tool_ids
+    )
+    return content, collaborative
+
+
+def test_snapshot_round_trip(tmp_path, recommenders):
+    """
+    Test that a loaded snapshot gives the same recommendations as the saved recommenders.
+    """
+    content, collaborative = recommenders
+    fingerprint = compute_fingerprint(80, 15)
+    save_snapshot(str(tmp_path), fingerprint, content, collaborative)
+
+    loaded_content, loaded_collaborative = load_snapshot(str(tmp_path), fingerprint)
+
+    assert loaded_content.tools == content.tools
+    assert isinstance(loaded_content.similarity_matrix, np.memmap)
+    np.testing.assert_array_equal(loaded_content.similarity_matrix, content.similarity_matrix)
+    names = [tool.name for tool in content.tools]
+    np.testing.assert_array_equal(loaded_content.recommend_batch(tool_names=names),
+                                  content.recommend_batch(tool_names=names))
+    assert loaded_content.recommend(tool_name='Tool4') == content.recommend(tool_name='Tool4')
+
+    user_ids = collaborative.user_ids.tolist()
+    np.testing.assert_array_equal(loaded_collaborative.user_ids, collaborative.user_ids)
+    assert (loaded_collaborative.user_item_matrix != collaborative.user_item_matrix).nnz == 0
+    np.testing.assert_array_equal(loaded_collaborative.recommend_batch(user_ids=user_ids),
+                                  collaborative.recommend_batch(user_ids=user_ids))
+    pd.testing.assert_frame_equal(loaded_collaborative.tools_df, collaborative.tools_df)
+
+    # The memory-mapped ratings accept in-place updates without touching the snapshot files
+    np.testing.assert_array_equal(loaded_collaborative.rating_counts, collaborative.rating_counts)
+    loaded_collaborative.update_interactions([user_ids[0], 999], [1, 2], [5, 4])
+    collaborative.update_interactions([user_ids[0], 999], [1, 2], [5, 4])
+    np.testing.assert_array_equal(loaded_collaborative.recommend_batch(user_ids=user_ids + [999]),
+                                  collaborative.recommend_batch(user_ids=user_ids + [999]))
+    assert load_snapshot(str(tmp_path), fingerprint)[1].user_item_matrix.shape[0] == len(user_ids)
+
+
+def test_snapshot_keeps_requested_neighbors(tmp_path, recommenders):
+    """
+    Test that a snapshot of a recommender with fewer users than requested neighbors keeps the
+    requested number, so it grows with the users added after loading as in a fresh build.
+    """
+    content, _ = recommenders
+    tools_df = pd.DataFrame([tool.__dict__ for tool in content.tools])
+    matrix, user_ids, tool_ids = build_sparse_user_item_matrix([100, 100, 101], [1, 2, 2], [5, 3, 4])
+    collaborative = CollaborativeRecommender(user_item_matrix=matrix, tools_df=tools_df, n_neighbors=4,
+                                             user_ids=user_ids, tool_ids=tool_ids)
+    assert collaborative.n_neighbors == 2
+    fingerprint = compute_fingerprint(3, 15)
+    save_snapshot(str(tmp_path), fingerprint, content, collaborative)
+    assert read_manifest(str(tmp_path))['collaborative']['n_neighbors'] == 4
+
+    loaded_collaborative = load_snapshot(str(tmp_path), fingerprint)[1]
+    assert loaded_collaborative.n_neighbors == 2
+
+    new_users, new_tools, new_ratings = [102, 103, 104, 102], [1, 3, 2, 4], [2, 5, 4, 1]
+    loaded_collaborative.update_interactions(new_users, new_tools, new_ratings)
+    assert loaded_collaborative.n_neighbors == 4
+
+    matrix, user_ids, tool_ids = build_sparse_user_item_matrix(
+        [100, 100, 101] + new_users, [1, 2, 2] + new_tools, [5, 3, 4] + new_ratings)
+    fresh = CollaborativeRecommender(user_item_matrix=matrix, tools_df=tools_df, n_neighbors=4,
+                                     user_ids=user_ids, tool_ids=tool_ids)
+    all_users = user_ids.tolist()
+    np.testing.assert_array_equal(loaded_collaborative.recommend_batch(user_ids=all_users),
+                                  fresh.recommend_batch(user_ids=all_users))
+
+
+def test_snapshot_without_collaborative_model(tmp_path, recommenders):
+    """
+    Test that a snapshot can hold the content-based recommender alone.
+    """
+    content, _ = recommenders
+    fingerprint = compute_fingerprint(None, 15)
+    save_snapshot(str(tmp_path), fingerprint, content)
+
+    loaded_content, loaded_collaborative = load_snapshot(str(tmp_path), fingerprint)
+    assert loaded_collaborative is None
+    assert loaded_content.recommend(tool_name='Tool2') == content.recommend(tool_name='Tool2')
+
+
+def test_stale_or_missing_snapshot_is_ignored(tmp_path, recommenders):
+    """
+    Test that snapshots with another fingerprint or format version are not loaded.
+    """
+    content, collaborative = recommenders
+    assert load_snapshot(str(tmp_path / 'missing'), compute_fingerprint(80, 15)) is None
+
+    save_snapshot(str(tmp_path), compute_fingerprint(80, 15), content, collaborative)
+    assert load_snapshot(str(tmp_path), compute_fingerprint(81, 15)) is None
+    assert load_snapshot(str(tmp_path), compute_fingerprint(80, 16)) is None
+
+    manifest = read_manifest(str(tmp_path))
+    manifest['format_version'] += 1
+    (tmp_path / 'manifest.json').write_text(json.dumps(manifest))
+    assert load_snapshot(str(tmp_path), compute_fingerprint(80, 15)) is None
+
+
+def test_snapshot_for_sync_accepts_older_high_water_mark(tmp_path, recommenders):
+    """
+    Test that a snapshot of the same tools with an older high-water mark is loaded for a
+    delta sync, while one with other tools or a newer mark is not.
+    """
+    content, collaborative = recommenders
+    save_snapshot(str(tmp_path), compute_fingerprint(80, 15), content, collaborative)
+
+    loaded_content, loaded_collaborative, high_water_mark = load_snapshot_for_sync(
+        str(tmp_path), compute_fingerprint(95, 15))
+    assert high_water_mark == 80
+    assert loaded_content.tools == content.tools
+    np.testing.assert_array_equal(loaded_collaborative.user_ids, collaborative.user_ids)
+
+    assert load_snapshot_for_sync(str(tmp_path), compute_fingerprint(80, 15))[2] == 80
+    assert load_snapshot_for_sync(str(tmp_path), compute_fingerprint(79, 15)) is None
+    assert load_snapshot_for_sync(str(tmp_path), compute_fingerprint(None, 15)) is None
+    assert load_snapshot_for_sync(str(tmp_path), compute_fingerprint(95, 16)) is None
+
+
+def test_read_only_snapshot_maps_every_array(tmp_path, recommenders):
+    """
+    Test that a snapshot loaded read-only serves the same recommendations from read-only
+    mappings of its files, and rejects updates.
+    """
+    content, collaborative = recommenders
+    fingerprint = compute_fingerprint(80, 15)
+    save_snapshot(str(tmp_path), fingerprint, content, collaborative)
+
+    loaded_content, loaded_collaborative = load_snapshot(str(tmp_path), fingerprint, read_only=True)
+
+    def is_mapped(array):
+        while not isinstance(array, np.memmap):
+            if array.base is None:
+                return False
+            array = array.base
+        return True
+
+    matrix = loaded_collaborative.user_item_matrix
+    for array in [matrix.data, matrix.indices, matrix.indptr, loaded_collaborative.rating_counts,
+                  loaded_collaborative.user_ids, loaded_collaborative.tool_ids, loaded_content.similarity_matrix,
+                  loaded_content.graph.neighbor_indices, loaded_content.graph.neighbor_weights]:
+        assert is_mapped(array)
+        assert not array.flags.writeable
+    assert loaded_collaborative.model is None
+
+    user_ids = collaborative.user_ids.tolist()
+    np.testing.assert_array_equal(loaded_collaborative.recommend_batch(user_ids=user_ids),
+                                  collaborative.recommend_batch(user_ids=user_ids))
+    with pytest.raises(ValueError, match="read-only"):
+        loaded_collaborative.update_interactions([user_ids[0]], [1], [5])
+
+
+@pytest.mark.skipif(fcntl is None, reason="fcntl is not available")
+def test_load_waits_for_a_save_in_progress(tmp_path, recommenders):
+    """
+    Test that a load waits while the snapshot's lock is held for a save.
+    """
+    content, collaborative = recommenders
+    fingerprint = compute_fingerprint(80, 15)
+    save_snapshot(str(tmp_path), fingerprint, content, collaborative)
+
+    loaded = []
+    with open(tmp_path / LOCK_FILE, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        thread = threading.Thread(target=lambda: loaded.append(load_snapshot(str(tmp_path), fingerprint)))
+        thread.start()
+        thread.join(0.2)
+        assert thread.is_alive()
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+    thread.join(5)
+    assert loaded[0][0].tools == content.tools
@@ -0,0 +1,62 @@
+# tests/test_startup.py
+
+"""
+Cold-start regression tests for the LabMateAI CLI, based on python -X importtime.
+"""
+
+import subprocess
+import sys
+
+# Modules the CLI must not import before they are first used
+HEAVY_MODULES = {'pandas', 'sklearn', 'scipy', 'networkx', 'alembic', 'numpy', 'flask', 'sqlalchemy'}
+
+# Budget for the cumulative import time of labmateai.cli, as a multiple of the time the
+# interpreter spends importing its own startup modules, so it scales with the machine
+IMPORT_BUDGET_RATIO = 5
+
+# Timed runs of each measurement; the fastest is used, as noise only ever adds time
+RUNS = 3
+
+
+def import_times(code):
+    """
+    Runs code in a fresh interpreter and returns the cumulative import time of every module
+    it loaded, in microseconds, keyed by module name. Top-level imports are keyed without
+    indentation; nested ones keep the indentation importtime reports them with.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name[1:].rstrip() if name.startswith('  ') else name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_import_defers_heavy_modules():
+    """
+    Test that importing the CLI loads none of the heavy modules.
+    """
+    loaded = {name.strip().split('.')[0] for name in import_times('import labmateai.cli')}
+
+    assert 'labmateai' in loaded
+    assert loaded.isdisjoint(HEAVY_MODULES), sorted(loaded & HEAVY_MODULES)
+
+
+def test_cli_import_within_budget():
+    """
+    Test that importing the CLI takes at most IMPORT_BUDGET_RATIO times the interpreter's own
+    startup imports.
+    """
+    cli_us = min(import_times('import labmateai.cli')['labmateai.cli'] for _ in range(RUNS))
+    startup_us = min(
+        sum(time for name, time in import_times('pass').items() if not name.startswith(' '))
+        for _ in range(RUNS)
+    )
+
+    assert cli_us < IMPORT_BUDGET_RATIO * startup_us, \
+        f"labmateai.cli imports in {cli_us} us, over {IMPORT_BUDGET_RATIO} x {startup_us} us"
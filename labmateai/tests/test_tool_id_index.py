@@ -0,0 +1,53 @@
+# tests/test_tool_id_index.py
+
+"""
+Unit tests for the ToolIdIndex class in LabMateAI.
+"""
+
+import numpy as np
+import pytest
+from labmateai.recommenders.tool_id_index import ToolIdIndex
+
+
+def test_tool_ids_are_sorted_and_unique():
+    """
+    Test that the index holds each tool ID once, in ascending order.
+    """
+    index = ToolIdIndex([30, 10, 20, 10])
+    assert index.tool_ids.tolist() == [10, 20, 30]
+    assert len(index) == 3
+    assert 20 in index
+    assert 40 not in index
+    assert index.position(30) == 2
+
+
+def test_positions_of():
+    """
+    Test that positions_of looks up several tool IDs and rejects unknown ones.
+    """
+    index = ToolIdIndex([30, 10, 20])
+    assert index.positions_of([20, 30, 10]).tolist() == [1, 2, 0]
+    with pytest.raises(ValueError, match="not found in the tool ID index"):
+        index.positions_of([20, 25])
+    with pytest.raises(ValueError, match="Tool ID 25 not found"):
+        index.position(25)
+
+
+def test_union_and_align():
+    """
+    Test that scores aligned to one index are reordered onto the union of two indexes.
+    """
+    left = ToolIdIndex([1, 3])
+    right = ToolIdIndex([2, 3, 4])
+    union = left.union(right)
+    assert union.tool_ids.tolist() == [1, 2, 3, 4]
+    assert left.union(ToolIdIndex([3, 1])) is left
+
+    aligned = union.align(np.array([0.5, 0.25], dtype=np.float32), left, fill_value=0.0)
+    assert aligned.dtype == np.float32
+    assert aligned.tolist() == [0.5, 0.0, 0.25, 0.0]
+
+    with pytest.raises(ValueError, match="does not match"):
+        union.align(np.zeros(3), left)
+    with pytest.raises(ValueError, match="not found"):
+        left.align(np.zeros(3), right)
@@ -290,6 +290,34 @@ class TestToolTree(unittest.TestCase):
         self.assertEqual(results_upper[0], self.tool1)
         self.assertEqual(results_mixed[0], self.tool1)
 
+    def test_search_tools_matches_linear_scan(self):
+        """
+        Test that the indexed search returns the same tools, in the same order, as a
+        substring scan over every tool in tree traversal order.
+        """
+        self.tree.build_tree(self.tools)
+        self.tree.add_tool(Tool(
+            tool_id=6,
+            name="Alpha Plus",
+            category="genomics",
+            description="Sequence alignment at scale",
+            features=["alignment", "ab"]
+        ))
+
+        def linear_scan(keyword):
+            keyword = keyword.lower()
+            return [
+                leaf.tool for category in self.tree.root.children for leaf in category.children
+                if keyword in leaf.tool.name.lower() or keyword in leaf.tool.description.lower()
+                or keyword in leaf.tool.category.lower()
+                or any(keyword in feature.lower() for feature in leaf.tool.features)
+            ]
+
+        keywords = ["", "a", "AL", "n a", "lph", "alpha", "alignment", "sequence a", "ion_id",
+                    "omics", "description", "ab", "bc", "scale", "zzz", "e_a"]
+        for keyword in keywords:
+            self.assertEqual(self.tree.search_tools(keyword), linear_scan(keyword), keyword)
+
     def test_get_all_categories(self):
         """
         Test retrieving all categories with original casing.
@@ -593,6 +621,17 @@ class TestToolTreeRepeatedBuilds(unittest.TestCase):
         self.assertEqual(len(metabolomics_node.children), 1)
         self.assertIn(tool4, [child.tool for child in metabolomics_node.children])
 
+    def test_build_tree_same_tools_twice(self):
+        """
+        Test that building the tree again with the same tools does not duplicate them.
+        """
+        self.tree.build_tree(self.tools_initial)
+
+        self.assertEqual(len(self.tree.tools), 2)
+        self.assertEqual(len(self.tree.categories["genomics"].children), 1)
+        self.assertEqual(len(self.tree.categories["proteomics"].children), 1)
+        self.assertEqual(len(self.tree.search_tools("Alpha")), 1)
+
 
 if __name__ == '__main__':
     unittest.main()
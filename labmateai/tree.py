@@ -4,6 +4,16 @@
 This module defines a tree structure to organize tools by categories.
 """
 
+import re
+
+from . import metrics
+
+# Tokens of the inverted index: runs of letters, digits and underscores
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Longest character n-gram kept in the n-gram index
+MAX_GRAM_LENGTH = 3
+
 
 class TreeNode:
     """
@@ -46,20 +56,40 @@ class ToolTree:
     """
 
     def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """
+        Removes every category and tool, so the tree can be built again from a different
+        list of tools.
+        """
         self.root = TreeNode("Root")
         self.categories = {}
         self.tools = []
-
+        self._tool_set = set()
+        # Leaf nodes in the order they were added, and the position of each in a tree traversal
+        self._leaves = []
+        self._leaf_order = []
+        self._category_ranks = {}
+        # Inverted indexes from lowercase tokens and character n-grams to leaf positions
+        self.token_index = {}
+        self.gram_index = {}
+
+    @metrics.timed('tree_build_seconds')
     def build_tree(self, tools):
         """
         Builds the tool tree from a list of tools.
+        Tools that are already in the tree are skipped, so repeated builds do not duplicate entries.
 
         Args:
             tools (list): A list of Tool objects.
         """
         for tool in tools:
+            if tool in self._tool_set:
+                continue
             self.add_tool(tool)
             self.tools.append(tool)
+            self._tool_set.add(tool)
 
     def add_tool(self, tool):
         """
@@ -74,9 +104,53 @@ class ToolTree:
                 normalized_category, original_name=tool.category)
             self.root.add_child(category_node)
             self.categories[normalized_category] = category_node
+            self._category_ranks[normalized_category] = len(self._category_ranks)
         else:
             category_node = self.categories[normalized_category]
-        category_node.add_child(TreeNode(tool.name, tool))
+        leaf = TreeNode(tool.name, tool)
+        category_node.add_child(leaf)
+        self._index_leaf(leaf, self._category_ranks[normalized_category])
+
+    def _index_leaf(self, leaf, category_rank):
+        """
+        Adds a leaf node to the token and n-gram indexes.
+
+        N-grams are taken within each searchable field, never across two fields, so an
+        n-gram match always comes from a single field.
+
+        Args:
+            leaf (TreeNode): The leaf node holding the tool.
+            category_rank (int): The position of the leaf's category among the root's children.
+        """
+        position = len(self._leaves)
+        self._leaves.append(leaf)
+        self._leaf_order.append((category_rank, position))
+
+        tokens = set()
+        grams = set()
+        for field in self._search_fields(leaf.tool):
+            tokens.update(TOKEN_PATTERN.findall(field))
+            for length in range(1, MAX_GRAM_LENGTH + 1):
+                grams.update(field[i:i + length] for i in range(len(field) - length + 1))
+        for token in tokens:
+            self.token_index.setdefault(token, set()).add(position)
+        for gram in grams:
+            self.gram_index.setdefault(gram, set()).add(position)
+
+    @staticmethod
+    def _search_fields(tool):
+        """
+        Returns the lowercase fields of a tool that search_tools matches against.
+
+        Args:
+            tool (Tool): The tool.
+
+        Returns:
+            list: The name, description, category and each feature of the tool.
+        """
+        return [tool.name.lower(), tool.description.lower(), tool.category.lower()] + [
+            feature.lower() for feature in tool.features
+        ]
 
     def find_category_node(self, category_name):
         """
@@ -110,33 +184,55 @@ class ToolTree:
         else:
             raise ValueError(f"Category '{category_name}' not found.")
 
+    @metrics.timed('tree_search_seconds')
     def search_tools(self, keyword):
         """
-        Searches for tools that match the provided keyword in their name, description, or features.
+        Searches for tools that match the provided keyword in their name, description, category or features.
         Implements partial matching to accommodate partial keywords.
 
+        Candidates are found by intersecting the postings of the keyword's n-grams. Keywords
+        longer than the indexed n-grams are then confirmed with a substring check, except for
+        tools where the keyword is a whole token. Results are in tree traversal order.
+
         Args:
             keyword (str): The keyword to search for.
 
         Returns:
             list: A list of matching Tool objects.
         """
-        results = []
         keyword_lower = keyword.lower()
+        if not keyword_lower:
+            return [leaf.tool for leaf in self._leaves_in_order(range(len(self._leaves)))]
+
+        length = min(len(keyword_lower), MAX_GRAM_LENGTH)
+        postings = sorted(
+            (self.gram_index.get(keyword_lower[i:i + length], set())
+             for i in range(len(keyword_lower) - length + 1)),
+            key=len
+        )
+        candidates = postings[0].intersection(*postings[1:])
+
+        if len(keyword_lower) > MAX_GRAM_LENGTH:
+            exact = self.token_index.get(keyword_lower, set())
+            candidates = {
+                position for position in candidates
+                if position in exact or any(
+                    keyword_lower in field for field in self._search_fields(self._leaves[position].tool))
+            }
+
+        return [leaf.tool for leaf in self._leaves_in_order(candidates)]
+
+    def _leaves_in_order(self, positions):
+        """
+        Sorts leaf positions into tree traversal order: by category, then by insertion.
 
-        def search_node(node):
-            if node.tool:
-                tool = node.tool
-                if (keyword_lower in tool.name.lower() or
-                    keyword_lower in tool.description.lower() or
-                    keyword_lower in tool.category.lower() or
-                        any(keyword_lower in feature.lower() for feature in tool.features)):
-                    results.append(tool)
-            for child in node.children:
-                search_node(child)
+        Args:
+            positions (iterable): Positions of leaves in the order they were added.
 
-        search_node(self.root)
-        return results
+        Returns:
+            list: The leaf nodes in traversal order.
+        """
+        return [self._leaves[position] for position in sorted(positions, key=self._leaf_order.__getitem__)]
 
     def get_all_categories(self):
         """
@@ -147,6 +243,15 @@ class ToolTree:
         """
         return [node.original_name for node in self.categories.values()]
 
+    def get_all_tools(self):
+        """
+        Returns all tools in the tree in traversal order: by category, then by insertion.
+
+        Returns:
+            list: A list of Tool objects.
+        """
+        return [leaf.tool for leaf in self._leaves_in_order(range(len(self._leaves)))]
+
     def traverse_tree(self, node=None, level=0):
         """
         Traverses the tree and prints the nodes.
@@ -0,0 +1,23 @@
+# labmateai/wsgi.py
+
+"""
+WSGI entry point for LabMateAI.
+
+Importing this module loads the recommenders and creates the application, so with
+gunicorn's preload_app the model is built once in the master process:
+
+    gunicorn -c gunicorn.conf.py labmateai.wsgi:app
+
+The model is served through a ModelHolder. Its rebuild thread is started in each worker by
+gunicorn.conf.py. With LABMATEAI_SNAPSHOT_DIR and LABMATEAI_REFRESH_INTERVAL set, one worker
+rebuilds the snapshot every LABMATEAI_REFRESH_INTERVAL seconds and the others attach to it.
+"""
+
+import logging
+
+from .server import create_app, create_model_holder
+
+logging.basicConfig(level=logging.INFO)
+
+holder = create_model_holder()
+app = create_app(holder)
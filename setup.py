@@ -73,6 +73,9 @@ setup(
             'sphinx>=4.0.0',
             'furo>=2021.8.14',
         ],
+        'cache': [
+            'pyarrow>=10.0.0',  # For the local columnar cache
+        ],
     },
     setup_requires=[
         'setuptools>=70.0.0',  # Pinning setuptools to avoid psycopg2 issues